@@ -1,6 +1,7 @@
 from ability import Ability, AbilityCollisionSprite
+from collision_manager import CollisionLayer
+from frame_cache import frame_cache, get_rotation_variant
 from movement_manager import MovementManager
-import pygame
 
 class AcidWave(Ability):
     """
@@ -46,7 +47,7 @@ class AcidWave(Ability):
         Args:
             direction (tuple): The (dx, dy) direction the projectile will travel.
         """
-        AcidWaveSprite(self, direction, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(AcidWaveSprite, self, direction, self.game_manager.all_ability_sprites)
 
 
 class AcidWaveSprite(AbilityCollisionSprite):
@@ -54,43 +55,38 @@ class AcidWaveSprite(AbilityCollisionSprite):
     Represents the projectile fired by AcidWave.
     Moves in the specified direction and rotates the sprite to face the direction of movement.
     """
-    def __init__(self, ability, direction, *groups):
+    despawn_off_screen = True # Flies in a straight line, so once it is off screen it is not coming back
+
+    def reset(self, ability, direction, *groups):
         """
-        Initializes the AcidWave projectile and rotates its image to face the direction.
+        Sets up the AcidWave projectile, new or recycled, and rotates its image to face the direction.
         
         Args:
             ability (AcidWave): Reference to the AcidWave ability.
             direction (tuple): The (dx, dy) direction the projectile will move.
             groups (sprite groups): The groups this sprite will belong to.
         """
-        self.ability = ability
         self.direction = direction  # The direction (up, down, left, right, or diagonal)
-        super().__init__(ability, *groups)
-        self.targets = "player"
+        super().reset(ability, *groups)
+        self.collision_layer = CollisionLayer.ENEMY_PROJECTILE
+        self.collides_with = CollisionLayer.PLAYER
         self.target = None  # No specific target; moves in a fixed direction
         
         # Rotate the sprite image based on direction
+        self.rotation_variant = get_rotation_variant(self.calculate_rotation_angle(self.direction))
         self.rotate_sprite()
+        center = self.rect.center
+        self.rect.size = self.image.get_size() # Rotating changes the size of the frame
+        self.rect.center = center
+        self.on_moved()
 
     def rotate_sprite(self):
         """
-        Rotates the projectile's sprite image based on the direction it's moving.
+        Shows the current animation frame rotated to face the direction the projectile is moving.
+        The rotated frames are built once and shared by every projectile going the same way.
         """
-        # Calculate the angle to rotate based on the (dx, dy) direction
-        angle = self.calculate_rotation_angle(self.direction)
-
-        # Rotate the sprite image by the calculated angle
-        rotated_image = pygame.transform.rotate(self.animation.image, angle)
-        
-        # Set colorkey again if needed (assuming transparency is defined in load_image)
-        if self.image.get_colorkey() is not None:
-            rotated_image.set_colorkey(self.image.get_colorkey())
-
-        # Recompute rect after rotation (to avoid position misalignment)
-        self.rect = rotated_image.get_rect(center=self.rect.center)
-
-        # Replace the image with the newly rotated image
-        self.image = rotated_image
+        rotated_frames = frame_cache.get_variant(self.animation.frames, self.rotation_variant)
+        self.image = rotated_frames[self.animation.current_frame]
 
     def calculate_rotation_angle(self, direction):
         """
@@ -134,6 +130,7 @@ class AcidWaveSprite(AbilityCollisionSprite):
         
         # Move in the specified direction
         self.rect.x, self.rect.y = MovementManager.move((self.rect.x, self.rect.y), self.ability.speed, dt, direction=self.direction)
+        self.on_moved()
         
         # Rotate the sprite after updating the animation
         self.rotate_sprite()
@@ -12,12 +12,13 @@ class Frostbind(Ability):
         self.time_since_last_use = 0
 
     def spawn_projectile(self):
-        IceBoltSprite(self, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(IceBoltSprite, self, self.game_manager.all_ability_sprites)
 
 class IceBoltSprite(AbilityCollisionSprite):
-    def __init__(self, ability, *groups):
-        self.ability = ability
-        super().__init__(ability, *groups)
+    despawn_off_screen = True # Flies in a straight line, so once it is off screen it is not coming back
+
+    def reset(self, ability, *groups):
+        super().reset(ability, *groups)
         self.closest_enemy = self.game_manager.enemy_manager.get_closest_enemy()
         self.direction = MovementManager.calculate_direction((self.rect.center), (self.closest_enemy.rect.center))
 
@@ -27,6 +28,7 @@ class IceBoltSprite(AbilityCollisionSprite):
         # Continue moving in given direction
         if self.closest_enemy:
             self.rect.x, self.rect.y = MovementManager.move((self.rect.x, self.rect.y), self.ability.speed,  dt, direction=self.direction)
+            self.on_moved()
 
     def on_collision(self, target):
         super().on_collision(target)
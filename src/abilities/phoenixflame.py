@@ -12,13 +12,9 @@ class PhoenixFlame(Ability):
         self.time_since_last_use = 0
 
     def spawn_projectile(self):
-        PhoenixFlameSprite(self, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(PhoenixFlameSprite, self, self.game_manager.all_ability_sprites)
 
 class PhoenixFlameSprite(AbilityCollisionSprite):
-    def __init__(self, ability, *groups):
-        self.ability = ability
-        super().__init__(ability, *groups)
-
     def update(self, dt):
         super().update(dt)
         # Update the position based on the new angle
@@ -26,6 +22,7 @@ class PhoenixFlameSprite(AbilityCollisionSprite):
         center = self.game_manager.player.rect.center  # Player's center as the orbit center
         new_pos, self.angle = MovementManager.move_in_a_circle(center, self.ability.radius, self.angle, self.ability.speed/10, dt)
         self.rect.center = new_pos
+        self.on_moved()
 
     def on_collision(self, target):
         super().on_collision(target)
@@ -12,12 +12,13 @@ class Pyrebrand(Ability):
         self.time_since_last_use = 0
 
     def spawn_projectile(self):
-        PyrebrandSprite(self, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(PyrebrandSprite, self, self.game_manager.all_ability_sprites)
 
 class PyrebrandSprite(AbilityCollisionSprite):
-    def __init__(self, ability, *groups):
-        self.ability = ability
-        super().__init__(ability, *groups)
+    despawn_off_screen = True # Flies in a straight line, so once it is off screen it is not coming back
+
+    def reset(self, ability, *groups):
+        super().reset(ability, *groups)
         self.closest_enemy = self.game_manager.enemy_manager.get_closest_enemy()
         target_pos = None
         if self.closest_enemy:
@@ -29,6 +30,7 @@ class PyrebrandSprite(AbilityCollisionSprite):
         
         # Continue moving in given direction
         self.rect.x, self.rect.y = MovementManager.move((self.rect.x, self.rect.y), self.ability.speed,  dt, direction=self.direction)
+        self.on_moved()
 
     def on_collision(self, target):
         super().on_collision(target)
@@ -1,6 +1,5 @@
 import math
 import pygame
-import random
 from ability import Ability, AbilityCollisionSprite
 from enum import Enum
 from movement_manager import MovementManager
@@ -21,22 +20,21 @@ class Soulwarden(Ability):
         self.time_since_last_use = 0
 
     def spawn_projectile(self):
-        SoulwardenSprite(self, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(SoulwardenSprite, self, self.game_manager.all_ability_sprites)
 
 class SoulwardenSprite(AbilityCollisionSprite):
-    def __init__(self, ability, *groups):
-        self.ability = ability
-        super().__init__(ability, *groups)
-        self.time_since_last_dash = 0
+    def reset(self, ability, *groups):
+        super().reset(ability, *groups)
+        # Game times of the last dash and pulse, see TimerManager
+        self.last_dash_time = self.game_manager.timer_manager.time
         self.time_for_next_dash = 1
-        self.time_since_last_pulse = 0
+        self.last_pulse_time = self.game_manager.timer_manager.time
         self.movement_target = None
         self.state = WardenState.HUNTING
 
     def update(self, dt):
         super().update(dt)
-        self.time_since_last_dash += dt
-        self.time_since_last_pulse += dt
+        now = self.game_manager.timer_manager.time
 
         def move_towards_target(target_pos, speed_multiplier=1):
             self.rect.x, self.rect.y = MovementManager.move(
@@ -45,6 +43,7 @@ class SoulwardenSprite(AbilityCollisionSprite):
                 dt, 
                 target_pos
             )
+            self.on_moved()
 
         if self.state == WardenState.HUNTING:
             closest_enemy = self.game_manager.enemy_manager.get_closest_enemy()
@@ -60,15 +59,15 @@ class SoulwardenSprite(AbilityCollisionSprite):
                 self.movement_target = None
 
         self.warden_dash_alteration = next((x for x in self.alterations if x.debug_name == "warden_dash"), None)
-        if self.warden_dash_alteration and self.time_since_last_dash > self.time_for_next_dash:
+        if self.warden_dash_alteration and now - self.last_dash_time > self.time_for_next_dash:
             self.update_warden_dash()
 
         self.warden_pulse_alteration = next((x for x in self.alterations if x.debug_name == "warden_pulse"), None)
-        if self.warden_pulse_alteration and self.time_since_last_pulse > self.warden_pulse_alteration.time_between_pulses:
+        if self.warden_pulse_alteration and now - self.last_pulse_time > self.warden_pulse_alteration.time_between_pulses:
             self.trigger_warden_pulse()
 
         self.warden_constellation_alteration = next((x for x in self.alterations if x.debug_name == "warden_constellation"), None)
-        if self.warden_constellation_alteration and self.time_since_last_dash > self.time_for_next_dash:
+        if self.warden_constellation_alteration and now - self.last_dash_time > self.time_for_next_dash:
             self.update_warden_constellation()
 
     def update_warden_dash(self):
@@ -82,14 +81,14 @@ class SoulwardenSprite(AbilityCollisionSprite):
 
             self.movement_target = pygame.Rect(self.rect.x + dx * 200, self.rect.y + dy * 200, self.rect.width, self.rect.height)
             self.initial_dash_position = (self.rect.x, self.rect.y)
-            self.time_since_last_dash = 0
-            self.time_for_next_dash = self.warden_dash_alteration.time_between_dashes + random.random()
+            self.last_dash_time = self.game_manager.timer_manager.time
+            self.time_for_next_dash = self.warden_dash_alteration.time_between_dashes + self.game_manager.rng.get("abilities").random()
             self.state = WardenState.DASHING
     
     def trigger_warden_pulse(self):
         pulse_ability = WardenPulseAbility(self.game_manager, damage = self.ability.damage, ability_owner=self.ability.ability_owner)
         pulse_ability.trigger(self.rect.center)
-        self.time_since_last_pulse = 0
+        self.last_pulse_time = self.game_manager.timer_manager.time
 
     def update_warden_constellation(self):
         print("UPDATE WARDEN CONSTELLATION")
@@ -107,14 +106,13 @@ class WardenPulseAbility(Ability):
         self.damage = damage
 
     def trigger(self, pos):
-        pulse = WardenPulseSprite(self, pos)
+        pulse = self.game_manager.pools.acquire(WardenPulseSprite, self, pos)
         self.game_manager.all_sprites.add(pulse)
         self.time_since_last_use = 0
 
 class WardenPulseSprite(AbilityCollisionSprite):
-    def __init__(self, ability, pos):
-        self.ability = ability
-        super().__init__(ability)
+    def reset(self, ability, pos):
+        super().reset(ability)
         self.rect.center = pos
     
     def on_collision(self, target):
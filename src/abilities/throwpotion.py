@@ -12,21 +12,21 @@ class ThrowPotion(Ability):
         self.time_since_last_use = 0
 
     def spawn_projectile(self):
-        ThrowPotionSprite(self, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(ThrowPotionSprite, self, self.game_manager.all_ability_sprites)
 
 class ThrowPotionSprite(AbilityCollisionSprite):
-    def __init__(self, ability, *groups):
-        self.ability = ability
-        super().__init__(ability, *groups)
+    def reset(self, ability, *groups):
+        super().reset(ability, *groups)
         self.triggers_on_collision = False
         self.start_pos = self.game_manager.player.get_pos()
-        self.end_pos = MovementManager.get_random_position_on_circle(self.start_pos, self.ability.radius)
+        self.end_pos = MovementManager.get_random_position_on_circle(self.start_pos, self.ability.radius, rng=self.game_manager.rng.get("abilities"))
         self.t = 0.0
         self.control_point = MovementManager.calculate_control_point(self.start_pos, self.end_pos, self.ability.curve_height)
     
     def update(self, dt):
         super().update(dt)
         self.rect.x, self.rect.y = MovementManager.move_along_curve(self.start_pos , self.end_pos, self.control_point, self.t)
+        self.on_moved()
         self.t += self.ability.speed * dt
 
         if self.t >= 1: # End of curve
@@ -48,14 +48,13 @@ class PotionExplosionAbility(Ability):
         super().__init__(self.ability_info, game_manager, game_manager.player)
 
     def trigger(self, pos):
-        explosion = PotionExplosionSprite(self, pos)
+        explosion = self.game_manager.pools.acquire(PotionExplosionSprite, self, pos)
         self.game_manager.all_sprites.add(explosion)
         self.time_since_last_use = 0
 
 class PotionExplosionSprite(AbilityCollisionSprite):
-    def __init__(self, ability, pos):
-        self.ability = ability
-        super().__init__(ability)
+    def reset(self, ability, pos):
+        super().reset(ability)
         (self.rect.x, self.rect.y) = pos
     
     def on_collision(self, target):
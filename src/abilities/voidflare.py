@@ -17,15 +17,14 @@ class VoidFlare(Ability):
         self.time_since_last_use = 0
 
     def spawn_projectile(self):
-        VoidFlareSprite(self, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(VoidFlareSprite, self, self.game_manager.all_ability_sprites)
 
 class VoidFlareSprite(AbilityCollisionSprite):
-    def __init__(self, ability, *groups):
-        self.ability = ability
+    def reset(self, ability, *groups):
         self.time_since_zoom = 0
         self.state = VoidFlareState.RESTING
         self.target_pos = None
-        super().__init__(ability, *groups)
+        super().reset(ability, *groups)
 
     def update(self, dt):
         super().update(dt)
@@ -39,6 +38,7 @@ class VoidFlareSprite(AbilityCollisionSprite):
 
         if self.state == VoidFlareState.ZOOMING:
             self.rect.x, self.rect.y = MovementManager.move((self.rect.x, self.rect.y), self.ability.speed, dt, target_pos=(self.target_pos[0], self.target_pos[1]))
+            self.on_moved()
             if abs(self.rect.x - self.target_pos[0]) <= 5 and abs(self.rect.y - self.target_pos[1]) <= 5:
                 self.state = VoidFlareState.RESTING
                 self.time_since_zoom = 0
@@ -1,4 +1,5 @@
 from ability import Ability, AbilityCollisionSprite
+from collision_manager import CollisionLayer
 from movement_manager import MovementManager
 
 class WebWrap(Ability):
@@ -12,13 +13,15 @@ class WebWrap(Ability):
         self.time_since_last_use = 0
 
     def spawn_projectile(self):
-        WebWrapSprite(self, self.game_manager.all_ability_sprites)
+        self.game_manager.pools.acquire(WebWrapSprite, self, self.game_manager.all_ability_sprites)
 
 class WebWrapSprite(AbilityCollisionSprite):
-    def __init__(self, ability, *groups):
-        self.ability = ability
-        super().__init__(ability, *groups)
-        self.targets = "player"
+    despawn_off_screen = True # Flies in a straight line, so once it is off screen it is not coming back
+
+    def reset(self, ability, *groups):
+        super().reset(ability, *groups)
+        self.collision_layer = CollisionLayer.ENEMY_PROJECTILE
+        self.collides_with = CollisionLayer.PLAYER
         self.target = self.game_manager.player
         self.direction = MovementManager.calculate_direction((self.rect.center), (self.target.rect.center))
 
@@ -28,6 +31,7 @@ class WebWrapSprite(AbilityCollisionSprite):
         # Continue moving in given direction
         if self.target:
             self.rect.x, self.rect.y = MovementManager.move((self.rect.x, self.rect.y), self.ability.speed,  dt, direction=self.direction)
+            self.on_moved()
 
     def on_collision(self, target):
         super().on_collision(target)
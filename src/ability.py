@@ -3,8 +3,11 @@ import helpers
 import os
 import pygame
 from animated_sprite import AnimatedSprite
+from collision_manager import CollisionLayer
 from config.settings import ABILITIES_IMAGES_ROOT_PATH, GLOBAL_STAGGERED_PROJECTILE_RATE
 from damagetext import DamageText
+from pool_manager import Poolable
+from sound_manager import SoundPriority
 from enum import Enum
 
 class UpgradeRarity(Enum):
@@ -52,7 +55,6 @@ class Ability(ABC):
         self.level = 1
         self.upgrade_options = self.populate_upgrade_options()
         self.learnable_alterations = self.populate_learnable_alterations()
-        self.queued_projectile_triggers = []
         self.ability_alteration = []
 
         self.time_since_last_use = 0
@@ -61,17 +63,14 @@ class Ability(ABC):
     def trigger(self, player):
         pass
 
-    def update(self, dt):
-        """Update ability's state."""
-        self.time_since_last_use += dt
-        temp_list = []
-        for queued_trigger in self.queued_projectile_triggers:
-            queued_trigger -= dt
-            if queued_trigger > 0:
-                temp_list.append(queued_trigger)
-            else:
-                self.spawn_projectile()
-        self.queued_projectile_triggers = temp_list
+    @property
+    def time_since_last_use(self):
+        # Kept as the game time of the last use rather than counted up every step
+        return self.game_manager.timer_manager.time - self.last_use_time
+
+    @time_since_last_use.setter
+    def time_since_last_use(self, value):
+        self.last_use_time = self.game_manager.timer_manager.time - value
 
     def can_trigger(self):
         """Check if ability can be triggered."""
@@ -127,73 +126,123 @@ class Ability(ABC):
         pass
 
     def queue_projectiles(self, num_projectiles, stagger_rate=GLOBAL_STAGGERED_PROJECTILE_RATE):
+        """Spawn `num_projectiles` projectiles, `stagger_rate` seconds apart, starting on the next step."""
         for index in range(num_projectiles):
-            self.queued_projectile_triggers.append(index * stagger_rate)
+            self.game_manager.timer_manager.schedule(index * stagger_rate, self.spawn_queued_projectile)
+
+    def spawn_queued_projectile(self):
+        if self.ability_owner.alive(): # A boss can die before all of its volley is out
+            self.spawn_projectile()
+
+class AbilityCollisionSprite(Poolable, pygame.sprite.Sprite):
+    """
+    A sprite that hits things. Hit detection isn't done here: the sprite registers with the
+    CollisionManager, which calls handle_collisions once per step with whatever it overlaps in
+    `collides_with`. Sprites that hurt the player set collision_layer to ENEMY_PROJECTILE and
+    collides_with to PLAYER.
+
+    Spawn them through game_manager.pools.acquire so they are recycled. __init__ only builds
+    what is kept across reuses (the animation, the rect, the cooldown dict) and reset() sets up
+    everything else in place, so subclasses set themselves up in reset() too. Projectiles that fly in a straight line set despawn_off_screen, so they
+    are killed once they are well outside the camera instead of living out their duration.
+    """
+    despawn_off_screen = False
+    animation_step = 0 # LodManager step it last picked up an animation frame on while off screen
+
+    def __init__(self, ability, *args):
+        """
+        :param args: The rest of the arguments of the subclass's reset(), usually the groups.
+        """
+        super().__init__()
+        self.animation = AnimatedSprite(ability.animation_frames, 0, 0, animation_speed=100) #TODO. Better source for animation_speed
+        self.rect = self.animation.rect
+        self.enemy_cooldowns = {}
+        self.reset(ability, *args)
 
-class AbilityCollisionSprite(pygame.sprite.Sprite):
-    def __init__(self, ability, *groups):
-        super().__init__(*groups)
+    def reset(self, ability, *groups):
         self.ability = ability
         self.alterations = ability.ability_alteration
         self.angle = 0  # Starting angle in radians
-        self.animation = AnimatedSprite(ability.animation_frames, 0, 0, animation_speed=100) #TODO. Better source for animation_speed
+        self.animation.frames = ability.animation_frames
+        self.animation.restart()
         self.duration = self.ability.duration
         self.enemies_hit = 0
-        self.enemy_cooldowns = {}
+        self.clear_enemy_cooldowns()
         self.game_manager = ability.game_manager
         self.image = self.animation.image
         self.on_enemy_collision_text = ability.enemy_hit_text if getattr(self.ability, 'enemy_hit_text', None) else str(ability.damage)
         self.player = ability.game_manager.player
-        self.rect = self.image.get_rect(center=(self.ability.ability_owner.rect.center))
-        self.targets = "enemies"
+        self.rect.size = self.image.get_size()
+        self.rect.center = self.ability.ability_owner.rect.center
+        self.collision_layer = CollisionLayer.PLAYER_PROJECTILE
+        self.collides_with = CollisionLayer.ENEMY | CollisionLayer.NEUTRAL
         self.time_since_spawned = 0
         self.triggers_on_collision = True
+        self.game_manager.collision_manager.add(self)
+        self.add(*groups)
         self.play_trigger_sound()
 
+    def on_moved(self):
+        """Call after changing the rect, so the spatial index finds the sprite where it is now."""
+        self.game_manager.spatial_index.move(self)
+
     def can_collide(self, target):
         # Check if the ability can collide with a specific enemy
         return self.enemy_cooldowns.get(target, 0) <= 0
 
     def on_collision(self, target):
         self.enemy_cooldowns[target] = self.ability.damage_rate
+        hit_cooldown_sprites = getattr(target, "hit_cooldown_sprites", None) # NPCs clear the cooldowns on them when killed
+        if hit_cooldown_sprites is not None:
+            hit_cooldown_sprites.add(self)
+
+    def clear_enemy_cooldowns(self):
+        for enemy in self.enemy_cooldowns:
+            hit_cooldown_sprites = getattr(enemy, "hit_cooldown_sprites", None)
+            if hit_cooldown_sprites is not None:
+                hit_cooldown_sprites.discard(self)
+        self.enemy_cooldowns.clear()
+
+    def kill(self):
+        self.clear_enemy_cooldowns()
+        super().kill()
 
     def update(self, dt):
         self.time_since_spawned += dt
         self.duration -= dt
-        self.animation.update()
-        self.image = self.animation.image
-        if self.triggers_on_collision:
-            self.check_for_collision()
-        
+        if self.game_manager.lod_manager.is_animation_due(self):
+            self.animation.update()
+            self.image = self.animation.image
+
         # Update cooldowns for each enemy
         for enemy in list(self.enemy_cooldowns):
             self.enemy_cooldowns[enemy] -= dt
             if self.enemy_cooldowns[enemy] <= 0:
                 del self.enemy_cooldowns[enemy]  # Remove enemy from cooldown tracking
+                hit_cooldown_sprites = getattr(enemy, "hit_cooldown_sprites", None)
+                if hit_cooldown_sprites is not None:
+                    hit_cooldown_sprites.discard(self)
 
         # Check if duration has expired and remove the sprite
         if self.time_since_spawned > self.duration:
             self.kill()
+        elif self.despawn_off_screen and not self.game_manager.camera.despawn_rect.colliderect(self.rect):
+            self.kill()
 
-    def draw(self, screen):
-        screen_pos = self.rect.move(-self.game_manager.camera.topleft[0], -self.game_manager.camera.topleft[1])
-        screen.blit(self.image, screen_pos)
-
-    def check_for_collision(self):
-        if self.targets == "enemies":
-            enemy_sprite_hits = pygame.sprite.spritecollide(self, self.ability.game_manager.all_enemies, dokill=False)
-            enemy_sprite_hits.extend(pygame.sprite.spritecollide(self, self.ability.game_manager.all_neutral_npcs, dokill=False))
-        if self.targets == "player":
-            enemy_sprite_hits = pygame.sprite.spritecollide(self, self.ability.game_manager.player_sprites, dokill=False)
-        for enemy in enemy_sprite_hits:
-            if self.can_collide(enemy):
+    def handle_collisions(self, targets):
+        """Called by the CollisionManager with everything this sprite overlaps this step."""
+        for enemy in targets:
+            if enemy.alive() and self.can_collide(enemy):
                 self.on_collision(enemy)
                 self.enemies_hit += 1
-                damage_text = DamageText(self.on_enemy_collision_text, enemy.rect.topleft)
-                self.game_manager.all_sprites.add(damage_text)
+                if self.game_manager.quality_governor.allow_damage_text():
+                    damage_text = self.game_manager.pools.acquire(DamageText, self.on_enemy_collision_text, enemy.rect.topleft)
+                    self.game_manager.all_sprites.add(damage_text)
+                    self.game_manager.damage_texts.add(damage_text)
         if getattr(self.ability, 'max_hit_count', None):
             if self.enemies_hit >= self.ability.max_hit_count:
                 self.kill()
     
     def play_trigger_sound(self):
-        self.ability.game_manager.sound_manager.play_sound(self.ability.debug_name+"_cast")
\ No newline at end of file
+        priority = SoundPriority.PLAYER_CAST if self.ability.ability_owner is self.player else SoundPriority.BOSS
+        self.ability.game_manager.sound_manager.play_sound(self.ability.debug_name+"_cast", priority=priority)
\ No newline at end of file
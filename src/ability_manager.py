@@ -1,4 +1,3 @@
-import random
 from ability import UpgradeType
 
 class AbilityManager():
@@ -22,7 +21,7 @@ class AbilityManager():
             return upgrade_options
 
         # Return a random weighted sample of 3 options
-        return random.choices(upgrade_options, weights=upgrade_weights, k=3)
+        return self.game_manager.rng.get("upgrades").choices(upgrade_options, weights=upgrade_weights, k=3)
     
     def get_alteration_options(self):
         # Combine list construction and weight extraction
@@ -41,7 +40,7 @@ class AbilityManager():
             return alteration_options
 
         # Return a random weighted sample of 3 options
-        return random.choices(alteration_options, weights=alteration_weights, k=3)
+        return self.game_manager.rng.get("upgrades").choices(alteration_options, weights=alteration_weights, k=3)
 
     def select_upgrade(self, option):
         for ability in self.game_manager.player.abilities:
@@ -1,19 +1,31 @@
 import pygame
+from animation_clock import game_clock
 
 class AnimatedSprite(pygame.sprite.Sprite):
-    def __init__(self, frames, x, y, animation_speed):
+    def __init__(self, frames, x, y, animation_speed, clock=game_clock):
+        """
+        :param animation_speed: Milliseconds each frame is shown for.
+        :param clock: The AnimationClock the frames are played from.
+        """
         super().__init__()
         self.frames = frames
-        self.current_frame = 0
-        self.image = self.frames[self.current_frame]
-        self.rect = self.image.get_rect(topleft=(x, y))
+        self.clock = clock
+        self.frame_duration = animation_speed / 1000
         self.animation_speed = animation_speed
-        self.last_update = pygame.time.get_ticks()
-    
+        self.restart()
+        self.rect = self.image.get_rect(topleft=(x, y))
+
+    def restart(self, phase=None):
+        """
+        Back to the first frame, e.g. when the sprite using it is recycled from a pool.
+
+        :param phase: Frames to offset the animation by instead, see AnimationClock.
+        """
+        if phase is None:
+            phase = self.clock.start_phase(len(self.frames), self.frame_duration)
+        self.phase = phase
+        self.update()
+
     def update(self):
-        now = pygame.time.get_ticks()
-        time_since_last_update = now - self.last_update
-        if time_since_last_update > self.animation_speed:
-            self.last_update = now
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-            self.image = self.frames[self.current_frame]
\ No newline at end of file
+        self.current_frame = self.clock.get_frame_index(len(self.frames), self.frame_duration, self.phase)
+        self.image = self.frames[self.current_frame]
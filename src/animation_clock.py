@@ -0,0 +1,46 @@
+class AnimationClock:
+    """
+    One timeline that every animation reading it is played from.
+
+    Nothing counts time per entity. An animation shows frame
+    (time // frame_duration + phase) % frame count of the clock it reads, so all it keeps is a
+    phase: a whole number of frames it is offset by. The number of whole frames elapsed is worked
+    out once per frame duration each tick and shared, so the hundreds of enemies walking with the
+    same frame duration cost one division between them, and stepping the clock costs the same
+    however many animations read it.
+
+    start_phase() gives the phase that shows frame 0 right now, for animations that start when
+    their entity spawns. Any other phase just shows a different frame at the same flips, e.g. to
+    keep a crowd from animating in lockstep.
+    """
+    def __init__(self):
+        self.time = 0.0
+        self.frame_numbers = {} # Frame duration -> whole frames elapsed at `time`
+
+    def tick(self, dt):
+        self.time += dt
+        self.frame_numbers.clear()
+
+    def reset(self):
+        """Back to time 0, e.g. at the start of a run so its animations don't depend on the ones before."""
+        self.time = 0.0
+        self.frame_numbers.clear()
+
+    def get_frame_number(self, frame_duration):
+        """How many frames of `frame_duration` seconds have passed since time 0."""
+        frame_number = self.frame_numbers.get(frame_duration)
+        if frame_number is None:
+            frame_number = self.frame_numbers[frame_duration] = int(self.time // frame_duration)
+        return frame_number
+
+    def get_frame_index(self, frame_count, frame_duration, phase=0):
+        return (self.get_frame_number(frame_duration) + phase) % frame_count
+
+    def start_phase(self, frame_count, frame_duration):
+        """The phase that shows frame 0 now."""
+        return -self.get_frame_number(frame_duration) % frame_count
+
+# Gameplay animations run on simulation time, so they stop with the simulation for menus like the level up screen
+game_clock = AnimationClock()
+# Menu animations run on rendered frame time
+menu_clock = AnimationClock()
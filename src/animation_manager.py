@@ -1,42 +1,57 @@
-import os
-from helpers import load_image
+from animation_clock import game_clock
+from frame_cache import frame_cache
+from helpers import load_animation_frames
+
+ANIMATION_STATES = ("idle", "walk", "attack") #TODO: MAKE THIS BETTER
 
 class AnimationManager():
-    def __init__(self, entity, scale=1):
+    def __init__(self, entity, scale=1, clock=game_clock):
+        """
+        :param clock: The AnimationClock the animations are played from.
+        """
         self.animations_root = entity.animations_root
+        self.clock = clock
         self.animations = self.get_animations(scale)
         self.current_animation = self.animations['idle'] # TODO: REVISIT THIS
 
     def get_animations(self, scale):
         animations = {}
-        states = ["idle", "walk", "attack"] #TODO: MAKE THIS BETTER
-        for state in states:
-            frames = []
-            for file_name in os.listdir(self.animations_root):
-                file_name_elements = file_name.split("_")
-                if file_name_elements[0] == state:
-                    frames.append(load_image(os.path.join(self.animations_root, f"{file_name}"), scale_factor=scale))
-            animations[state] = Animation(frames)
+        for state in ANIMATION_STATES:
+            # Frames come from the shared cache, so every NPC of a type uses the same surfaces
+            frames = load_animation_frames(self.animations_root, prefix=state, scale_factor=scale)
+            animations[state] = Animation(frames, self.clock)
         return animations
-    
-    def update(self, dt):
-        self.current_animation.update(dt)
 
-    def get_frame(self):
-        return self.current_animation.frames[self.current_animation.current_frame_index]
+    def restart(self, phase=None):
+        """
+        :param phase: Frames to offset the animations by, see AnimationClock. None starts them on their first frame.
+        """
+        self.current_animation = self.animations['idle']
+        for animation in self.animations.values():
+            animation.restart(phase)
+
+    def get_frame(self, variant=None):
+        """
+        :param variant: Optional frame variant (see frame_cache), e.g. a tint for a status effect.
+        """
+        frames = self.current_animation.frames
+        if variant is not None:
+            frames = frame_cache.get_variant(frames, variant)
+        return frames[self.current_animation.current_frame_index]
 
 
 class Animation:
-    def __init__(self, frames, frame_duration = 0.3):
+    def __init__(self, frames, clock=game_clock, frame_duration = 0.3):
         self.frames = frames
+        self.clock = clock
         self.frame_duration = frame_duration  # Time between frames
-        self.current_time = 0
-        self.current_frame_index = 0
+        self.restart()
 
-    def update(self, dt):
-        self.current_time += dt
-        if self.current_time >= self.frame_duration:
-            self.current_frame_index = (self.current_frame_index + 1) % len(self.frames)
-            self.current_time = 0
+    def restart(self, phase=None):
+        if phase is None:
+            phase = self.clock.start_phase(max(len(self.frames), 1), self.frame_duration) # Some states have no frames
+        self.phase = phase
 
-    
\ No newline at end of file
+    @property
+    def current_frame_index(self):
+        return self.clock.get_frame_index(max(len(self.frames), 1), self.frame_duration, self.phase)
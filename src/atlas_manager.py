@@ -0,0 +1,78 @@
+import decoded_assets
+import json
+import os
+import pygame
+from config.settings import ATLAS_MANIFEST_PATH, USE_ATLASES
+
+def normalize_path(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+class AtlasManager:
+    """
+    Serves image files out of the atlas pages written by atlas_packer.py.
+
+    The manifest is read the first time anything is asked for. A page is decoded and converted
+    the first time one of its frames is needed, and every frame on it is handed out as a
+    subsurface, so the frames of a whole category share one surface and one file read.
+
+    Paths the manifest doesn't know (or every path, without a manifest) return None and the
+    caller loads the file itself. The manifest describes the assets as they were when the packer
+    last ran, so it has to be run again after frames are changed.
+    """
+    def __init__(self, manifest_path=ATLAS_MANIFEST_PATH, enabled=USE_ATLASES):
+        self.manifest_path = manifest_path
+        self.enabled = enabled
+        self.frames = None # Image path -> (page key, rect), None until the manifest is read
+        self.directories = {} # Directory -> file names it had when packed
+        self.page_paths = {} # (atlas name, page index) -> page file
+        self.pages = {} # (atlas name, page index) -> converted Surface
+
+    def load_manifest(self):
+        self.frames = {}
+        if not (self.enabled and os.path.exists(self.manifest_path)):
+            return
+        with open(self.manifest_path, 'r') as file:
+            manifest = json.load(file)
+        atlas_root = os.path.dirname(self.manifest_path)
+        for atlas_name, atlas in manifest["atlases"].items():
+            for page_index, page_file in enumerate(atlas["pages"]):
+                self.page_paths[(atlas_name, page_index)] = os.path.join(atlas_root, page_file)
+            for image_path, (page_index, x, y, width, height) in atlas["frames"].items():
+                self.frames[image_path] = ((atlas_name, page_index), pygame.Rect(x, y, width, height))
+                directory, file_name = image_path.rsplit("/", 1)
+                self.directories.setdefault(directory, []).append(file_name)
+        print(f"LOGGING: Loaded atlas manifest with {len(self.frames)} frames")
+
+    def get_unloaded_page_paths(self):
+        """The page files not decoded yet, for preloading."""
+        if self.frames is None:
+            self.load_manifest()
+        return [page_path for page_key, page_path in self.page_paths.items() if page_key not in self.pages]
+
+    def list_directory(self, path):
+        """The file names packed from directory `path`, or None when it wasn't packed."""
+        if self.frames is None:
+            self.load_manifest()
+        file_names = self.directories.get(normalize_path(path))
+        return list(file_names) if file_names is not None else None
+
+    def get_image(self, path):
+        """
+        The image at `path` as a subsurface of its atlas page, or None when it wasn't packed.
+        The subsurface shares pixels with the page, so it must not be drawn on.
+        """
+        if self.frames is None:
+            self.load_manifest()
+        frame = self.frames.get(normalize_path(path))
+        if frame is None:
+            return None
+        page_key, rect = frame
+        page = self.pages.get(page_key)
+        if page is None:
+            page = decoded_assets.load_image_file(self.page_paths[page_key])
+            if pygame.display.get_surface() is not None:
+                page = page.convert_alpha()
+            self.pages[page_key] = page
+        return page.subsurface(rect)
+
+atlas_manager = AtlasManager()
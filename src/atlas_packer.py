@@ -0,0 +1,126 @@
+import argparse
+import json
+import math
+import os
+import sys
+import pygame
+from config.settings import ABILITIES_IMAGES_ROOT_PATH, ITEM_IMAGES_ROOT_PATH, NPCS_IMAGE_ROOT, HEROES_IMAGE_ROOT, ATLAS_ROOT_PATH, ATLAS_MANIFEST_PATH, ATLAS_MAX_SIZE, ATLAS_MAX_FRAME_SIZE, ATLAS_PADDING
+
+IMAGE_EXTENSIONS = (".png",)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Packs the animation frames under assets/ into atlas pages plus a manifest the game loads them from. "
+                                     "Run it from the repository root again whenever a frame is added or changed.")
+    parser.add_argument("--output", default=ATLAS_ROOT_PATH, help="Directory the atlas pages and manifest.json are written to")
+    parser.add_argument("--max-size", type=int, default=ATLAS_MAX_SIZE, help="Maximum width and height of an atlas page, in pixels")
+    parser.add_argument("--padding", type=int, default=ATLAS_PADDING, help="Empty pixels left around every frame")
+    return parser.parse_args()
+
+def get_atlas_groups():
+    """
+    {atlas name: [image paths]}. One atlas per category, except heroes, which get one each: a
+    stage only ever plays its own hero, so it only needs to load that hero's atlas.
+    """
+    groups = {
+        "abilities": collect_images(ABILITIES_IMAGES_ROOT_PATH),
+        "items": collect_images(ITEM_IMAGES_ROOT_PATH),
+        "npcs": collect_images(NPCS_IMAGE_ROOT),
+    }
+    for hero_name in sorted(os.listdir(HEROES_IMAGE_ROOT)):
+        hero_path = os.path.join(HEROES_IMAGE_ROOT, hero_name)
+        if os.path.isdir(hero_path):
+            groups[f"hero_{hero_name}"] = collect_images(hero_path)
+    return groups
+
+def collect_images(root):
+    image_paths = []
+    for directory, directory_names, file_names in os.walk(root):
+        directory_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                image_paths.append(os.path.join(directory, file_name))
+    return image_paths
+
+def pack_shelves(sizes, max_size, padding):
+    """
+    Shelf packing: tallest images first, placed left to right in rows as tall as the row's first
+    image, starting a new page when a row no longer fits.
+
+    :param sizes: {key: (width, height)}
+    :return: ({key: (page, x, y)}, [(page_width, page_height)])
+    """
+    placements = {}
+    pages = [] # [width, height] used on each page so far
+    # Shelves about as wide as a square holding everything, so small atlases don't become one long strip of empty space
+    total_area = sum((width + padding * 2) * (height + padding * 2) for width, height in sizes.values())
+    widest = max((width + padding * 2 for width, _ in sizes.values()), default=0)
+    shelf_width = min(max_size, max(widest, math.ceil(math.sqrt(total_area * 1.1))))
+    x = y = shelf_height = 0
+    for key, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        padded_width, padded_height = width + padding * 2, height + padding * 2
+        if pages and x + padded_width > shelf_width:
+            # Shelf is full, start the next one below it
+            y += shelf_height
+            x = shelf_height = 0
+        if not pages or y + padded_height > max_size:
+            pages.append([0, 0])
+            x = y = shelf_height = 0
+        placements[key] = (len(pages) - 1, x + padding, y + padding)
+        x += padded_width
+        shelf_height = max(shelf_height, padded_height)
+        page = pages[-1]
+        page[0] = max(page[0], x)
+        page[1] = max(page[1], y + shelf_height)
+    return placements, [tuple(page) for page in pages]
+
+def to_manifest_path(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+def pack_atlas(name, image_paths, output_dir, max_size, padding):
+    """Packs one atlas group into numbered pages and returns its manifest entry."""
+    images = {}
+    for image_path in image_paths:
+        image = pygame.image.load(image_path)
+        if max(image.get_size()) > ATLAS_MAX_FRAME_SIZE or max(image.get_size()) + padding * 2 > max_size:
+            # Big one-off images like the character portraits gain nothing from sharing a page
+            print(f"LOGGING: {image_path} is too large to pack, it will be loaded on its own")
+            continue
+        images[to_manifest_path(image_path)] = image
+    placements, page_sizes = pack_shelves({path: image.get_size() for path, image in images.items()}, max_size, padding)
+
+    pages = [pygame.Surface(size, pygame.SRCALPHA) for size in page_sizes]
+    for page in pages:
+        page.fill((0, 0, 0, 0))
+    frames = {}
+    for path, image in images.items():
+        page_index, x, y = placements[path]
+        # Taking the maximum against a cleared page copies the pixels exactly, alpha included, instead of blending them
+        pages[page_index].blit(image, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        frames[path] = [page_index, x, y, image.get_width(), image.get_height()]
+
+    page_files = []
+    for page_index, page in enumerate(pages):
+        page_file = f"{name}_{page_index}.png"
+        pygame.image.save(page, os.path.join(output_dir, page_file))
+        page_files.append(page_file)
+    print(f"LOGGING: Packed {len(frames)} frames into {len(page_files)} page(s) for atlas {name}")
+    return {"pages": page_files, "frames": frames}
+
+def pack_atlases(output_dir=ATLAS_ROOT_PATH, max_size=ATLAS_MAX_SIZE, padding=ATLAS_PADDING):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {"atlases": {}}
+    for name, image_paths in get_atlas_groups().items():
+        if image_paths:
+            manifest["atlases"][name] = pack_atlas(name, image_paths, output_dir, max_size, padding)
+    manifest_path = os.path.join(output_dir, os.path.basename(ATLAS_MANIFEST_PATH))
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    print(f"LOGGING: Wrote {manifest_path}")
+    return manifest
+
+if __name__ == "__main__":
+    args = parse_args()
+    pygame.init()
+    pack_atlases(args.output, args.max_size, args.padding)
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,225 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import sys
+import time
+import traceback
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # pygame prints a banner on import, which would break the JSON report on stdout
+from game_manager import GameManager # Imported first, it pulls in the abilities package in the order it needs
+from ability import AbilityCollisionSprite
+from config.abilities_map import ability_map
+from config.gamestates import GameState
+from config.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from enemies import Enemy
+from headless import ScriptedInput
+from helpers import create_instance_of_ability
+from items import XPItem
+from stages import Stage
+
+SCENES = ("enemies", "abilities", "orbs", "boss", "mixed")
+DEFAULT_COUNTS = {
+    "enemies": [100, 250, 500, 1000, 2500, 5000],
+    "abilities": [5, 10, 25, 50, 100],
+    "orbs": [100, 500, 1000, 2500, 5000],
+    "boss": [0, 100, 500],
+    "mixed": [100, 250, 500, 1000],
+}
+BOSS_NAME = "Eldric"
+PERCENTILES = (50, 95, 99)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stress benchmark for the game loop. Builds synthetic scenes and times update, collisions and draw per tick.")
+    parser.add_argument("--scene", choices=SCENES, default="enemies", help="What to fill the scene with")
+    parser.add_argument("--counts", default=None, help="Comma separated scene sizes to measure, e.g. 100,1000,5000. "
+                        "Enemies/orbs: number of entities. Abilities: live sprites per ability type. Boss/mixed: enemies alongside the boss or other entities")
+    parser.add_argument("--ticks", type=int, default=300, help="Measured ticks per scene size")
+    parser.add_argument("--warmup", type=int, default=30, help="Ticks run before measuring, to let caches and crowds settle")
+    parser.add_argument("--enemy", default=None, help="Enemy from npcs.json to use (defaults to cycling through every spawnable enemy)")
+    parser.add_argument("--stage", default=None, help="Stage name (defaults to the first stage)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for scene layout and gameplay randomness")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Keep the game's console logging (silenced by default so printing doesn't skew timings)")
+    return parser.parse_args()
+
+def get_percentiles(samples):
+    """Nearest-rank percentiles plus mean and max of a list of millisecond timings."""
+    ordered = sorted(samples)
+    stats = {f"p{percentile}": round(ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)], 4) for percentile in PERCENTILES}
+    stats["mean"] = round(sum(ordered) / len(ordered), 4)
+    stats["max"] = round(ordered[-1], 4)
+    return stats
+
+class BenchmarkScene:
+    """Populates a fresh game with synthetic entities around the player."""
+    def __init__(self, game_manager, layout_seed, enemy_name=None):
+        self.game_manager = game_manager
+        self.rng = random.Random(layout_seed)
+        self.enemy_names = [enemy_name] if enemy_name else game_manager.enemy_manager.get_spawnable_enemies(game_manager.npcs_info)
+
+    def get_spread_position(self, count, spacing, keep_clear=150):
+        """Random position around the player, in an area that grows with the count so density stays roughly the same."""
+        half_size = max(SCREEN_WIDTH / 2, math.sqrt(count) * spacing / 2)
+        player_x, player_y = self.game_manager.player.rect.center
+        while True:
+            x = self.rng.uniform(-half_size, half_size)
+            y = self.rng.uniform(-half_size, half_size)
+            if abs(x) > keep_clear or abs(y) > keep_clear:
+                return player_x + x, player_y + y
+
+    def add_enemies(self, count):
+        game_manager = self.game_manager
+        for index in range(count):
+            enemy_name = self.enemy_names[index % len(self.enemy_names)]
+            enemy = Enemy(self.get_spread_position(count, spacing=60), game_manager.npcs_info[enemy_name], game_manager, game_manager.all_enemies)
+            enemy.set_target(game_manager.player)
+
+    def add_ability_sprites(self, count_per_type):
+        game_manager = self.game_manager
+        total = 0
+        for ability_name in ability_map:
+            ability = create_instance_of_ability(ability_name, game_manager, game_manager.player)
+            if not getattr(ability, "animation_frames", None):
+                continue # Abilities like Summon Spiders have no sprite of their own
+            total += count_per_type
+            for _ in range(count_per_type):
+                sprite = AbilityCollisionSprite(ability, game_manager.all_ability_sprites)
+                sprite.rect.center = self.get_spread_position(count_per_type * 10, spacing=60, keep_clear=0)
+                sprite.on_moved()
+                sprite.duration = float("inf")
+
+    def add_xp_orbs(self, count):
+        game_manager = self.game_manager
+        item_data = game_manager.items_info['small_xp_orb']
+        for _ in range(count):
+            XPItem(game_manager, item_data['id'], item_data['name'], item_data['description'],
+                item_data['xp_value'], item_data['score'], self.get_spread_position(count, spacing=40), game_manager.items
+            )
+
+    def start_boss_fight(self):
+        self.game_manager.enemy_manager.boss_manager.start_boss_fight(BOSS_NAME)
+        self.game_manager.change_state(GameState.BOSS_FIGHT)
+
+class Benchmark:
+    def __init__(self, game_manager, scene, ticks, warmup, enemy_name=None, seed=0):
+        self.game_manager = game_manager
+        self.scene = scene
+        self.ticks = ticks
+        self.warmup = warmup
+        self.enemy_name = enemy_name
+        self.seed = seed
+        # Stand still and always take the first upgrade, so every scene size sees the same player
+        self.input_source = ScriptedInput(game_manager, script=[(1, (0, 0))])
+
+    def build_scene(self, count):
+        game_manager = self.game_manager
+        game_manager.new_game()
+        game_manager.player.input_source = self.input_source
+        game_manager.player.max_health = game_manager.player.health = float("inf")
+        game_manager.enemy_manager.waves_enabled = False
+        game_manager.all_enemies.empty() # Drop the opening wave
+        game_manager.change_state(GameState.PLAYING)
+
+        scene = BenchmarkScene(game_manager, self.seed, self.enemy_name)
+        if self.scene == "enemies":
+            scene.add_enemies(count)
+        elif self.scene == "abilities":
+            scene.add_enemies(100)
+            scene.add_ability_sprites(count)
+        elif self.scene == "orbs":
+            scene.add_xp_orbs(count)
+        elif self.scene == "boss":
+            scene.start_boss_fight()
+            scene.add_enemies(count)
+        elif self.scene == "mixed":
+            scene.add_enemies(count)
+            scene.add_ability_sprites(max(1, count // 50))
+            scene.add_xp_orbs(count)
+
+    def tick(self):
+        """Run and draw one simulation step. Returns (update, collisions, draw) in milliseconds."""
+        game_manager = self.game_manager
+        if game_manager.state == GameState.LEVEL_UP:
+            game_manager.level_up_screen.handle_events([])
+        start = time.perf_counter()
+        game_manager.step_simulation(game_manager.simulation_clock.step)
+        update_done = time.perf_counter()
+        game_manager.draw()
+        draw_done = time.perf_counter()
+        sections = game_manager.profiler.end_frame(draw_done - start)
+        collisions = sections.get("check_collisions", 0.0)
+        return (update_done - start - collisions) * 1000, collisions * 1000, (draw_done - update_done) * 1000
+
+    def measure(self, count):
+        game_manager = self.game_manager
+        self.build_scene(count)
+        entity_counts = {
+            "enemies": len(game_manager.all_enemies),
+            "ability_sprites": len(game_manager.all_ability_sprites),
+            "items": len(game_manager.items),
+        }
+        for _ in range(self.warmup):
+            self.tick()
+        update_times, collision_times, draw_times, total_times = [], [], [], []
+        for _ in range(self.ticks):
+            update, collisions, draw = self.tick()
+            update_times.append(update)
+            collision_times.append(collisions)
+            draw_times.append(draw)
+            total_times.append(update + collisions + draw)
+        return {
+            "count": count,
+            "entities_at_start": entity_counts,
+            "enemies_at_end": len(game_manager.all_enemies),
+            "update_ms": get_percentiles(update_times),
+            "collisions_ms": get_percentiles(collision_times),
+            "draw_ms": get_percentiles(draw_times),
+            "total_ms": get_percentiles(total_times),
+            "pools": game_manager.pools.get_stats(),
+        }
+
+    def run(self, counts):
+        results = []
+        for count in counts:
+            print(f"LOGGING: Benchmarking {self.scene} scene with count {count}", file=sys.stderr)
+            try:
+                results.append(self.measure(count))
+            except Exception:
+                # Keep the rest of the scaling curve; a broken scene is reported rather than aborting the run
+                results.append({"count": count, "error": traceback.format_exc()})
+        return results
+
+if __name__ == "__main__":
+    args = parse_args()
+    counts = [int(count) for count in args.counts.split(",")] if args.counts else DEFAULT_COUNTS[args.scene]
+
+    game = GameManager(headless=True, seed=args.seed)
+    if args.stage:
+        game.select_stage(next(stage for stage in game.stages_info if stage['name'] == args.stage))
+    game.stage = Stage(game)
+    game.profiler.toggle() # Section timings are how collisions are split out of the update
+    game.perf_overlay.visible = False
+
+    benchmark = Benchmark(game, args.scene, args.ticks, args.warmup, enemy_name=args.enemy, seed=args.seed)
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        results = benchmark.run(counts)
+
+    report = {
+        "scene": args.scene,
+        "stage": game.selected_stage['name'],
+        "ticks": args.ticks,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "tick_rate": game.simulation_clock.tick_rate,
+        "screen": [SCREEN_WIDTH, SCREEN_HEIGHT],
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
@@ -1,5 +1,4 @@
 import json
-import random
 from config.settings import BOSSES_INFO_PATH
 from npc import NPC
 from helpers import create_instance_of_ability
@@ -45,6 +44,8 @@ class BossFightManager:
         
 
 class Boss(NPC):
+    lod_enabled = False # The fight runs on its ability timers, so it always updates in full
+
     def __init__(self, boss_info, game_manager, *groups):
         self.game_manager = game_manager
         self.spawn_position = boss_info['spawn_position'][0] + game_manager.player.get_pos()[0], boss_info['spawn_position'][1] + game_manager.player.get_pos()[1]
@@ -56,13 +57,12 @@ class Boss(NPC):
 
     def update(self, dt):
         super().update(dt)
-        self.handle_abilities(dt)
+        self.handle_abilities()
         self.check_for_phase_change()
 
-    def handle_abilities(self, dt):
+    def handle_abilities(self):
         # Trigger boss abilities based on cooldown or condition
         for ability in self.abilities:
-            ability.update(dt)
             if ability.can_trigger():
                 ability.trigger()
 
@@ -79,7 +79,7 @@ class Boss(NPC):
 
     def get_minion_type(self):
         # Return the type of minions to spawn
-        return random.choice(self.minions)
+        return self.game_manager.rng.get("boss").choice(self.minions)
 
     def is_defeated(self):
         return self.health <= 0
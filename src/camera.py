@@ -0,0 +1,57 @@
+import pygame
+from config.settings import CAMERA_CULL_MARGIN, PROJECTILE_DESPAWN_MARGIN
+from simulation_clock import get_interpolated_pos
+from spatial_index import IndexedGroup
+
+class Camera:
+    """
+    The world-space viewport, centred on the player.
+
+    The screen offset is recomputed only when the camera moves, so placing a sprite on screen is
+    two additions. get_visible_blits culls a sprite group against the viewport and returns an
+    (image, position) sequence ready for a single Surface.blits call. Groups in the SpatialIndex
+    (enemies, neutral NPCs, items, ability sprites) are culled by querying the cells around the
+    viewport, so their cost follows what is on screen rather than group size; the other groups
+    are small and checked one sprite at a time.
+    """
+    def __init__(self, width, height, cull_margin=CAMERA_CULL_MARGIN, despawn_margin=PROJECTILE_DESPAWN_MARGIN):
+        """
+        :param width: Viewport width in pixels.
+        :param height: Viewport height in pixels.
+        :param cull_margin: Extra pixels around the viewport that still count as visible. Sprites are culled
+                            on their current rect but drawn interpolated, so this has to cover one step of movement.
+        :param despawn_margin: How far outside the viewport projectiles with despawn_off_screen may get before they are killed.
+        """
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.cull_rect = self.rect.inflate(cull_margin * 2, cull_margin * 2)
+        self.despawn_rect = self.rect.inflate(despawn_margin * 2, despawn_margin * 2)
+        self.offset = (0, 0)
+
+    def follow(self, center):
+        self.rect.center = center
+        self.cull_rect.center = center
+        self.despawn_rect.center = center
+        self.offset = (-self.rect.x, -self.rect.y)
+
+    def get_visible_blits(self, sprites, alpha):
+        """
+        Returns [(image, screen position)] for every sprite in `sprites` that overlaps the viewport,
+        placed at its position interpolated by `alpha` between simulation steps.
+        """
+        offset_x, offset_y = self.offset
+        if isinstance(sprites, IndexedGroup):
+            visible = sprites.query_rect(self.cull_rect)
+            # The index returns them in cell order, which changes as they cross cells. Drawing them
+            # by their bottom edge keeps overlapping sprites from swapping in front of each other
+            visible.sort(key=get_rect_bottom)
+        else:
+            is_visible = self.cull_rect.colliderect
+            visible = [sprite for sprite in sprites if is_visible(sprite.rect)]
+        blit_sequence = []
+        for sprite in visible:
+            x, y = get_interpolated_pos(sprite, alpha)
+            blit_sequence.append((sprite.image, (x + offset_x, y + offset_y)))
+        return blit_sequence
+
+def get_rect_bottom(sprite):
+    return sprite.rect.bottom
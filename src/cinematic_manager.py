@@ -16,6 +16,7 @@ class CinematicManager:
 
         self.current_cinematic = None
         self.background_image = None
+        self.background_images = {} # Cinematic name -> scaled background
         self.text_lines = []
         self.vo_lines = []
         self.scroll_speed = 0
@@ -28,7 +29,7 @@ class CinematicManager:
 
     def load_cinematic(self, cinematic_name):
         cinematic_data = self.cinematics_data[cinematic_name]
-        self.background_image = load_image(image_path = cinematic_data["image_path"], desired_width=SCREEN_WIDTH * 1.2,desired_height=SCREEN_HEIGHT)
+        self.background_image = self.get_background_image(cinematic_name)
         self.text_lines = cinematic_data["text_lines"]
         self.vo_lines = cinematic_data["vo_lines"]
         self.scroll_speed = cinematic_data["scroll_speed"]
@@ -37,6 +38,15 @@ class CinematicManager:
         self.current_line_index = 0
         self.play_vo_line()
 
+    def get_background_image(self, cinematic_name):
+        """The scaled background of a cinematic, loaded once. The stage preload loads the intro's ahead of time."""
+        background_image = self.background_images.get(cinematic_name)
+        if background_image is None:
+            image_path = self.cinematics_data[cinematic_name]["image_path"]
+            background_image = load_image(image_path = image_path, desired_width=SCREEN_WIDTH * 1.2,desired_height=SCREEN_HEIGHT)
+            self.background_images[cinematic_name] = background_image
+        return background_image
+
     def play_vo_line(self):
         if self.current_line_index < len(self.vo_lines):
             self.game_manager.sound_manager.play_vo_line(self.vo_lines[self.current_line_index])
@@ -0,0 +1,100 @@
+from enum import IntFlag
+from spatial_index import IndexLayer
+
+class CollisionLayer(IntFlag):
+    """What a collider is. A collider's `collides_with` mask says which of these it can hit."""
+    ENEMY = 1
+    NEUTRAL = 2
+    PLAYER = 4
+    ITEM = 8
+    PLAYER_PROJECTILE = 16
+    ENEMY_PROJECTILE = 32
+
+# Hittable layers that live in the spatial index, and the index layer they are stored under
+INDEXED_LAYERS = (
+    (CollisionLayer.ENEMY, IndexLayer.ENEMIES),
+    (CollisionLayer.NEUTRAL, IndexLayer.NEUTRAL_NPCS),
+    (CollisionLayer.ITEM, IndexLayer.ITEMS),
+)
+
+class CollisionManager:
+    """
+    Runs every collision of a simulation step in one pass, after all sprites have moved.
+
+    Colliders (ability sprites) register themselves when created and carry a `collision_layer`
+    and a `collides_with` mask of CollisionLayers. The pass first gathers every candidate pair:
+    each collider and the player query the spatial index once for the layers they can touch,
+    and colliders that can hit the player test its rect directly. Only then are the hits
+    dispatched, so nothing that happens in a collision handler changes what the broad phase saw.
+    A target killed by an earlier hit in the same pass is skipped.
+
+    The player touches enemies (contact damage) and items (pickup).
+    """
+    PLAYER_CONTACTS = CollisionLayer.ENEMY | CollisionLayer.ITEM
+
+    def __init__(self, game_manager):
+        self.game_manager = game_manager
+        self.colliders = {}  # sprite -> None, in the order they were created
+        self.index_masks = {}  # collides_with -> IndexLayer mask
+        self.pair_count = 0
+
+    def add(self, sprite):
+        self.colliders[sprite] = None
+
+    def get_index_mask(self, layers):
+        mask = self.index_masks.get(layers)
+        if mask is None:
+            mask = IndexLayer(0)
+            for collision_layer, index_layer in INDEXED_LAYERS:
+                if layers & collision_layer:
+                    mask |= index_layer
+            self.index_masks[layers] = mask
+        return mask
+
+    def find_pairs(self):
+        """
+        Broad phase. Returns (collider_hits, enemy_contacts, item_contacts), where collider_hits is a
+        list of (collider, [targets]) and the contacts are what overlaps the player.
+        """
+        game_manager = self.game_manager
+        spatial_index = game_manager.spatial_index
+        player = game_manager.player
+        player_rect = player.rect
+        collider_hits = []
+        for sprite in list(self.colliders):
+            if not sprite.alive():
+                # Expired or killed since the last pass. Sprites that were never added to a group are dropped too
+                del self.colliders[sprite]
+                continue
+            if not sprite.triggers_on_collision:
+                continue
+            collides_with = sprite.collides_with
+            index_mask = self.get_index_mask(collides_with)
+            targets = spatial_index.query_rect(sprite.rect, index_mask) if index_mask else []
+            if collides_with & CollisionLayer.PLAYER and sprite.rect.colliderect(player_rect):
+                targets.append(player)
+            if targets:
+                collider_hits.append((sprite, targets))
+
+        enemy_contacts = []
+        item_contacts = []
+        for sprite in spatial_index.query_rect(player_rect, self.get_index_mask(self.PLAYER_CONTACTS)):
+            if spatial_index.get_layer(sprite) == IndexLayer.ITEMS:
+                item_contacts.append(sprite)
+            else:
+                enemy_contacts.append(sprite)
+        self.pair_count = sum(len(targets) for _, targets in collider_hits) + len(enemy_contacts) + len(item_contacts)
+        return collider_hits, enemy_contacts, item_contacts
+
+    def update(self):
+        collider_hits, enemy_contacts, item_contacts = self.find_pairs()
+        for sprite, targets in collider_hits:
+            if sprite.alive():
+                sprite.handle_collisions(targets)
+        for enemy in enemy_contacts:
+            if enemy.alive():
+                enemy.attack()
+        for item in item_contacts:
+            if item.alive():
+                item.kill()
+                item.on_collect()
@@ -10,4 +10,5 @@ class GameState(Enum):
     NEW_GAME = 7
     CINEMATIC = 8
     CUTSCENE = 9
-    BOSS_FIGHT = 10
\ No newline at end of file
+    BOSS_FIGHT = 10
+    LOADING = 11
\ No newline at end of file
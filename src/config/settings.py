@@ -1,11 +1,53 @@
 ABILITIES_IMAGES_ROOT_PATH = "assets/abilities/"
 ITEM_IMAGES_ROOT_PATH = "assets/items/"
+ATLAS_ROOT_PATH = "assets/atlases/"
+ATLAS_MANIFEST_PATH = "assets/atlases/manifest.json" # Written by atlas_packer.py. Without it every frame is loaded from its own file
 MAPS_IMAGES_ROOT_PATH = "assets/maps/"
 SOUNDS_ROOT_PATH = "assets/sounds/"
 VO_ROOT_PATH = "assets/vo/"
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
 FPS = 60
+PLAYER_START_POS = (100, 100)
+
+SIMULATION_TICK_RATE = 60
+MAX_SIMULATION_STEPS_PER_FRAME = 5
+INTERPOLATION_SNAP_DISTANCE = 200
+CAMERA_CULL_MARGIN = 64
+PROJECTILE_DESPAWN_MARGIN = 300
+SPATIAL_INDEX_CELL_SIZE = 128
+TARGETING_MAX_SEARCH_RADIUS = 4096 # Nearest-enemy searches further out than this check every enemy instead
+CHARACTER_SPEED_REFERENCE_RATE = 60 # Character speeds in characters.json are tuned in pixels per 60Hz frame
+TARGET_FRAME_TIME_MS = 1000 / FPS
+PERF_OVERLAY_HISTORY_FRAMES = 240
+FRAME_CACHE_MAX_BYTES = 256 * 1024 * 1024 # Loaded animation frames kept for reuse, least recently used are dropped past this
+USE_ATLASES = True
+ATLAS_MAX_SIZE = 2048 # Width and height limit of one atlas page
+ATLAS_MAX_FRAME_SIZE = 512 # Images wider or taller than this are left out of the atlases
+ATLAS_PADDING = 1
+SOUND_CACHE_MAX_BYTES = 32 * 1024 * 1024 # Decoded sound samples kept resident, least recently used are dropped past this
+CAST_SOUND_VOLUME = 0.2
+SOUND_VOICE_COUNT = 16 # Mixer channels sounds play on, one of them kept for VO
+SOUND_MAX_VOICES_PER_SOUND = 3 # Copies of one sound effect playing at once, past this new plays are skipped
+SOUND_MIN_RETRIGGER_MS = 60 # Plays of one sound effect closer together than this are skipped
+# Sound name -> (max voices, min retrigger ms) for sounds that need tighter limits, e.g. casts that fire in volleys
+SOUND_LIMITS = {
+    "soulwarden_cast": (2, 150),
+    "voidflare_cast": (2, 120),
+    "acid_wave_cast": (2, 100),
+}
+PRELOAD_WORKER_COUNT = 4 # Threads decoding a stage's images and sounds behind the loading screen
+PRELOAD_MAIN_THREAD_BUDGET_MS = 8 # Main thread time per frame spent converting and caching what they decoded
+BACKGROUND_COLOR = (30, 30, 30) # Behind the tiles, showing through any transparent pixels
+TILE_CHUNK_SIZE = 4 # The background is baked into chunks this many tiles wide and high
+TILE_CHUNK_CACHE_SIZE = 24 # Baked chunks kept, least recently used are dropped past this
+TILE_CHUNK_PREFETCH_MARGIN = 480 # Chunks this many pixels outside the view are baked before they come into view
+TILE_DECORATION_DENSITY = 0.1 # Chance of a background cell getting a decoration from a layer without its own density
+VARIANT_ROTATION_STEP_DEGREES = 15 # Rotated frames are cached at multiples of this
+# Colours NPC frames are multiplied by while a status effect holds them. Frozen wins over paralyzed, paralyzed over controlled
+FROZEN_TINT_COLOR = (140, 200, 255)
+PARALYZED_TINT_COLOR = (255, 235, 120)
+CONTROLLED_TINT_COLOR = (220, 140, 255)
 
 PLAYER_IMAGE_PATH = "assets/main_char.png"
 HEROES_IMAGE_ROOT = "assets/chars/heroes"
@@ -17,7 +59,34 @@ GLOBAL_STAGGERED_PROJECTILE_RATE = 0.5
 
 ENEMY_SPAWN_INTERVAL = 10
 MAX_ENEMY_COUNT = 150
+# Settings of each level the QualityGovernor steps through when frames run over budget, best first
+QUALITY_LEVELS = (
+    {"enemy_cap": MAX_ENEMY_COUNT, "spawn_batch_scale": 1.0, "max_damage_texts": None, "effect_density": 1.0, "offscreen_animation_interval": 1},
+    {"enemy_cap": 120, "spawn_batch_scale": 0.8, "max_damage_texts": 48, "effect_density": 0.75, "offscreen_animation_interval": 2},
+    {"enemy_cap": 90, "spawn_batch_scale": 0.6, "max_damage_texts": 32, "effect_density": 0.5, "offscreen_animation_interval": 4},
+    {"enemy_cap": 60, "spawn_batch_scale": 0.5, "max_damage_texts": 16, "effect_density": 0.25, "offscreen_animation_interval": 8},
+)
+QUALITY_WINDOW_FRAMES = 60 # Frames averaged before the quality level can change
+QUALITY_COOLDOWN_FRAMES = 180 # Frames after a change before the next one
+QUALITY_DOWNGRADE_RATIO = 1.1 # Averaging over the frame budget times this steps quality down
+QUALITY_UPGRADE_RATIO = 0.7 # Averaging under the frame budget times this steps it back up
+CROWD_SEPARATION_ITERATIONS = 1
+CROWD_SEPARATION_PAIR_BUDGET = 30000 # Pair checks per simulation step, the rest of a dense crowd is resolved next step
+CROWD_SEPARATION_VECTORIZED_PAIR_BUDGET = 200000 # Same, for the NumPy separation used alongside the enemy engine
+USE_ENEMY_ENGINE = True # Simulate plain enemies in packed NumPy arrays (enemy_engine.py). Ignored when NumPy isn't installed
+ENEMY_ENGINE_INITIAL_CAPACITY = 256
+# Objects built ahead of each run so the first waves and hits don't construct anything. Enemies are per spawnable type
+POOL_PREWARM_ENEMIES_PER_TYPE = 20
+POOL_PREWARM_DAMAGE_TEXTS = 64
+DAMAGE_TEXT_CACHE_SIZE = 256 # Rendered damage texts kept, the least recently shown are dropped past this
+POOL_PREWARM_XP_ITEMS = 64
+POOL_MAX_FREE_OBJECTS = 2000 # Per pool. Anything killed beyond this is left to the garbage collector
 OFF_SCREEN_DISTANCE = 100
+LOD_FAR_DISTANCE = 1600 # NPCs further than this from the camera's centre update least often, without animating or separating
+LOD_TIER_INTERVALS = (1, 2, 4) # Steps between updates of on-screen, off-screen and far NPCs
+ENEMY_LEASH_DISTANCE = SCREEN_WIDTH / 2 + 300 # Enemies further than this from the player are brought back near them
+ENEMY_RECYCLE_INTERVAL = 0.1 # Seconds between checks for enemies past the leash distance
+ENEMY_RECYCLE_SPREAD_DEGREES = 60 # How far either side of the player's heading brought back enemies are placed
 
 ABILITY_INFO_PATH = "src/config/abilities.json"
 BOSSES_INFO_PATH = "src/config/bosses.json"
@@ -0,0 +1,229 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from lod_manager import LOD_FAR
+from config.settings import CROWD_SEPARATION_ITERATIONS, CROWD_SEPARATION_PAIR_BUDGET, CROWD_SEPARATION_VECTORIZED_PAIR_BUDGET
+
+# Cells checked against each cell: itself, then the "forward" ones (right and down) so each pair of cells is visited once
+FORWARD_NEIGHBOURS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+class CrowdManager:
+    """
+    Keeps solid-bodied NPCs from standing inside each other.
+
+    Once per simulation step every solid body is bucketed into a uniform grid whose cells are
+    as wide as the largest body, so overlapping neighbours can only be in the same or an
+    adjacent cell. Each overlapping pair is pushed apart along the line between their centres,
+    half each. Positions are worked on as floats, read from and written back to each NPC's float
+    position, so small pushes add up instead of being lost to the integer rect.
+
+    NPCs the LodManager puts in LOD_FAR are left out, nobody sees them overlap.
+
+    The number of pair checks per step is capped. When a dense crowd runs over the budget the
+    rest of it is resolved next step, starting where this step stopped.
+
+    When the game has an EnemyEngine the crowd is separated with NumPy instead: every candidate
+    pair is found with a sort and a few searches on the cell keys, and all pushes of a pass are
+    summed and applied at once. Enemies in the engine are read from and written to its float
+    positions directly.
+    """
+    def __init__(self, game_manager, iterations=CROWD_SEPARATION_ITERATIONS, pair_budget=None):
+        """
+        :param iterations: Relaxation passes per step. More passes settle big crowds faster.
+        :param pair_budget: Maximum pair checks per step, across all passes. Defaults to the setting
+                            for the separation in use.
+        """
+        self.game_manager = game_manager
+        self.engine = game_manager.all_enemies.engine
+        self.iterations = iterations
+        if pair_budget is None:
+            pair_budget = CROWD_SEPARATION_PAIR_BUDGET if self.engine is None else CROWD_SEPARATION_VECTORIZED_PAIR_BUDGET
+        self.pair_budget = pair_budget
+        self.next_start = 0
+        self.pair_checks = 0
+
+    def update(self):
+        if self.engine is not None:
+            self.update_vectorized()
+            return
+        bodies = [npc for npc in self.game_manager.all_enemies if npc.solid_body and npc.lod_tier != LOD_FAR]
+        bodies.extend(npc for npc in self.game_manager.all_neutral_npcs if npc.solid_body and npc.lod_tier != LOD_FAR)
+        self.pair_checks = 0
+        if len(bodies) < 2:
+            return
+
+        xs = []
+        ys = []
+        radii = []
+        for body in bodies:
+            half_width = body.rect.width / 2
+            xs.append(body.position.x + half_width)
+            ys.append(body.position.y + body.rect.height / 2)
+            radii.append(half_width)
+        cell_size = max(radii) * 2 or 1
+
+        body_count = len(bodies)
+        budget = self.pair_budget
+        start = self.next_start % body_count
+        # Bucketing from a rotating start also rotates which cells get resolved first when over budget
+        order = list(range(start, body_count)) + list(range(start))
+        # Bodies only move a fraction of a cell per pass, so one grid serves every pass
+        grid = {}
+        for index in order:
+            cell = (int(xs[index] // cell_size), int(ys[index] // cell_size))
+            members = grid.get(cell)
+            if members is None:
+                grid[cell] = [index]
+            else:
+                members.append(index)
+
+        for _ in range(self.iterations):
+            for (cell_x, cell_y), members in grid.items():
+                if budget <= 0:
+                    break
+                # Only look "forward" (right and down) so each pair of cells is visited once
+                forward = []
+                for neighbour in ((cell_x + 1, cell_y), (cell_x - 1, cell_y + 1), (cell_x, cell_y + 1), (cell_x + 1, cell_y + 1)):
+                    neighbour_members = grid.get(neighbour)
+                    if neighbour_members:
+                        forward.extend(neighbour_members)
+                for position, index in enumerate(members):
+                    x, y, radius = xs[index], ys[index], radii[index]
+                    candidates = members[position + 1:] + forward if forward else members[position + 1:]
+                    budget -= len(candidates)
+                    for other in candidates:
+                        dx = x - xs[other]
+                        dy = y - ys[other]
+                        min_distance = radius + radii[other]
+                        distance_squared = dx * dx + dy * dy
+                        if distance_squared >= min_distance * min_distance:
+                            continue
+                        if distance_squared == 0:
+                            # Perfectly stacked, separate them along an arbitrary but fixed axis
+                            dx, distance = 1.0, 1.0
+                        else:
+                            distance = distance_squared ** 0.5
+                        push = (min_distance - distance) / 2 / distance
+                        push_x = dx * push
+                        push_y = dy * push
+                        x += push_x
+                        y += push_y
+                        xs[other] -= push_x
+                        ys[other] -= push_y
+                    xs[index], ys[index] = x, y
+            if budget <= 0:
+                # Over budget: carry on from the first body that wasn't reached next step
+                start = (start + body_count // 2) % body_count
+                break
+        self.next_start = start
+        self.pair_checks = self.pair_budget - budget
+
+        for index, body in enumerate(bodies):
+            rect = body.rect
+            body.set_topleft(xs[index] - rect.width / 2, ys[index] - rect.height / 2)
+
+    def update_vectorized(self):
+        engine = self.engine
+        bodies = [npc for npc in self.game_manager.all_enemies.individual_members if npc.solid_body and npc.lod_tier != LOD_FAR]
+        bodies.extend(npc for npc in self.game_manager.all_neutral_npcs if npc.solid_body and npc.lod_tier != LOD_FAR)
+        all_x, all_y = engine.get_centers(slice(0, engine.count))
+        engine_slots = np.flatnonzero(engine.arrays["solid"][:engine.count] & ~self.game_manager.lod_manager.get_far_mask(all_x, all_y))
+        engine_count = len(engine_slots)
+        body_count = engine_count + len(bodies)
+        self.pair_checks = 0
+        if body_count < 2:
+            return
+
+        # Engine enemies first, then everything else from its float position
+        engine_x, engine_y = engine.get_centers(engine_slots)
+        xs = np.empty(body_count)
+        ys = np.empty(body_count)
+        radii = np.empty(body_count)
+        xs[:engine_count] = engine_x
+        ys[:engine_count] = engine_y
+        radii[:engine_count] = engine.arrays["width"][engine_slots] / 2
+        for index, body in enumerate(bodies, engine_count):
+            rect = body.rect
+            xs[index] = body.position.x + rect.width / 2
+            ys[index] = body.position.y + rect.height / 2
+            radii[index] = rect.width / 2
+        cell_size = radii.max() * 2 or 1
+
+        first, second = self.get_candidate_pairs(xs, ys, cell_size)
+        pair_count = len(first)
+        budget = self.pair_budget // self.iterations
+        if pair_count > budget:
+            # Over budget: take a window of the pairs and move it along next step
+            start = self.next_start % pair_count
+            window = np.arange(start, start + budget) % pair_count
+            first, second = first[window], second[window]
+            self.next_start = start + budget
+        min_distance = radii[first] + radii[second]
+
+        for _ in range(self.iterations):
+            dx = xs[first] - xs[second]
+            dy = ys[first] - ys[second]
+            distance = np.hypot(dx, dy)
+            overlapping = distance < min_distance
+            if not overlapping.any():
+                break
+            dx, dy, distance = dx[overlapping], dy[overlapping], distance[overlapping]
+            # Perfectly stacked, separate them along an arbitrary but fixed axis
+            stacked = distance == 0
+            dx[stacked] = 1.0
+            distance[stacked] = 1.0
+            push = (min_distance[overlapping] - distance) / 2 / distance
+            push_x = dx * push
+            push_y = dy * push
+            # Each pair pushes its first body by +push and its second by -push
+            pushed = np.concatenate((first[overlapping], second[overlapping]))
+            # All pushes of a pass land at once, so a body squeezed from many sides would be thrown far past
+            # where any single push would put it. Averaging its pushes keeps dense crowds from jittering
+            contacts = np.maximum(np.bincount(pushed, minlength=body_count), 1)
+            xs += np.bincount(pushed, np.concatenate((push_x, -push_x)), body_count) / contacts
+            ys += np.bincount(pushed, np.concatenate((push_y, -push_y)), body_count) / contacts
+        self.pair_checks = len(first) * self.iterations
+
+        engine.set_centers(engine_slots, xs[:engine_count], ys[:engine_count])
+        for index, body in enumerate(bodies, engine_count):
+            rect = body.rect
+            body.set_topleft(float(xs[index]) - rect.width / 2, float(ys[index]) - rect.height / 2)
+
+    @staticmethod
+    def get_candidate_pairs(xs, ys, cell_size):
+        """
+        Every pair of bodies in the same or neighbouring grid cells, as two index arrays.
+
+        Bodies are sorted by cell key, so the members of any cell are one contiguous run that
+        np.searchsorted finds without building the grid.
+        """
+        cell_x = np.floor(xs / cell_size).astype(np.int64)
+        cell_y = np.floor(ys / cell_size).astype(np.int64)
+        cell_x -= cell_x.min() - 1 # Leave room for the -1 neighbour
+        cell_y -= cell_y.min()
+        row_length = int(cell_x.max()) + 2
+        keys = cell_y * row_length + cell_x
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        positions = np.arange(len(keys))
+        firsts = []
+        seconds = []
+        for offset_x, offset_y in FORWARD_NEIGHBOURS:
+            neighbour_keys = sorted_keys + (offset_y * row_length + offset_x)
+            starts = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+            ends = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+            if offset_x == 0 and offset_y == 0:
+                starts = positions + 1 # Same cell: only the members after this one
+            counts = np.maximum(ends - starts, 0)
+            total = int(counts.sum())
+            if not total:
+                continue
+            owners = np.repeat(positions, counts)
+            # Position within each owner's run of candidates, added to where that run starts
+            run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            firsts.append(order[owners])
+            seconds.append(order[np.repeat(starts, counts) + run_offsets])
+        if not firsts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(firsts), np.concatenate(seconds)
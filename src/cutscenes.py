@@ -18,7 +18,6 @@ class CutsceneCharacter(pygame.sprite.Sprite):
         screen.blit(self.image, self.pos)
 
     def update(self):
-        self.animation_manager.update()  # Ensure this is optimized for smooth updates
         self.image = self.animation_manager.get_frame()  # Always fetch the latest frame
 
 class CutsceneManager:
@@ -1,18 +1,38 @@
 import pygame
 import pygame.freetype  # You can also use pygame.font
+from collections import OrderedDict
+from config.settings import DAMAGE_TEXT_CACHE_SIZE
+from pool_manager import Poolable
+
+class DamageText(Poolable, pygame.sprite.Sprite):
+    font = None  # Shared by every damage text, created on first use
+    # (text, color) -> rendered surface, least recently shown first. Damage numbers repeat a lot, so each is rendered once
+    text_surfaces = OrderedDict()
 
-class DamageText(pygame.sprite.Sprite):
     def __init__(self, text, position, color=(255, 0, 0), lifespan=1.0):
         super().__init__()
-        self.image, self.rect = self.create_text_surface(text, color)
-        self.rect.topleft = position
+        self.reset(text, position, color, lifespan)
+
+    def reset(self, text, position, color=(255, 0, 0), lifespan=1.0):
+        self.image = self.create_text_surface(text, color)
+        self.rect = self.image.get_rect(topleft=position)
         self.lifespan = lifespan  # Time in seconds for the text to live
         self.elapsed_time = 0
 
     def create_text_surface(self, text, color):
-        font = pygame.freetype.SysFont(None, 24)  # You can specify a specific font and size
-        image, rect = font.render(text, color)
-        return image, rect
+        text_surfaces = DamageText.text_surfaces
+        key = (text, color)
+        image = text_surfaces.get(key)
+        if image is None:
+            if DamageText.font is None:
+                DamageText.font = pygame.freetype.SysFont(None, 24)  # You can specify a specific font and size
+            image, _ = DamageText.font.render(text, color)
+            text_surfaces[key] = image
+            if len(text_surfaces) > DAMAGE_TEXT_CACHE_SIZE:
+                text_surfaces.popitem(last=False)
+        else:
+            text_surfaces.move_to_end(key)
+        return image
 
     def update(self, dt):
         self.elapsed_time += dt
@@ -20,4 +40,4 @@ class DamageText(pygame.sprite.Sprite):
             self.kill()  # Remove the sprite when its time is up
 
         # You can add more visual effects here like moving up or fading
-        self.rect.y -= 50 * dt  # Example: move up over time
\ No newline at end of file
+        self.rect.y -= 50 * dt  # Example: move up over time
@@ -0,0 +1,23 @@
+import os
+import pygame
+
+# Files decoded ahead of time by the PreloadManager's worker threads, keyed by normalized path.
+# The loaders take them from here instead of reading the file, each at most once
+images = {}
+sounds = {}
+
+def normalize_path(path):
+    return os.path.normpath(path)
+
+def clear():
+    images.clear()
+    sounds.clear()
+
+def load_image_file(path):
+    """The decoded (unconverted) image at `path`, preloaded if it was, read from disk otherwise."""
+    image = images.pop(normalize_path(path), None)
+    return image if image is not None else pygame.image.load(path)
+
+def load_sound_file(path):
+    sound = sounds.pop(normalize_path(path), None)
+    return sound if sound is not None else pygame.mixer.Sound(path)
@@ -1,4 +1,3 @@
-import random
 import pygame
 import encounters.encounter_functions as encounter_functions
 
@@ -43,13 +42,13 @@ class EncounterManager:
 
         # If player has moved enough distance, consider triggering an encounter
         if distance_moved >= self.min_distance:
-            if random.random() < self.spawn_chance:
+            if self.game_manager.rng.get("encounters").random() < self.spawn_chance:
                 self.trigger_random_encounter()
                 self.last_position = current_position
 
     def trigger_random_encounter(self):
         if self.encounters:
-            encounter = random.choice(self.encounters)
+            encounter = self.game_manager.rng.get("encounters").choice(self.encounters)
             encounter.trigger(self.game_manager)
             self.triggered_encounters.append((encounter, pygame.Vector2(self.player.rect.center)))
 
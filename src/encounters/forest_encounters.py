@@ -1,4 +1,3 @@
-import random
 from enemies import CarnivorousPlantNPC
 from npc import FallenStarNPC
 
@@ -13,8 +12,9 @@ def carnivorous_plants(game_manager):
 
 def fallen_stars(game_manager):
     player_pos = game_manager.player.get_pos()
-    offset_location = (player_pos[0] + random.randint(-500, 500), player_pos[1] + random.randint(-500, 500))
+    rng = game_manager.rng.get("encounters")
+    offset_location = (player_pos[0] + rng.randint(-500, 500), player_pos[1] + rng.randint(-500, 500))
     fallen_star_npc = FallenStarNPC(offset_location, game_manager.npcs_info['fallen_star'], game_manager, game_manager.all_neutral_npcs)
-    landing_location = (offset_location[0] + random.randint(-200, 200), offset_location[1] + random.randint(-200, 200))
+    landing_location = (offset_location[0] + rng.randint(-200, 200), offset_location[1] + rng.randint(-200, 200))
     fallen_star_npc.set_target_pos(landing_location)
     print("Triggered fallen stars encounter")
@@ -1,11 +1,25 @@
+from enemy_engine import EngineField
 from npc import NPC, NPCTypes
+from pool_manager import Poolable
 
-class Enemy(NPC):
+class Enemy(Poolable, NPC):
     """
     Enemy class that extends NPC. Represents enemy characters in the game,
     which attack the player, have health, and can be frozen, controlled, or paralyzed.
+
+    When the game has an EnemyEngine, plain enemies are simulated there and their update() is
+    never called. The stats and status effects below are then stored in the engine's arrays.
+    The status effects are ended by the TimerManager either way, see NPC.start_status.
+    Subclasses that override update() must set engine_simulated to False.
     """
-    
+    engine_simulated = True
+    engine_slot = None # Set while the enemy is packed into an EnemyEngine
+    speed = EngineField()
+    health = EngineField()
+    frozen = EngineField(bool)
+    controlled = EngineField(bool)
+    paralyzed = EngineField(bool)
+
     def __init__(self, pos, npc_info, game_manager, *groups):
         """
         Initializes the Enemy class.
@@ -20,6 +34,27 @@ class Enemy(NPC):
         super().__init__(pos, npc_info, game_manager, *groups)
         self.calculate_stats(game_manager.current_wave_number)  # Calculates stats based on the current wave.
 
+    @classmethod
+    def get_pool_key(cls, pos, npc_info, *args):
+        """Enemies are pooled per type, since each type has its own animations."""
+        return npc_info["debug_name"]
+
+    def reset(self, pos, npc_info, game_manager, *groups):
+        """
+        Reuses a pooled enemy as if it had just been constructed with these arguments.
+
+        Args:
+            pos (tuple): The (x, y) position of the enemy on the map.
+            npc_info (dict): Dictionary containing information about the NPC. Must be the same enemy type it was built as.
+            game_manager (GameManager): Reference to the main game manager instance.
+            groups (tuple): Sprite groups that the enemy belongs to (optional).
+        """
+        self.__dict__.update(npc_info)
+        self.game_manager = game_manager
+        self.reset_state(pos)
+        self.calculate_stats(game_manager.current_wave_number)
+        self.add(*groups)
+
     def calculate_stats(self, wave_number):
         """
         Adjusts the enemy's stats (health, damage) based on the current wave number.
@@ -39,6 +74,21 @@ class Enemy(NPC):
         """
         super().update(dt)
 
+    def set_target(self, target):
+        super().set_target(target)
+        if self.engine_slot is not None:
+            self.engine.set_target(self, target)
+
+    def set_target_pos(self, pos):
+        super().set_target_pos(pos)
+        if self.engine_slot is not None:
+            self.engine.set_target_pos(self, pos)
+
+    def set_pos(self, pos):
+        super().set_pos(pos)
+        if self.engine_slot is not None:
+            self.engine.set_topleft(self, self.rect.topleft)
+
     def attack(self):
         """
         Performs an attack on the target if the enemy is allowed to attack (cooldown, etc.).
@@ -56,9 +106,7 @@ class Enemy(NPC):
         Args:
             duration (float): The length of time (in seconds) to freeze the enemy.
         """
-        self.time_frozen = 0  # Timer to track how long the enemy has been frozen.
-        self.frozen = True  # Sets the frozen state to True.
-        self.freeze_duration = duration  # Duration for which the enemy will be frozen.
+        self.start_status("frozen", duration)
     
     def get_controlled(self, duration):
         """
@@ -67,9 +115,7 @@ class Enemy(NPC):
         Args:
             duration (float): The length of time (in seconds) the enemy will be controlled.
         """
-        self.time_controlled = 0  # Timer to track the controlled duration.
-        self.controlled = True  # Sets the controlled state to True.
-        self.controlled_duration = duration  # Duration for which the enemy will be controlled.
+        self.start_status("controlled", duration)
 
     def get_paralyzed(self, duration):
         """
@@ -78,9 +124,7 @@ class Enemy(NPC):
         Args:
             duration (float): The length of time (in seconds) the enemy will be paralyzed.
         """
-        self.time_paralyzed = 0  # Timer to track the paralyzed duration.
-        self.paralyzed = True  # Sets the paralyzed state to True.
-        self.paralyzed_duration = duration  # Duration for which the enemy will be paralyzed.
+        self.start_status("paralyzed", duration)
 
     def on_death(self):
         """
@@ -0,0 +1,406 @@
+try:
+    import numpy as np
+except ImportError: # The engine is optional, without NumPy every enemy runs its own update()
+    np = None
+from animation_clock import game_clock
+from config.settings import ENEMY_ENGINE_INITIAL_CAPACITY
+from frame_cache import frame_cache
+from npc import NO_TINT, FROZEN_TINT, PARALYZED_TINT, CONTROLLED_TINT, STATUS_TINT_VARIANTS
+from spatial_index import IndexedGroup, IndexLayer
+
+class EngineField:
+    """
+    An Enemy attribute that lives in the EnemyEngine's arrays while the enemy is simulated there.
+
+    Before the enemy joins the engine and after it leaves, the value is kept in the instance dict
+    like any other attribute, so code outside the engine never needs to know where it is stored.
+    """
+    def __init__(self, cast=float):
+        self.cast = cast
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, sprite, owner=None):
+        if sprite is None:
+            return self
+        state = sprite.__dict__
+        slot = state.get("engine_slot")
+        if slot is None:
+            try:
+                return state[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+        return self.cast(state["engine"].fields[self.name][slot])
+
+    def __set__(self, sprite, value):
+        state = sprite.__dict__
+        slot = state.get("engine_slot")
+        if slot is None:
+            state[self.name] = value
+        else:
+            state["engine"].fields[self.name][slot] = value
+
+class EnemyEngine:
+    """
+    Structure-of-arrays simulation for plain chasing enemies.
+
+    Positions, velocities, speeds, health and the freeze/paralyze/control flags of every
+    simulated enemy are packed into NumPy arrays, and step() advances all of them at once:
+    chasing (or fleeing while controlled) and the walk animation are a handful of array
+    operations instead of one update() call per enemy. The sprites become views: write_back()
+    copies the positions into their rects once the crowd has been separated, and only the
+    sprites whose animation frame or status tint changed get a new image. With an
+    offscreen_animation_interval over 1, sprites outside view_rect only get theirs every that
+    many steps.
+
+    Slots are kept dense. When an enemy leaves, the last slot is moved into the gap, so every
+    array operation works on a plain [:count] slice.
+
+    Anything that moves a simulated enemy's rect from outside has to go through Enemy.set_pos, or
+    the next write_back() will put it back where the engine thinks it is.
+    """
+    FIELDS = {
+        "speed": float,
+        "health": float,
+        "frozen": bool,
+        "controlled": bool,
+        "paralyzed": bool,
+    }
+    STATE_ARRAYS = {
+        "x": float, "y": float, # Rect topleft, with the sub-pixel part the rect can't hold
+        "vx": float, "vy": float, # Velocity of the last step, in pixels per second
+        "width": float, "height": float,
+        "rect_x": int, "rect_y": int, # What was last written to the rect
+        "min_cell_x": int, "min_cell_y": int, "max_cell_x": int, "max_cell_y": int, # Spatial index cells of that rect
+        "target_index": int, # Index into self.targets, -1 for none
+        "goal_x": float, "goal_y": float, "has_goal": bool, # Fixed target_pos, or where the target was last step
+        "animation_phase": int, "animation_duration": float, "frame_index": int, "frame_count": int, # See AnimationClock
+        "tint": int, # Index into STATUS_TINT_VARIANTS of the frame the sprite shows
+        "shown_frame": int, # Index of the frame the sprite shows
+        "solid": bool,
+    }
+
+    @staticmethod
+    def is_available():
+        return np is not None
+
+    def __init__(self, spatial_index, capacity=ENEMY_ENGINE_INITIAL_CAPACITY):
+        """
+        :param spatial_index: The SpatialIndex the enemies are in. The engine reports their cell changes
+                              itself, so the index doesn't have to check thousands of rects every step.
+        :param capacity: Number of slots to allocate up front. The arrays double whenever they fill up.
+        """
+        self.spatial_index = spatial_index
+        self.capacity = capacity
+        self.count = 0
+        self.fields = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()}
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.STATE_ARRAYS.items()}
+        self.sprites = [] # Slot -> sprite
+        self.rects = []
+        self.frames = [] # Slot -> frames of the sprite's current animation
+        self.pending = {} # Sprites waiting to be packed, see add()
+        self.targets = []
+        self.target_indices = {}
+        self.offscreen_animation_interval = 1 # Off-screen sprites only get a new frame every this many steps
+        self.view_rect = None # Rect of what is on screen, needed when offscreen_animation_interval is over 1
+        self.step_count = 0
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def add(self, sprite):
+        """
+        Take over the simulation of `sprite` if it can be vectorized. Returns whether it was taken.
+
+        Sprites join their groups at the start of their __init__, before they have stats or a
+        rect, so they wait in `pending` and are packed at the start of the next step.
+        """
+        if not getattr(sprite, "engine_simulated", False):
+            return False
+        self.pending[sprite] = None
+        return True
+
+    def remove(self, sprite):
+        if sprite in self.pending:
+            del self.pending[sprite]
+        elif sprite.__dict__.get("engine_slot") is not None:
+            self.unpack(sprite)
+
+    def grow(self):
+        self.capacity *= 2
+        for store in (self.fields, self.arrays):
+            for name, array in store.items():
+                grown = np.zeros(self.capacity, dtype=array.dtype)
+                grown[:self.count] = array[:self.count]
+                store[name] = grown
+
+    def flush_pending(self):
+        if self.pending:
+            pending, self.pending = self.pending, {}
+            for sprite in pending:
+                self.pack(sprite)
+
+    def pack(self, sprite):
+        if self.count == self.capacity:
+            self.grow()
+        slot = self.count
+        self.count += 1
+        self.arrays["tint"][slot] = sprite.get_status_tint_index() # Before its status fields move into the arrays
+        state = sprite.__dict__
+        for name, array in self.fields.items():
+            array[slot] = state.pop(name)
+        arrays = self.arrays
+        rect = sprite.rect
+        arrays["x"][slot], arrays["y"][slot] = rect.topleft
+        arrays["rect_x"][slot], arrays["rect_y"][slot] = rect.topleft
+        arrays["vx"][slot] = arrays["vy"][slot] = 0.0
+        arrays["width"][slot], arrays["height"][slot] = rect.size
+        arrays["target_index"][slot] = self.get_target_index(state.get("target"))
+        target_pos = state.get("target_pos")
+        arrays["has_goal"][slot] = bool(target_pos)
+        arrays["goal_x"][slot], arrays["goal_y"][slot] = target_pos if target_pos else (0.0, 0.0)
+        animation = sprite.animation_manager.current_animation
+        arrays["animation_phase"][slot] = animation.phase
+        arrays["animation_duration"][slot] = animation.frame_duration
+        arrays["frame_index"][slot] = arrays["shown_frame"][slot] = animation.current_frame_index
+        arrays["frame_count"][slot] = max(len(animation.frames), 1)
+        arrays["solid"][slot] = sprite.solid_body
+        (arrays["min_cell_x"][slot], arrays["min_cell_y"][slot],
+         arrays["max_cell_x"][slot], arrays["max_cell_y"][slot]) = self.spatial_index.track(sprite)
+        self.sprites.append(sprite)
+        self.rects.append(rect)
+        self.frames.append(animation.frames)
+        state["engine"] = self
+        state["engine_slot"] = slot
+
+    def unpack(self, sprite):
+        """Hand `sprite` back to the instance dict and close the gap with the last slot."""
+        state = sprite.__dict__
+        slot = state.pop("engine_slot")
+        del state["engine"]
+        for name, array in self.fields.items():
+            state[name] = self.FIELDS[name](array[slot])
+        arrays = self.arrays
+        sprite.position.update(float(arrays["x"][slot]), float(arrays["y"][slot]))
+        if arrays["has_goal"][slot]:
+            state["target_pos"] = (float(arrays["goal_x"][slot]), float(arrays["goal_y"][slot]))
+        animation = sprite.animation_manager.current_animation
+        animation.phase = int(arrays["animation_phase"][slot])
+
+        last = self.count - 1
+        if slot != last:
+            for store in (self.fields, arrays):
+                for array in store.values():
+                    array[slot] = array[last]
+            moved = self.sprites[last]
+            self.sprites[slot] = moved
+            self.rects[slot] = self.rects[last]
+            self.frames[slot] = self.frames[last]
+            moved.__dict__["engine_slot"] = slot
+        self.sprites.pop()
+        self.rects.pop()
+        self.frames.pop()
+        self.count = last
+        if not self.count:
+            # Nobody points at the old targets any more, e.g. the previous run's player
+            self.targets = []
+            self.target_indices = {}
+
+    def get_target_index(self, target):
+        if target is None:
+            return -1
+        index = self.target_indices.get(target)
+        if index is None:
+            index = self.target_indices[target] = len(self.targets)
+            self.targets.append(target)
+        return index
+
+    def set_target(self, sprite, target):
+        self.arrays["target_index"][sprite.engine_slot] = self.get_target_index(target)
+
+    def set_target_pos(self, sprite, pos):
+        slot = sprite.engine_slot
+        self.arrays["has_goal"][slot] = bool(pos)
+        if pos:
+            self.arrays["goal_x"][slot], self.arrays["goal_y"][slot] = pos
+
+    def set_topleft(self, sprite, pos):
+        """Move a simulated sprite, e.g. when it is teleported back near the player. Its index cells follow at write_back()."""
+        slot = sprite.engine_slot
+        self.arrays["x"][slot], self.arrays["y"][slot] = pos
+
+    def step(self, dt):
+        """Advance every simulated enemy by one simulation step. Mirrors NPC.update."""
+        self.flush_pending()
+        count = self.count
+        if not count:
+            return
+        fields = self.fields
+        arrays = self.arrays
+        # Status effects are switched off by the TimerManager when they run out, so they are only read here
+        frozen = fields["frozen"][:count]
+        paralyzed = fields["paralyzed"][:count]
+        controlled = fields["controlled"][:count]
+        stalled = frozen | paralyzed
+
+        # Chase the target's current position, or the fixed target_pos
+        goal_x = arrays["goal_x"][:count]
+        goal_y = arrays["goal_y"][:count]
+        has_goal = arrays["has_goal"][:count]
+        target_index = arrays["target_index"][:count]
+        if self.targets:
+            target_positions = np.array([target.get_pos() for target in self.targets], dtype=float)
+            chasing = target_index >= 0
+            chased = target_index[chasing]
+            goal_x[chasing] = target_positions[chased, 0]
+            goal_y[chasing] = target_positions[chased, 1]
+            has_goal |= chasing
+
+        x = arrays["x"][:count]
+        y = arrays["y"][:count]
+        dx = goal_x - x
+        dy = goal_y - y
+        distance = np.hypot(dx, dy)
+        # Unit direction times speed, negated to flee while controlled, zero when standing still or already there
+        scale = np.divide(fields["speed"][:count], distance, out=np.zeros(count), where=distance != 0)
+        scale[controlled] *= -1
+        scale[~has_goal | stalled] = 0.0
+        vx = arrays["vx"][:count]
+        vy = arrays["vy"][:count]
+        np.multiply(dx, scale, out=vx)
+        np.multiply(dy, scale, out=vy)
+        x += vx * dt
+        y += vy * dt
+
+        # Frames come from the shared game_clock like Animation.current_frame_index, so they keep running while frozen
+        frame_index = arrays["frame_index"][:count]
+        frame_number = np.floor_divide(game_clock.time, arrays["animation_duration"][:count]).astype(int)
+        np.remainder(frame_number + arrays["animation_phase"][:count], arrays["frame_count"][:count], out=frame_index)
+        # Same priority as NPC.get_status_tint_index
+        status_tint = np.select((frozen, paralyzed, controlled), (FROZEN_TINT, PARALYZED_TINT, CONTROLLED_TINT), NO_TINT)
+        tint = arrays["tint"][:count]
+        shown_frame = arrays["shown_frame"][:count]
+        stale = (frame_index != shown_frame) | (status_tint != tint)
+        self.step_count += 1
+        if self.offscreen_animation_interval > 1 and self.view_rect is not None and self.step_count % self.offscreen_animation_interval:
+            # Nobody sees the frames of off-screen sprites, so they only catch up every few steps
+            view = self.view_rect
+            stale &= (x + arrays["width"][:count] > view.left) & (x < view.right) & (y + arrays["height"][:count] > view.top) & (y < view.bottom)
+        redrawn = np.flatnonzero(stale)
+        if len(redrawn):
+            tint[redrawn] = status_tint[redrawn]
+            shown_frame[redrawn] = frame_index[redrawn]
+            sprites = self.sprites
+            frames = self.frames
+            for slot, index, tint_index in zip(redrawn.tolist(), frame_index[redrawn].tolist(), status_tint[redrawn].tolist()):
+                variant = STATUS_TINT_VARIANTS[tint_index]
+                slot_frames = frames[slot] if variant is None else frame_cache.get_variant(frames[slot], variant)
+                sprites[slot].image = slot_frames[index]
+
+    def write_back(self):
+        """Copy the simulated positions into the rects that changed pixel, and move them in the spatial index."""
+        count = self.count
+        if not count:
+            return
+        arrays = self.arrays
+        new_x = np.rint(arrays["x"][:count]).astype(int)
+        new_y = np.rint(arrays["y"][:count]).astype(int)
+        rect_x = arrays["rect_x"][:count]
+        rect_y = arrays["rect_y"][:count]
+        changed = np.flatnonzero((new_x != rect_x) | (new_y != rect_y))
+        if not len(changed):
+            return
+        left = new_x[changed]
+        top = new_y[changed]
+        rect_x[changed] = left
+        rect_y[changed] = top
+        rects = self.rects
+        for slot, rect_left, rect_top in zip(changed.tolist(), left.tolist(), top.tolist()):
+            rects[slot].topleft = (rect_left, rect_top)
+
+        # Same cell maths as SpatialIndex.get_cell_range, for every changed rect at once
+        cell_size = self.spatial_index.cell_size
+        cell_ranges = (
+            left // cell_size,
+            top // cell_size,
+            (left + arrays["width"][changed].astype(int) - 1) // cell_size,
+            (top + arrays["height"][changed].astype(int) - 1) // cell_size,
+        )
+        stored_ranges = [arrays[name] for name in ("min_cell_x", "min_cell_y", "max_cell_x", "max_cell_y")]
+        crossed = np.zeros(len(changed), dtype=bool)
+        for cells, stored in zip(cell_ranges, stored_ranges):
+            crossed |= cells != stored[changed]
+        if crossed.any():
+            crossed_slots = changed[crossed]
+            for cells, stored in zip(cell_ranges, stored_ranges):
+                stored[crossed_slots] = cells[crossed]
+            move = self.spatial_index.move
+            sprites = self.sprites
+            crossed_ranges = zip(*(cells[crossed].tolist() for cells in cell_ranges))
+            for slot, cell_range in zip(crossed_slots.tolist(), crossed_ranges):
+                move(sprites[slot], cell_range)
+
+    def get_centers(self, slots):
+        """Float centre positions of the given slots, for the crowd pass."""
+        arrays = self.arrays
+        return arrays["x"][slots] + arrays["width"][slots] / 2, arrays["y"][slots] + arrays["height"][slots] / 2
+
+    def set_centers(self, slots, center_x, center_y):
+        arrays = self.arrays
+        arrays["x"][slots] = center_x - arrays["width"][slots] / 2
+        arrays["y"][slots] = center_y - arrays["height"][slots] / 2
+
+class EnemyGroup(IndexedGroup):
+    """
+    The all_enemies group. Members the EnemyEngine can vectorize are handed to it as they join, and
+    update() runs the engine's step alongside the update() of every other member (bosses etc.),
+    scheduled by the LodManager when there is one.
+    Without an engine it behaves like a plain IndexedGroup.
+
+    Members are also kept in a list, so get_random() doesn't have to copy the group.
+    """
+    def __init__(self, spatial_index, engine=None, *sprites):
+        self.engine = engine
+        self.lod_manager = None # Set to a LodManager to update the individual members at their level of detail
+        self.individual_members = {} # Members that run their own update(), in the order they joined
+        self.member_list = []
+        self.member_positions = {} # sprite -> index in member_list
+        super().__init__(spatial_index, IndexLayer.ENEMIES, *sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.member_positions[sprite] = len(self.member_list)
+        self.member_list.append(sprite)
+        if self.engine is None or not self.engine.add(sprite):
+            self.individual_members[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        # Fill the gap with the last member so removal stays O(1)
+        position = self.member_positions.pop(sprite)
+        last = self.member_list.pop()
+        if last is not sprite:
+            self.member_list[position] = last
+            self.member_positions[last] = position
+        if sprite in self.individual_members:
+            del self.individual_members[sprite]
+        elif self.engine is not None:
+            self.engine.remove(sprite)
+
+    def update(self, dt):
+        if self.lod_manager is not None:
+            self.lod_manager.update_sprites(self.individual_members, dt)
+        else:
+            for sprite in list(self.individual_members):
+                sprite.update(dt)
+        if self.engine is not None:
+            self.engine.step(dt)
+
+    def get_random(self, rng):
+        """A uniformly random member picked with `rng`, or None when the group is empty."""
+        return rng.choice(self.member_list) if self.member_list else None
+
+    def write_back(self):
+        if self.engine is not None:
+            self.engine.write_back()
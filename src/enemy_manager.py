@@ -1,17 +1,25 @@
 import math
-import pygame
-import random
+try:
+    import numpy as np
+except ImportError: # Only needed alongside the enemy engine, which needs it too
+    np = None
 from boss_manager import BossFightManager
-from config.settings import SCREEN_WIDTH, SCREEN_HEIGHT, ENEMY_SPAWN_INTERVAL, MAX_ENEMY_COUNT, OFF_SCREEN_DISTANCE
+from config.settings import SCREEN_WIDTH, SCREEN_HEIGHT, ENEMY_SPAWN_INTERVAL, OFF_SCREEN_DISTANCE, \
+    ENEMY_LEASH_DISTANCE, ENEMY_RECYCLE_INTERVAL, ENEMY_RECYCLE_SPREAD_DEGREES
 from config.gamestates import GameState
 from enemies import Enemy
-from helpers import get_distance_between_points
+
+# Far enough from the player that a spot on this circle is outside the camera in every direction
+RECYCLE_RING_RADIUS = math.hypot(SCREEN_WIDTH, SCREEN_HEIGHT) / 2 + OFF_SCREEN_DISTANCE
 
 
 class EnemyManager():
     def __init__(self, game_manager):
         self.game_manager = game_manager
         self.time_since_last_spawn_attempt = 0
+        self.time_since_last_recycle = 0
+        self.recycled_enemies = 0
+        self.waves_enabled = True # Timed waves and the boss cutscene. Benchmark scenes turn this off and place their own enemies
         self.spawn_enemies(target=self.game_manager.player)
         self.boss_manager = BossFightManager(self.game_manager)
 
@@ -19,20 +27,21 @@ class EnemyManager():
         spawn_pos = self.game_manager.player.get_pos()
         if custom_spawn_pos:
             spawn_pos = custom_spawn_pos
-        self.check_for_far_away_enemies(spawn_pos)
 
-        if len(self.game_manager.all_enemies) > MAX_ENEMY_COUNT:
+        governor = self.game_manager.quality_governor
+        if len(self.game_manager.all_enemies) > governor.enemy_cap:
             print("LOGGING: REACHED MAX ENEMY COUNT")
         else:
             self.game_manager.current_wave_number += 1
             self.all_spawnable_enemies = self.get_spawnable_enemies(self.game_manager.npcs_info)
             enemy_debug_name = enemy_name
             if enemy_debug_name == None:
-                enemy_debug_name = random.choice(self.all_spawnable_enemies)
+                enemy_debug_name = self.game_manager.rng.get("waves").choice(self.all_spawnable_enemies)
             # Create and add enemies to the game
             wave_type_id = wave_pattern_id
             if wave_type_id == None:
-                wave_type_id = random.randint(0, 3)
+                wave_type_id = self.game_manager.rng.get("waves").randint(0, 3)
+            count = governor.get_spawn_count(count)
             if wave_type_id == 0:
                 self.spawn_line_enemies(spawn_pos, count, "vertical", self.game_manager, enemy_debug_name)
             elif wave_type_id == 1:
@@ -40,50 +49,72 @@ class EnemyManager():
             elif wave_type_id == 2:
                 self.spawn_herd_enemies(spawn_pos, count, self.game_manager, enemy_debug_name)
             else:
-                for _ in range(20):  # Example: spawn 5 enemies
-                    enemy = Enemy((random.randint(spawn_pos[0]-SCREEN_WIDTH/2, spawn_pos[0]+SCREEN_WIDTH/2), random.randint(spawn_pos[1]-SCREEN_HEIGHT/2, spawn_pos[1]+SCREEN_HEIGHT/2)), self.game_manager.npcs_info[enemy_debug_name], self.game_manager, self.game_manager.all_enemies)
+                rng = self.game_manager.rng.get("waves")
+                for _ in range(governor.get_spawn_count(20)):  # Example: spawn 5 enemies
+                    enemy = self.game_manager.pools.acquire(Enemy, (rng.randint(spawn_pos[0]-SCREEN_WIDTH/2, spawn_pos[0]+SCREEN_WIDTH/2), rng.randint(spawn_pos[1]-SCREEN_HEIGHT/2, spawn_pos[1]+SCREEN_HEIGHT/2)), self.game_manager.npcs_info[enemy_debug_name], self.game_manager, self.game_manager.all_enemies)
                     enemy.set_target(target)
         self.time_since_last_spawn_attempt = 0
 
-    def check_for_far_away_enemies(self, player_pos):
-        player_x, player_y = player_pos
-
-        for enemy in self.game_manager.all_enemies:
-            enemy_pos = enemy.get_pos()
-            enemy_x, enemy_y = enemy_pos
-
-            # Calculate the distance between the player and the enemy
-            distance = get_distance_between_points(enemy.get_pos(), player_pos)
-
-            if distance > SCREEN_WIDTH / 2 + 300: 
-                # Calculate the inverse position relative to the player
-                inverse_x = player_x + (player_x - enemy_x)
-                inverse_y = player_y + (player_y - enemy_y)
-
-                # Determine the new off-screen position
-                if inverse_x > player_x:
-                    new_enemy_x = player_x + SCREEN_WIDTH / 2 + OFF_SCREEN_DISTANCE
-                else:
-                    new_enemy_x = player_x - SCREEN_WIDTH / 2 - OFF_SCREEN_DISTANCE
-
-                if inverse_y > player_y:
-                    new_enemy_y = player_y + SCREEN_HEIGHT / 2 + OFF_SCREEN_DISTANCE
-                else:
-                    new_enemy_y = player_y - SCREEN_HEIGHT / 2 - OFF_SCREEN_DISTANCE
-
-                # Set the new position of the enemy
-                enemy.set_pos((new_enemy_x, new_enemy_y))
+    def recycle_far_enemies(self):
+        """
+        Brings back enemies the player has left more than ENEMY_LEASH_DISTANCE behind, so they
+        are back in the fight instead of being simulated where nobody can see them. They are
+        moved to spots just outside the camera ahead of where the player is heading (or across
+        from where they were, while the player stands still). While there are more enemies than
+        the quality governor's enemy cap the excess is returned to the pool instead.
+        """
+        player_x, player_y = self.game_manager.player.rect.center
+        far_enemies = self.get_far_enemies(player_x, player_y)
+        if not far_enemies:
+            return
+        excess = len(self.game_manager.all_enemies) - self.game_manager.quality_governor.enemy_cap
+        if excess > 0:
+            for enemy in far_enemies[:excess]:
+                enemy.kill()
+            far_enemies = far_enemies[excess:]
+
+        rng = self.game_manager.rng.get("recycle")
+        heading = self.game_manager.player.velocity
+        spread = math.radians(ENEMY_RECYCLE_SPREAD_DEGREES)
+        for enemy in far_enemies:
+            if heading.x or heading.y:
+                angle = math.atan2(heading.y, heading.x)
+            else:
+                enemy_x, enemy_y = enemy.get_pos()
+                angle = math.atan2(player_y - enemy_y, player_x - enemy_x)
+            angle += rng.uniform(-spread, spread)
+            enemy.set_pos((player_x + RECYCLE_RING_RADIUS * math.cos(angle), player_y + RECYCLE_RING_RADIUS * math.sin(angle)))
+        self.recycled_enemies += len(far_enemies)
+
+    def get_far_enemies(self, player_x, player_y):
+        """Enemies whose centre is further than ENEMY_LEASH_DISTANCE from the player, engine ones checked as one array operation."""
+        all_enemies = self.game_manager.all_enemies
+        engine = all_enemies.engine
+        far_enemies = []
+        individual_enemies = list(all_enemies.individual_members)
+        if engine is not None:
+            if engine.count:
+                center_x, center_y = engine.get_centers(slice(0, engine.count))
+                far_slots = np.flatnonzero((center_x - player_x) ** 2 + (center_y - player_y) ** 2 > ENEMY_LEASH_DISTANCE ** 2)
+                far_enemies.extend(engine.sprites[slot] for slot in far_slots.tolist())
+            individual_enemies.extend(engine.pending)
+        for enemy in individual_enemies:
+            enemy_x, enemy_y = enemy.get_pos()
+            if (enemy_x - player_x) ** 2 + (enemy_y - player_y) ** 2 > ENEMY_LEASH_DISTANCE ** 2:
+                far_enemies.append(enemy)
+        return far_enemies
 
     def spawn_herd_enemies(self, player_pos, num_enemies, game_manager, debug_name, radius=100, random_offset=10, stagger=False):
         enemies = []
         center_x, center_y = player_pos
+        rng = game_manager.rng.get("herds")
 
         for _ in range(num_enemies):
             # Randomly place enemies within the defined radius around the player
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(radius / 2, radius)
-            x = center_x + distance * math.cos(angle) + random.randint(-random_offset, random_offset)
-            y = center_y + distance * math.sin(angle) + random.randint(-random_offset, random_offset)
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(radius / 2, radius)
+            x = center_x + distance * math.cos(angle) + rng.randint(-random_offset, random_offset)
+            y = center_y + distance * math.sin(angle) + rng.randint(-random_offset, random_offset)
 
             # Ensure enemies are placed slightly offscreen, adjust the x and y accordingly
             if x < SCREEN_WIDTH / 2:
@@ -96,11 +127,11 @@ class EnemyManager():
                 y += SCREEN_HEIGHT / 2
 
             # Create the enemy and add it to the game manager
-            enemy = Enemy((x, y), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
+            enemy = game_manager.pools.acquire(Enemy, (x, y), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
 
             # Optionally set a staggered target
             if stagger:
-                stagger_offset = random.uniform(0, 1)  # Random stagger delay
+                stagger_offset = rng.uniform(0, 1)  # Random stagger delay
                 enemy.set_target(self.game_manager.player, stagger_offset=stagger_offset)
             else:
                 enemy.set_target(self.game_manager.player)
@@ -112,6 +143,7 @@ class EnemyManager():
         # Calculate the total length of the line and offset to center the line on the player
         overall_length_of_line = num_enemies * spacing
         offset = -overall_length_of_line / 2
+        rng = game_manager.rng.get("herds")
 
         for i in range(num_enemies):
             if direction == 'horizontal':
@@ -121,13 +153,13 @@ class EnemyManager():
                 x = player_pos[0] + i * spacing + offset
                 
                 # Adding randomness to position
-                x += random.randint(-random_offset, random_offset)
-                y_left += random.randint(-random_offset, random_offset)
-                y_right += random.randint(-random_offset, random_offset)
+                x += rng.randint(-random_offset, random_offset)
+                y_left += rng.randint(-random_offset, random_offset)
+                y_right += rng.randint(-random_offset, random_offset)
 
                 # Spawning enemies on the left and right sides
-                left_enemy = Enemy((x, y_left), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
-                right_enemy = Enemy((x, y_right), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
+                left_enemy = game_manager.pools.acquire(Enemy, (x, y_left), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
+                right_enemy = game_manager.pools.acquire(Enemy, (x, y_right), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
 
                 # Optionally set a staggered target
                 if stagger:
@@ -144,13 +176,13 @@ class EnemyManager():
                 y = player_pos[1] + i * spacing + offset
                 
                 # Adding randomness to position
-                x_top += random.randint(-random_offset, random_offset)
-                x_bottom += random.randint(-random_offset, random_offset)
-                y += random.randint(-random_offset, random_offset)
+                x_top += rng.randint(-random_offset, random_offset)
+                x_bottom += rng.randint(-random_offset, random_offset)
+                y += rng.randint(-random_offset, random_offset)
 
                 # Spawning enemies on the top and bottom sides
-                top_enemy = Enemy((x_top, y), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
-                bottom_enemy = Enemy((x_bottom, y), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
+                top_enemy = game_manager.pools.acquire(Enemy, (x_top, y), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
+                bottom_enemy = game_manager.pools.acquire(Enemy, (x_bottom, y), game_manager.npcs_info[debug_name], game_manager, game_manager.all_enemies)
 
                 # Optionally set a staggered target
                 if stagger:
@@ -169,40 +201,33 @@ class EnemyManager():
     
     def spawn_elite_enemy(self, pos):
         #TODO: Implement elite enemies
-        debug_name = random.choice(self.all_spawnable_enemies)
-        enemy = Enemy(pos, self.game_manager.npcs_info[debug_name], self.game_manager, self.game_manager.all_enemies)
+        debug_name = self.game_manager.rng.get("waves").choice(self.all_spawnable_enemies)
+        enemy = self.game_manager.pools.acquire(Enemy, pos, self.game_manager.npcs_info[debug_name], self.game_manager, self.game_manager.all_enemies)
         enemy.set_target(self.game_manager.player)
         self.game_manager.all_enemies.add(enemy)
 
     def update(self, dt):
-        if self.game_manager.state == GameState.PLAYING:
+        if self.game_manager.state == GameState.PLAYING and self.waves_enabled:
             if self.game_manager.elapsed_time > self.game_manager.selected_stage['boss_spawn_timer']:
                 self.start_boss_cutscene()
                 return
             self.time_since_last_spawn_attempt += dt
             if self.time_since_last_spawn_attempt > ENEMY_SPAWN_INTERVAL:
                 self.spawn_enemies(target=self.game_manager.player)
+            self.time_since_last_recycle += dt
+            if self.time_since_last_recycle >= ENEMY_RECYCLE_INTERVAL:
+                self.recycle_far_enemies()
+                self.time_since_last_recycle = 0
         if self.game_manager.state == GameState.BOSS_FIGHT:
             self.boss_manager.update(dt)
 
     def get_closest_enemy(self):
-        closest_enemy = None
-        min_distance = float('inf')
-        for enemy in self.game_manager.all_enemies:
-            distance = pygame.math.Vector2(self.game_manager.player.rect.center).distance_to(enemy.rect.center)
-            if distance < min_distance:
-                min_distance = distance
-                closest_enemy = enemy
-        return closest_enemy
+        return self.game_manager.targeting.get_nearest(self.game_manager.player.rect.center)
     
     def get_random_enemy(self):
-        random_enemy = None
-        if len(self.game_manager.all_enemies) > 0:
-            all_enemy_sprites = self.game_manager.all_enemies.sprites()
-            random_enemy = random.choice(all_enemy_sprites)
-        return random_enemy
+        return self.game_manager.targeting.get_random(self.game_manager.rng.get("abilities"))
     
     def start_boss_cutscene(self):
         self.game_manager.change_state(GameState.CUTSCENE)
-        self.game_manager.all_enemies = pygame.sprite.Group()
+        self.game_manager.all_enemies.empty()
         self.game_manager.cutscene_manager.start_cutscene()
\ No newline at end of file
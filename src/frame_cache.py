@@ -0,0 +1,122 @@
+import pygame
+from collections import OrderedDict
+from config.settings import FRAME_CACHE_MAX_BYTES, VARIANT_ROTATION_STEP_DEGREES
+
+# Variants, see FrameCache.get_variant
+FLIP_HORIZONTAL = ("flip",)
+
+def get_rotation_variant(angle, step=VARIANT_ROTATION_STEP_DEGREES):
+    """Counterclockwise rotation in degrees, rounded to `step` so nearby angles share their frames."""
+    return ("rotate", round(angle / step) * step % 360)
+
+def get_scale_variant(size):
+    return ("scale", (int(size[0]), int(size[1])))
+
+def get_tint_variant(color):
+    """Multiplies every visible pixel by `color`, leaving transparent ones alone."""
+    return ("tint", tuple(color))
+
+def build_variant(frame, variant):
+    kind = variant[0]
+    if kind == "rotate":
+        image = pygame.transform.rotate(frame, variant[1])
+    elif kind == "flip":
+        image = pygame.transform.flip(frame, True, False)
+    elif kind == "scale":
+        image = pygame.transform.scale(frame, variant[1])
+    elif kind == "tint":
+        image = frame.copy()
+        # Multiplying by white leaves a pixel as it was, so only the visible pixels take the colour
+        overlay = pygame.mask.from_surface(frame).to_surface(setcolor=(*variant[1], 255), unsetcolor=(255, 255, 255, 255))
+        image.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+    else:
+        raise ValueError(f"Unknown frame variant {variant}")
+    if frame.get_colorkey() is not None:
+        image.set_colorkey(frame.get_colorkey())
+    return image
+
+def get_surface_bytes(surface):
+    # Not the pitch: a subsurface of an atlas page has the page's
+    return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+class FrameCache:
+    """
+    Process-wide cache of loaded animation frames, so spawning something whose frames were
+    loaded before touches neither the disk nor pygame.transform.
+
+    Entries are keyed by everything that decides what the frames look like (directory, file
+    prefix, scale, flip, colorkey) and hold a tuple of surfaces. The tuples and their surfaces
+    are shared by every sprite using them, so nothing may draw on or change a cached surface;
+    make a copy first.
+
+    Transformed copies of cached frames (rotated, flipped, scaled, tinted) are built the first
+    time they are asked for with get_variant() and then cached like any other entry, so sprites
+    only look their frames up instead of transforming them every step.
+
+    The pixel memory of every entry is counted and the least recently used entries are dropped
+    once the total goes over max_bytes. Sprites still holding a dropped tuple keep it alive, the
+    next load of that key just reads it from disk again.
+    """
+    def __init__(self, max_bytes=FRAME_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (frames, byte_count), least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, loader):
+        """
+        The cached frames for `key`, or the result of loader() stored under it.
+
+        :param key: Hashable description of the frames, including every load parameter.
+        :param loader: Called with no arguments on a miss. Returns a sequence of surfaces.
+        :return: A tuple of surfaces.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+        self.misses += 1
+        frames = tuple(loader())
+        byte_count = sum(get_surface_bytes(frame) for frame in frames)
+        self.entries[key] = (frames, byte_count)
+        self.total_bytes += byte_count
+        self.evict()
+        return frames
+
+    def get_variant(self, frames, variant):
+        """
+        `frames` with a transform applied to each, built once and shared like the frames themselves.
+
+        :param frames: A frame tuple returned by this cache.
+        :param variant: FLIP_HORIZONTAL, or what get_rotation_variant, get_scale_variant or get_tint_variant return.
+        :return: A tuple of surfaces, in the same order as `frames`.
+        """
+        return self.get((frames, variant), lambda: [build_variant(frame, variant) for frame in frames])
+
+    def evict(self):
+        # The newest entry always stays, even when it alone is over the limit
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, (frames, byte_count) = self.entries.popitem(last=False)
+            self.total_bytes -= byte_count
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def get_stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+frame_cache = FrameCache()
@@ -1,42 +1,89 @@
+import os
 import pygame
 import sys
+from animation_clock import game_clock, menu_clock
+from camera import Camera
 from cinematic_manager import CinematicManager
-from config.settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from collision_manager import CollisionManager
+from config.settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, PLAYER_START_POS, USE_ENEMY_ENGINE, POOL_PREWARM_ENEMIES_PER_TYPE, POOL_PREWARM_DAMAGE_TEXTS, POOL_PREWARM_XP_ITEMS
 from config.gamestates import GameState
+from crowd_manager import CrowdManager
 from cutscenes import CutsceneManager
+from damagetext import DamageText
+from enemies import Enemy
 from encounters.encounters import EncounterManager, Encounter
+from enemy_engine import EnemyEngine, EnemyGroup
 from enemy_manager import EnemyManager
 from hud import HeaderBar
-from menus import HomeScreen, StageSelectScreen, GameOverScreen, LevelUpScreen
+from items import XPItem
+from menus import HomeScreen, StageSelectScreen, LoadingScreen, GameOverScreen, LevelUpScreen
+from lod_manager import LodManager
 from loot_manager import LootManager
+from perf_overlay import FrameProfiler, PerformanceOverlay
 from player import Player
-from quadtree import QuadTree
+from pool_manager import PoolManager
+from preload_manager import PreloadManager
+from quality_governor import QualityGovernor
+from rng_manager import RngManager
+from simulation_clock import SimulationClock, snapshot_positions, get_interpolated_pos
+from spatial_index import SpatialIndex, IndexedGroup, IndexLayer
 from stages import Stage
+from targeting_manager import TargetingManager
+from timer_manager import TimerManager
 from sound_manager import SoundManager
 from ui_manager import UIManager
 import helpers
-import cProfile
+
+SIMULATED_STATES = (GameState.PLAYING, GameState.BOSS_FIGHT, GameState.CUTSCENE)
+GAMEPLAY_STATES = (GameState.PLAYING, GameState.BOSS_FIGHT) # Game time (the TimerManager) only runs in these
 
 class GameManager:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None):
+        """
+        :param headless: Run without a window or audio output. The simulation still runs in full,
+                         but nothing is drawn and sounds are never loaded or played.
+        :param seed: Master seed for all gameplay randomness. The same seed (and the same input)
+                     gives the same sequence of runs. None picks a random seed.
+        """
+        self.headless = headless
+        if self.headless:
+            # Must be set before pygame.init(). The dummy video driver still gives us a display
+            # surface, so image conversion works without a real window
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("The Chain of Shadows")
         self.clock = pygame.time.Clock()
+        self.simulation_clock = SimulationClock()
+        self.timer_manager = TimerManager() # Game time, and the cooldowns, staggers and status effects scheduled on it
+        self.rng = RngManager(seed)
+        self.input_recorder = None # Set to an InputRecorder to record each run's input
+        self.replay = None # Set to a ReplayInput to play back a recording instead of reading input
         self.running = True
         self.state = GameState.HOME_SCREEN
+        self.timer_manager.paused = True
 
         # Initialize game objects
+        self.spatial_index = SpatialIndex() # World-space lookup for everything in the indexed groups below
         self.all_map_sprites = pygame.sprite.Group()
         self.all_sprites = pygame.sprite.Group()
-        self.all_neutral_npcs = pygame.sprite.Group()
-        self.all_enemies = pygame.sprite.Group()
-        self.all_ability_sprites = pygame.sprite.Group()
+        self.all_neutral_npcs = IndexedGroup(self.spatial_index, IndexLayer.NEUTRAL_NPCS)
+        self.enemy_engine = EnemyEngine(self.spatial_index) if USE_ENEMY_ENGINE and EnemyEngine.is_available() else None
+        self.all_enemies = EnemyGroup(self.spatial_index, self.enemy_engine)
+        self.lod_manager = LodManager(self) # Schedules the update() of NPCs by their distance from the camera
+        self.all_enemies.lod_manager = self.lod_manager
+        self.targeting = TargetingManager(self) # Nearest/random enemy lookups for abilities
+        self.pools = PoolManager() # Recycles enemies, projectiles, damage texts and XP orbs, across runs too
+        self.all_ability_sprites = IndexedGroup(self.spatial_index, IndexLayer.ABILITY_SPRITES)
         self.in_game_ui = pygame.sprite.Group()
-        self.items = pygame.sprite.Group()
+        self.items = IndexedGroup(self.spatial_index, IndexLayer.ITEMS)
         self.hud_elements = pygame.sprite.Group()
         self.player_sprites = pygame.sprite.Group()
         self.damage_texts = pygame.sprite.Group()  # Group for damage texts
+        # World-space groups drawn by the camera, back to front
+        self.render_layers = (self.items, self.all_sprites, self.all_enemies, self.all_neutral_npcs, self.all_ability_sprites, self.player_sprites)
+        self.drawn_sprite_count = 0
 
         # Loaded data from files
         self.ability_info = helpers.get_all_abilities_info()
@@ -48,18 +95,22 @@ class GameManager:
         # Global Managers
         self.cinematic_manager = CinematicManager(self)
         self.cutscene_manager = CutsceneManager(self)
-        self.sound_manager = SoundManager()
+        self.sound_manager = SoundManager(muted=self.headless)
         self.ui_manager = UIManager(self)
+        self.profiler = FrameProfiler()
+        self.perf_overlay = PerformanceOverlay(self, self.profiler)
+        self.quality_governor = QualityGovernor(self)
+        self.preload_manager = PreloadManager(self)
 
         # Game stats
-        self.selected_stage = self.stages_info[0]
-        self.selected_character = [x for x in self.character_info if x['name'] == self.selected_stage['playable_character']][0]
+        self.select_stage(self.stages_info[0])
         self.current_wave_number = 0
         self.enemies_defeated = 0
 
         # Screens
         self.home_screen = HomeScreen(self)
         self.stage_select_screen = StageSelectScreen(self, self.stages_info)
+        self.loading_screen = LoadingScreen(self)
         self.game_over_screen = GameOverScreen(self)
         self.level_up_screen = LevelUpScreen(self)
 
@@ -69,20 +120,42 @@ class GameManager:
 
     def change_state(self, new_state):
         self.state = new_state
+        self.timer_manager.paused = new_state not in GAMEPLAY_STATES
+
+    def select_stage(self, stage_info):
+        self.selected_stage = stage_info
+        self.selected_character = [x for x in self.character_info if x['name'] == self.selected_stage['playable_character']][0]
 
     def load_assets(self):
         # Load images, sounds, etc.
         pass
 
+    def prewarm_pools(self):
+        """Build the objects the first waves will need up front, so they are recycled rather than constructed mid-fight."""
+        self.pools.prewarm(DamageText, POOL_PREWARM_DAMAGE_TEXTS, "", (0, 0))
+        item_data = self.items_info['small_xp_orb']
+        self.pools.prewarm(XPItem, POOL_PREWARM_XP_ITEMS, self, item_data['id'], item_data['name'], item_data['description'],
+                           item_data['xp_value'], item_data['score'], (0, 0))
+        for debug_name, npc_info in self.npcs_info.items():
+            if 'event_only' not in npc_info:
+                self.pools.prewarm(Enemy, POOL_PREWARM_ENEMIES_PER_TYPE, (0, 0), npc_info, self)
+
     def new_game(self):
         # Load assets and initialize other elements
         self.load_assets()
+        self.rng.start_run(self.replay.run_seed if self.replay else None)
+        game_clock.reset() # Animations play out the same way in every run
+        self.timer_manager.reset() # Before the player, whose abilities start their cooldowns on it
 
-        self.camera = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        if self.enemy_engine is not None:
+            self.enemy_engine.view_rect = self.camera.cull_rect # Moved in place as the camera follows the player
         # Start a new game
         self.all_sprites.empty()
         self.all_map_sprites.empty()
         self.all_enemies.empty()
+        self.all_neutral_npcs.empty()
+        self.all_ability_sprites.empty()
         self.in_game_ui.empty()
         self.hud_elements.empty()
         self.items.empty()
@@ -93,21 +166,37 @@ class GameManager:
         self.elapsed_time = 0
 
         # Initialize player, enemies, and items
-        self.player = Player((100, 100), self)
+        self.collision_manager = CollisionManager(self) # Before the player, whose abilities register their sprites with it
+        self.player = Player(PLAYER_START_POS, self)
+        self.prewarm_pools() # Before the enemy manager spawns its first wave
+        if self.replay:
+            self.replay.start_run()
+            self.player.input_source = self.replay
+        if self.input_recorder:
+            self.input_recorder.start_run()
         self.enemy_manager = EnemyManager(self)
+        self.crowd_manager = CrowdManager(self)
         self.header_bar = HeaderBar(self, self.hud_elements)
         self.loot_manager = LootManager(self)
         self.encounter_manager = EncounterManager(self, min_distance=self.stage.random_encounter_distance)
 
     def run(self):
         while self.running:
-            dt = self.clock.tick(FPS) / 1000  # Convert milliseconds to seconds
+            frame_time = self.clock.tick(FPS) / 1000  # Convert milliseconds to seconds
+            menu_clock.tick(frame_time)
             if self.state == GameState.HOME_SCREEN:
                 self.home_screen.handle_events(pygame.event.get())
                 self.home_screen.display()
             elif self.state == GameState.STAGE_SELECT:
                 self.stage_select_screen.handle_events(pygame.event.get())
                 self.stage_select_screen.display()
+            elif self.state == GameState.LOADING:
+                self.loading_screen.handle_events(pygame.event.get())
+                self.preload_manager.update()
+                self.loading_screen.display(self.preload_manager.get_progress())
+                if self.preload_manager.is_done():
+                    self.stage = self.preload_manager.stage
+                    self.change_state(GameState.CINEMATIC)
             elif self.state == GameState.CINEMATIC:
                 self.sound_manager.load_stage(self.stage)
                 self.cinematic_manager.play_cinematic(self.stage.name.lower()+"_intro")  # Play intro cinematic
@@ -117,26 +206,46 @@ class GameManager:
             elif self.state == GameState.GAME_OVER:
                 self.game_over_screen.handle_events(pygame.event.get())
                 self.draw(self.game_over_screen)
-            elif self.state == GameState.PLAYING:
-                self.elapsed_time += dt
+            elif self.state in (GameState.PLAYING, GameState.BOSS_FIGHT):
+                self.quality_governor.update(self.clock.get_rawtime()) # The last frame's work, without the wait for the FPS cap
                 self.handle_events()
-                self.update(dt)
+                self.run_simulation(frame_time)
                 self.draw()
             elif self.state == GameState.CUTSCENE:
-                self.cutscene_manager.update(dt)
+                self.run_simulation(frame_time)
                 self.draw()
             elif self.state == GameState.LEVEL_UP:
                 self.level_up_screen.handle_events(pygame.event.get())
                 self.draw(self.level_up_screen)
-            elif self.state == GameState.BOSS_FIGHT:
-                self.elapsed_time += dt
-                self.handle_events()
-                self.update(dt)
-                self.draw()
+            self.profiler.end_frame(frame_time)
 
         pygame.quit()
         sys.exit()
 
+    def run_simulation(self, frame_time):
+        """Run as many fixed-size simulation steps as the elapsed frame time allows."""
+        steps = self.simulation_clock.advance(frame_time)
+        for _ in range(steps):
+            if self.state not in SIMULATED_STATES:
+                # A step opened a menu (level up, game over), so the rest of the owed time is discarded
+                self.simulation_clock.reset()
+                break
+            self.step_simulation(self.simulation_clock.step)
+
+    def step_simulation(self, dt):
+        """Advance the game by exactly one fixed timestep."""
+        snapshot_positions(self.all_sprites, self.all_enemies, self.all_neutral_npcs, self.all_ability_sprites, self.player_sprites)
+        self.simulation_clock.on_step()
+        game_clock.tick(dt)
+        game_dt = self.timer_manager.update(dt) # Runs the timers that are due, nothing while paused
+        if self.state == GameState.CUTSCENE:
+            self.cutscene_manager.update(dt)
+            self.spatial_index.refresh()
+        else:
+            self.elapsed_time += game_dt
+            self.update(game_dt)
+        self.pools.end_step() # What was killed this step can be reused from the next one
+
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -144,73 +253,73 @@ class GameManager:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
                 # Handle other key events, such as pause, restart, etc.
 
     def update(self, dt):
-        self.enemy_manager.update(dt)
-        # Update all sprites
+        profiler = self.profiler
+        self.lod_manager.begin_step()
+        with profiler.section("enemy_manager.update"):
+            self.enemy_manager.update(dt)
 
-        self.all_sprites.update(dt)
-        self.all_ability_sprites.update(dt)  # Update abilities
-        self.all_enemies.update(dt)
-        self.all_map_sprites.update(dt)
-        self.all_neutral_npcs.update(dt)
-        self.player_sprites.update(dt)
+        # Update all sprites
+        with profiler.section("all_sprites.update"):
+            self.all_sprites.update(dt)
+        with profiler.section("all_ability_sprites.update"):
+            self.all_ability_sprites.update(dt)  # Update abilities
+        with profiler.section("all_enemies.update"):
+            self.all_enemies.update(dt)
+        with profiler.section("all_map_sprites.update"):
+            self.all_map_sprites.update(dt)
+        with profiler.section("all_neutral_npcs.update"):
+            self.lod_manager.update_sprites(self.all_neutral_npcs, dt)
+        with profiler.section("crowd_manager.update"):
+            self.crowd_manager.update()
+        with profiler.section("enemy_engine.write_back"):
+            self.all_enemies.write_back() # Engine positions into rects, now the crowd has been separated
+        with profiler.section("player_sprites.update"):
+            self.player_sprites.update(dt)
         
         # Update camera position to follow player
-        self.camera.center = self.player.rect.center
+        self.camera.follow(self.player.rect.center)
         self.encounter_manager.update()
-        self.hud_elements.update()
-        self.in_game_ui.update(self.camera.topleft)
+        if not self.headless:
+            # The HUD only re-renders its text and bars, so there is nothing to do without a display
+            with profiler.section("hud.update"):
+                self.hud_elements.update()
+                self.in_game_ui.update(self.camera.rect.topleft)
         self.ui_manager.update(dt)
+        with profiler.section("spatial_index.refresh"):
+            self.spatial_index.refresh()
 
-        # Check collisions
-        self.check_collisions()
+        # Every hit, contact and pickup of the step, in one pass
+        with profiler.section("check_collisions"):
+            self.collision_manager.update()
 
     def draw(self, overlay_screen=None):
-        # Clear screen
-        self.screen.fill((30, 30, 30))
-
-        # Draw all sprites with camera adjustment
-        self.stage.draw()
-        for map_item in self.items:
-            screen_pos = map_item.rect.move(-self.camera.topleft[0], -self.camera.topleft[1])
-            self.screen.blit(map_item.image, screen_pos)
-        for item in self.items:
-            screen_pos = item.rect.move(-self.camera.topleft[0], -self.camera.topleft[1])
-            self.screen.blit(item.image, screen_pos)
-        for sprite in self.all_sprites:
-            screen_pos = sprite.rect.move(-self.camera.topleft[0], -self.camera.topleft[1])
-            self.screen.blit(sprite.image, screen_pos)
-        for enemy_sprite in self.all_enemies:
-            enemy_sprite.draw(self.screen)
-        for neutral_npc in self.all_neutral_npcs:
-            neutral_npc.draw(self.screen)
-        for ability_sprite in self.all_ability_sprites:
-            ability_sprite.draw(self.screen)
-        for player_sprite in self.player_sprites:
-            screen_pos = player_sprite.rect.move(-self.camera.topleft[0], -self.camera.topleft[1])
-            self.screen.blit(player_sprite.image, screen_pos)
+        # Follow the player's interpolated position so the camera doesn't judder between simulation steps
+        alpha = self.simulation_clock.alpha
+        player_x, player_y = get_interpolated_pos(self.player, alpha)
+        self.camera.follow((player_x + self.player.rect.width // 2, player_y + self.player.rect.height // 2))
+
+        profiler = self.profiler
+        with profiler.section("stage.draw"):
+            self.stage.draw()
+        # Each layer is culled to the viewport and submitted in one blits call, so the cost follows what is on screen
+        with profiler.section("sprite blits"):
+            self.drawn_sprite_count = 0
+            for layer in self.render_layers:
+                blit_sequence = self.camera.get_visible_blits(layer, alpha)
+                self.screen.blits(blit_sequence, doreturn=False)
+                self.drawn_sprite_count += len(blit_sequence)
         self.in_game_ui.draw(self.screen)
         self.hud_elements.draw(self.screen)
         self.ui_manager.draw(self.screen)
+        self.perf_overlay.draw(self.screen)
         if overlay_screen:
             overlay_screen.display()
        
         # Update display
-        pygame.display.flip()
-
-    def check_collisions(self):
-        world_boundary = pygame.Rect(self.player.rect.centerx-SCREEN_WIDTH/2, self.player.rect.centery-SCREEN_HEIGHT/2, SCREEN_WIDTH, SCREEN_HEIGHT)
-        quadtree = QuadTree(world_boundary, 4)  # capacity = 4 objects per node
-        for enemy in self.all_enemies:
-            quadtree.insert(enemy)
-        nearby_enemies = quadtree.query(self.player.rect, [])
-        # Check collisions between player and enemies
-        player_hits = pygame.sprite.spritecollide(self.player, nearby_enemies, False, pygame.sprite.collide_rect)
-        for enemy in player_hits:
-            enemy.attack()
-
-        item_hits = pygame.sprite.spritecollide(self.player, self.items, True)
-        for item in item_hits:
-            item.on_collect()
\ No newline at end of file
+        with profiler.section("display.flip"):
+            pygame.display.flip()
@@ -0,0 +1,194 @@
+import math
+import pygame
+import time
+import traceback
+from config.gamestates import GameState
+from game_manager import SIMULATED_STATES
+from stages import Stage
+
+class ScriptedInput:
+    """
+    Replays a fixed movement script on a loop.
+
+    The script is a list of (duration_in_seconds, (dx, dy)) steps, measured in simulation time
+    so the same script always produces the same movement regardless of how fast the run goes.
+    """
+    DEFAULT_SCRIPT = [
+        (3, (1, 0)),
+        (3, (0, 1)),
+        (3, (-1, 0)),
+        (3, (0, -1)),
+        (2, (0, 0)),
+    ]
+
+    def __init__(self, game_manager, script=None):
+        self.game_manager = game_manager
+        self.script = script if script else self.DEFAULT_SCRIPT
+        self.script_length = sum(duration for duration, _ in self.script)
+
+    def get_movement(self, player):
+        simulated_time = self.game_manager.simulation_clock.tick * self.game_manager.simulation_clock.step
+        time_in_script = simulated_time % self.script_length
+        for duration, direction in self.script:
+            if time_in_script < duration:
+                return direction
+            time_in_script -= duration
+        return (0, 0)
+
+    def choose_upgrade(self, upgrade_options):
+        return 0
+
+class KitingBot:
+    """
+    Simple AI player: backs away from nearby enemies, otherwise walks to the closest XP orb,
+    otherwise wanders in a slow circle so new waves and encounters keep triggering.
+    """
+    def __init__(self, game_manager, threat_radius=350, loot_radius=900):
+        self.game_manager = game_manager
+        self.threat_radius = threat_radius
+        self.loot_radius = loot_radius
+
+    def get_movement(self, player):
+        player_x, player_y = player.rect.center
+        flee_x = flee_y = 0.0
+        for enemy in self.game_manager.all_enemies:
+            dx = player_x - enemy.rect.centerx
+            dy = player_y - enemy.rect.centery
+            distance_squared = dx * dx + dy * dy
+            if 0 < distance_squared < self.threat_radius * self.threat_radius:
+                # Closer enemies push harder
+                flee_x += dx / distance_squared
+                flee_y += dy / distance_squared
+        if flee_x or flee_y:
+            return flee_x, flee_y
+
+        closest_item = None
+        closest_distance_squared = self.loot_radius * self.loot_radius
+        for item in self.game_manager.items:
+            dx = item.rect.centerx - player_x
+            dy = item.rect.centery - player_y
+            distance_squared = dx * dx + dy * dy
+            if distance_squared < closest_distance_squared:
+                closest_item, closest_distance_squared = (dx, dy), distance_squared
+        if closest_item:
+            return closest_item
+
+        wander_angle = self.game_manager.simulation_clock.tick / 600
+        return math.cos(wander_angle), math.sin(wander_angle)
+
+    def choose_upgrade(self, upgrade_options):
+        """Pick the rarest option on offer, preferring the first one on ties."""
+        rarity_weights = [option.rarity.weight for option in upgrade_options]
+        return rarity_weights.index(min(rarity_weights))
+
+class HeadlessRunner:
+    """
+    Drives a headless GameManager as fast as the CPU allows for soak testing.
+
+    Runs back to back games on the selected stage: menus are skipped, level up choices are made
+    by the bot, and a new run starts whenever the player dies. Exceptions are recorded in the
+    report and the runner carries on with a fresh run, unless stop_on_error is set.
+    """
+    def __init__(self, game_manager, bot, stage_name=None, stop_on_error=False, log_interval_minutes=10, max_runs=None):
+        """
+        :param bot: Provides get_movement(player) and choose_upgrade(upgrade_options), e.g. KitingBot or ReplayInput.
+        :param max_runs: Stop once this many runs have ended (by death or crash). None keeps going until the time is up.
+        """
+        assert game_manager.headless, "HeadlessRunner needs a GameManager created with headless=True"
+        self.game_manager = game_manager
+        self.bot = bot
+        self.stop_on_error = stop_on_error
+        self.log_interval_minutes = log_interval_minutes
+        self.max_runs = max_runs
+        if stage_name:
+            stage_info = next((stage for stage in game_manager.stages_info if stage['name'] == stage_name), None)
+            assert stage_info, f"Unknown stage {stage_name}"
+            game_manager.select_stage(stage_info)
+        game_manager.stage = Stage(game_manager)
+
+        self.runs_started = 0
+        self.deaths = 0
+        self.level_ups = 0
+        self.max_enemy_count = 0
+        self.total_enemies_defeated = 0
+        self.crashes = []
+
+    def start_run(self):
+        game_manager = self.game_manager
+        if self.runs_started > 0:
+            self.total_enemies_defeated += game_manager.enemies_defeated
+        game_manager.cutscene_manager.running_cutscene = None
+        game_manager.new_game()
+        game_manager.player.input_source = self.bot
+        game_manager.simulation_clock.reset()
+        game_manager.change_state(GameState.PLAYING)
+        self.runs_started += 1
+
+    def is_last_run(self):
+        return self.max_runs is not None and self.runs_started >= self.max_runs
+
+    def run(self, sim_minutes):
+        """
+        Simulate `sim_minutes` minutes of game time and return a report of what happened.
+        """
+        game_manager = self.game_manager
+        step = game_manager.simulation_clock.step
+        total_ticks = round(sim_minutes * 60 / step)
+        log_every_ticks = max(1, int(self.log_interval_minutes * 60 / step))
+        ticks = 0
+        wall_start = time.perf_counter()
+        self.start_run()
+
+        while ticks < total_ticks:
+            try:
+                if game_manager.state in SIMULATED_STATES:
+                    game_manager.step_simulation(step)
+                    ticks += 1
+                    if len(game_manager.all_enemies) > self.max_enemy_count:
+                        self.max_enemy_count = len(game_manager.all_enemies)
+                elif game_manager.state == GameState.LEVEL_UP:
+                    # The level up screen asks the player's input source (the bot) to choose
+                    game_manager.level_up_screen.handle_events([])
+                    self.level_ups += 1
+                elif game_manager.state == GameState.GAME_OVER:
+                    self.deaths += 1
+                    if self.is_last_run():
+                        break
+                    self.start_run()
+                else:
+                    self.start_run()
+            except Exception:
+                if self.stop_on_error:
+                    raise
+                self.crashes.append({
+                    "run": self.runs_started,
+                    "sim_seconds": round(game_manager.elapsed_time, 2),
+                    "traceback": traceback.format_exc(),
+                })
+                print(f"LOGGING: Run {self.runs_started} crashed after {game_manager.elapsed_time:.1f}s")
+                if self.is_last_run():
+                    break
+                self.start_run()
+
+            if ticks % 1000 == 0:
+                # Nothing arrives with the dummy driver, but keep SDL's queue from filling up
+                pygame.event.pump()
+            if ticks % log_every_ticks == 0 and ticks > 0 and game_manager.state in SIMULATED_STATES:
+                print(f"LOGGING: {ticks * step / 60:.0f} simulated minutes, {len(game_manager.all_enemies)} enemies alive")
+
+        self.total_enemies_defeated += game_manager.enemies_defeated
+        wall_seconds = time.perf_counter() - wall_start
+        simulated_seconds = ticks * step
+        return {
+            "stage": game_manager.selected_stage['name'],
+            "simulated_minutes": round(simulated_seconds / 60, 2),
+            "wall_seconds": round(wall_seconds, 2),
+            "speedup": round(simulated_seconds / wall_seconds, 2) if wall_seconds else None,
+            "ticks": ticks,
+            "runs": self.runs_started,
+            "deaths": self.deaths,
+            "level_ups": self.level_ups,
+            "enemies_defeated": self.total_enemies_defeated,
+            "max_enemy_count": self.max_enemy_count,
+            "crashes": self.crashes,
+        }
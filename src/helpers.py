@@ -1,9 +1,13 @@
 import abilities
 import config.settings as settings
+import decoded_assets
 import json
 import os
 import pygame
+import re
+from atlas_manager import atlas_manager
 from config.abilities_map import ability_map
+from frame_cache import frame_cache
 
 def get_all_ability_projectile_classes() -> list:
     all_class_names = [cls.__name__ for cls in abilities.__dict__.values() if isinstance(cls, type) and issubclass(cls, abilities.AbilityCollisionSprite)]
@@ -36,6 +40,13 @@ def get_all_items_info() -> dict:
         data = json.load(file)
     return data
 
+def get_all_bosses_info() -> dict:
+    bosses_file_path = settings.BOSSES_INFO_PATH
+    data = dict()
+    with open(bosses_file_path, 'r') as file:
+        data = json.load(file)
+    return data
+
 def get_all_stages_info() -> dict:
     stages_file_path = settings.STAGES_INFO_PATH
     data = dict()
@@ -50,13 +61,36 @@ def create_instance_of_ability(ability_name, *args, **kwargs):
     else:
         raise ValueError(f"Class '{ability_name}' not found in ability_map")
     
-def load_animation_frames(path):
-    frames = []
-    all_frames = os.listdir(path)
-    for frame_file in all_frames:
-        frame = load_image(os.path.join(path, frame_file), convert_alpha=True)
-        frames.append(frame)
-    return frames
+def get_natural_sort_key(file_name):
+    """Sort key that orders numbers by value, so frame_2.png comes before frame_10.png."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", file_name)]
+
+def load_animation_frames(path, prefix=None, scale_factor=None, flip_horizontally=False, colorkey=None):
+    """
+    Loads every frame in a directory, in natural order. Frames are cached process-wide, so
+    loading the same directory with the same parameters again does no disk I/O. Directories
+    packed by atlas_packer.py are read from their atlas instead of file by file.
+
+    :param path: Directory holding the frame images.
+    :param prefix: Only load files whose name starts with this, followed by an underscore (e.g. "walk").
+    :param scale_factor: Passed to load_image.
+    :param flip_horizontally: Passed to load_image.
+    :param colorkey: Passed to load_image. None uses each frame's top-left pixel.
+    :return: A tuple of surfaces, shared with every other caller. Don't draw on them.
+    """
+    def load():
+        file_names = atlas_manager.list_directory(path)
+        if file_names is None:
+            file_names = os.listdir(path)
+        file_names.sort(key=get_natural_sort_key)
+        if prefix is not None:
+            file_names = [file_name for file_name in file_names if file_name.split("_")[0] == prefix]
+        return [
+            load_image(os.path.join(path, file_name), scale_factor=scale_factor, convert_alpha=True,
+                       flip_horizontally=flip_horizontally, colorkey=colorkey)
+            for file_name in file_names
+        ]
+    return frame_cache.get((os.path.normpath(path), prefix, scale_factor, flip_horizontally, colorkey), load)
 
 def get_debug_name_of_object(object_name):
     name = object_name.replace(" ", "_").lower()
@@ -102,19 +136,25 @@ def load_image(
     Returns:
         pygame.Surface: The processed image as a Pygame Surface.
     """
-    if not os.path.exists(image_path):
+    # Packed images come out of their atlas page, already converted with per-pixel alpha
+    image = atlas_manager.get_image(image_path)
+    if image is not None:
+        if not convert_alpha and pygame.display.get_surface() is not None:
+            image = image.convert()
+    elif not os.path.exists(image_path):
         print(f"Path {image_path} cannot be found!")
         image = pygame.image.load(settings.DEFAULT_IMAGE_PATH)
         return
     else:
-        # Load the image
-        image = pygame.image.load(image_path)
-
-    # Choose the correct conversion method
-    if convert_alpha:
-        image = image.convert_alpha()
-    else:
-        image = image.convert()
+        # Load the image, unless a preload already decoded it
+        image = decoded_assets.load_image_file(image_path)
+
+    # Choose the correct conversion method. Conversion needs a display surface, which tools running without one skip
+    if image.get_parent() is None and pygame.display.get_surface() is not None:
+        if convert_alpha:
+            image = image.convert_alpha()
+        else:
+            image = image.convert()
 
     # Scaling the image
     if scale_factor:
@@ -3,20 +3,30 @@ import os
 import pygame
 from animated_sprite import AnimatedSprite
 from config.settings import ITEM_IMAGES_ROOT_PATH
+from pool_manager import Poolable
 
-class Item(pygame.sprite.Sprite):
+class Item(Poolable, pygame.sprite.Sprite):
     def __init__(self, game_manager, id, name, description, score, spawn_pos, *groups):
-        super().__init__(*groups)
+        super().__init__()
         animation_location = os.path.join(ITEM_IMAGES_ROOT_PATH, id)
         assert(os.path.exists(animation_location), f"Unable to find {animation_location}. Is the item named correctly?")
         self.animation_frames = helpers.load_animation_frames(animation_location)
         self.animation = AnimatedSprite(self.animation_frames, 0, 0, animation_speed=100) #TODO. Better source for animation_speed
+        Item.reset(self, game_manager, id, name, description, score, spawn_pos, *groups)
+
+    @classmethod
+    def get_pool_key(cls, game_manager, id, *args):
+        return id # Items of the same id share their animation frames
+
+    def reset(self, game_manager, id, name, description, score, spawn_pos, *groups):
+        self.animation.restart()
         self.description = description
         self.game_manager = game_manager
         self.image = self.animation.image
         self.rect = self.image.get_rect(center=spawn_pos)
         self.name = name
         self.score = score
+        self.add(*groups)
 
     def on_collect(self):
         """Define what happens when the item is used. This will be overridden in subclasses."""
@@ -38,6 +48,10 @@ class XPItem(Item):
         super().__init__(game_manager,id, name, description, score, spawn_pos, *groups)
         self.xp_value = xp_value
 
+    def reset(self, game_manager, id, name, description, xp_value, score, spawn_pos, *groups):
+        self.xp_value = xp_value
+        super().reset(game_manager, id, name, description, score, spawn_pos, *groups)
+
     def on_collect(self):
         self.game_manager.player.gain_xp(self.xp_value)
 
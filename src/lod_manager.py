@@ -0,0 +1,82 @@
+from config.settings import LOD_FAR_DISTANCE, LOD_TIER_INTERVALS
+
+# Level of detail tiers, see LodManager
+LOD_NEAR, LOD_MID, LOD_FAR = range(3)
+
+class LodManager:
+    """
+    Runs the update() of individually updated NPCs less often the further they are from the camera.
+
+    NPCs overlapping the camera are LOD_NEAR and update every step. Off-screen ones are LOD_MID,
+    and beyond far_distance from the camera's centre LOD_FAR. A tier updates every
+    tier_intervals[tier] steps and passes the dt it missed on, so timers and movement still add
+    up. Every NPC is given a phase the first time it is seen, spreading the NPCs of a tier over
+    the steps in between, so each step pays for an even share of them rather than all at once.
+
+    Far NPCs don't pick up a new animation frame either (NPC.update checks lod_tier), and the
+    CrowdManager leaves them out of separation. NPCs with lod_enabled False, like bosses, always
+    update every step. Off-screen NPCs and ability sprites only pick up a new frame every
+    offscreen_animation_interval steps, which the QualityGovernor raises when frames run long.
+
+    Enemies simulated by the EnemyEngine are stepped as arrays; only the separation uses this.
+    """
+    def __init__(self, game_manager, far_distance=LOD_FAR_DISTANCE, tier_intervals=LOD_TIER_INTERVALS):
+        """
+        :param far_distance: Distance from the camera's centre where NPCs become LOD_FAR.
+        :param tier_intervals: Steps between updates of each tier.
+        """
+        self.game_manager = game_manager
+        self.far_distance = far_distance
+        self.tier_intervals = tier_intervals
+        self.step = 0
+        self.next_phase = 0
+        self.tier_counts = [0] * len(tier_intervals)
+        self.offscreen_animation_interval = 1 # Steps between new animation frames for off-screen sprites
+
+    def begin_step(self):
+        self.step += 1
+        self.tier_counts = [0] * len(self.tier_intervals)
+
+    def get_tier(self, sprite):
+        camera = self.game_manager.camera
+        if camera.cull_rect.colliderect(sprite.rect):
+            return LOD_NEAR
+        center_x, center_y = camera.rect.center
+        sprite_x, sprite_y = sprite.rect.center
+        if (sprite_x - center_x) ** 2 + (sprite_y - center_y) ** 2 > self.far_distance ** 2:
+            return LOD_FAR
+        return LOD_MID
+
+    def get_far_mask(self, xs, ys):
+        """For NumPy arrays of centres, which of them are LOD_FAR."""
+        center_x, center_y = self.game_manager.camera.rect.center
+        return (xs - center_x) ** 2 + (ys - center_y) ** 2 > self.far_distance ** 2
+
+    def is_offscreen_animation_due(self, sprite):
+        """Whether an off-screen sprite should pick up a new animation frame this step. Records it when it does."""
+        if self.step - sprite.animation_step < self.offscreen_animation_interval:
+            return False
+        sprite.animation_step = self.step
+        return True
+
+    def is_animation_due(self, sprite):
+        """Whether `sprite` should pick up a new animation frame this step: always on screen, every few steps off it."""
+        if self.offscreen_animation_interval <= 1 or self.game_manager.camera.cull_rect.colliderect(sprite.rect):
+            return True
+        return self.is_offscreen_animation_due(sprite)
+
+    def update_sprites(self, sprites, dt):
+        """Update each of `sprites` that is due this step, with the dt it has built up since its last update."""
+        for sprite in list(sprites):
+            if not sprite.lod_enabled:
+                sprite.update(dt)
+                continue
+            tier = sprite.lod_tier = self.get_tier(sprite)
+            self.tier_counts[tier] += 1
+            if sprite.lod_phase is None:
+                sprite.lod_phase = self.next_phase
+                self.next_phase += 1
+            sprite.lod_dt += dt
+            if (self.step + sprite.lod_phase) % self.tier_intervals[tier] == 0:
+                sprite_dt, sprite.lod_dt = sprite.lod_dt, 0.0
+                sprite.update(sprite_dt)
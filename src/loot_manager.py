@@ -1,6 +1,5 @@
 from enum import Enum
 from items import Collectible, XPItem, HealingItem
-import random
 
 class ItemTypes(Enum):
     HEALING = "healing"
@@ -13,16 +12,16 @@ class LootManager():
         self.items_info = self.game_manager.items_info
 
     def spawn_random_drop(self, loot_list, spawn_pos):
-        random_item = random.choice(loot_list)
+        random_item = self.game_manager.rng.get("loot").choice(loot_list)
         item_data = self.items_info[random_item]
         if item_data['type'] == ItemTypes.XP.value:
-            return XPItem(self.game_manager, item_data['id'], item_data['name'], item_data['description'],
+            return self.game_manager.pools.acquire(XPItem, self.game_manager, item_data['id'], item_data['name'], item_data['description'],
                 item_data['xp_value'], item_data['score'], spawn_pos, self.game_manager.items
             )
         
     def spawn_event_item(self, item_type, spawn_pos):
         if item_type == ItemTypes.XP:
             item_data = self.items_info['large_xp_orb']
-            return XPItem(self.game_manager, item_data['id'], item_data['name'], item_data['description'],
+            return self.game_manager.pools.acquire(XPItem, self.game_manager, item_data['id'], item_data['name'], item_data['description'],
                 item_data['xp_value'], item_data['score'], spawn_pos, self.game_manager.items
             )
\ No newline at end of file
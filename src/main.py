@@ -1,6 +1,58 @@
+import argparse
+import json
+from config.gamestates import GameState
 from game_manager import GameManager
-import cProfile
+from replay import InputRecorder, ReplayInput
+from stages import Stage
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="The Chain of Shadows")
+    parser.add_argument("--headless", action="store_true", help="Run the simulation without a window or audio, as fast as possible")
+    parser.add_argument("--minutes", type=float, default=60, help="Simulated minutes to run in headless mode")
+    parser.add_argument("--stage", default=None, help="Stage name to play in headless mode (defaults to the first stage)")
+    parser.add_argument("--bot", choices=["kite", "scripted"], default="kite", help="Player AI used in headless mode")
+    parser.add_argument("--cprofile", action="store_true", help="Run the game under cProfile (slow, prefer the F3 performance overlay)")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed for gameplay randomness, so runs can be reproduced")
+    parser.add_argument("--record", metavar="PATH", default=None, help="Record the input of the last run played to a replay file")
+    parser.add_argument("--replay", metavar="PATH", default=None, help="Play back a replay file (works with --headless)")
+    parser.add_argument("--stop-on-error", action="store_true", help="Re-raise the first exception instead of recording it and starting a new run")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    game = GameManager()
-    cProfile.run('game.run()')
\ No newline at end of file
+    args = parse_args()
+    game = GameManager(headless=args.headless, seed=args.seed)
+    if args.record:
+        game.input_recorder = InputRecorder(game, args.record)
+    if args.replay:
+        game.replay = ReplayInput(game, args.replay)
+
+    if args.headless:
+        from headless import HeadlessRunner, KitingBot, ScriptedInput
+        if game.replay:
+            # A replay is a single run of a fixed length, which makes it a repeatable perf case
+            runner = HeadlessRunner(game, game.replay, stage_name=game.replay.stage_name, stop_on_error=args.stop_on_error, max_runs=1)
+            report = runner.run(game.replay.ticks * game.simulation_clock.step / 60)
+            report["replay_mismatches"] = game.replay.get_mismatches()
+        else:
+            bot = KitingBot(game) if args.bot == "kite" else ScriptedInput(game)
+            runner = HeadlessRunner(game, bot, stage_name=args.stage, stop_on_error=args.stop_on_error)
+            report = runner.run(args.minutes)
+        print(json.dumps(report, indent=2))
+    else:
+        if game.replay:
+            # Skip the menus and intro and go straight into the recorded run
+            stage_info = next(stage for stage in game.stages_info if stage['name'] == game.replay.stage_name)
+            game.select_stage(stage_info)
+            game.stage = Stage(game)
+            game.sound_manager.load_stage(game.stage)
+            game.change_state(GameState.NEW_GAME)
+        try:
+            if args.cprofile:
+                import cProfile
+                cProfile.run('game.run()')
+            else:
+                game.run()
+        finally:
+            # The game exits through sys.exit(), so save on the way out
+            if game.input_recorder:
+                game.input_recorder.save()
@@ -1,10 +1,12 @@
+import math
 import os
 import pygame
 import sys
 from config.settings import ABILITIES_IMAGES_ROOT_PATH, BACKGROUND_IMAGE_PATH, BUTTON_IMAGE_PATH, HEROES_IMAGE_ROOT, SOUNDS_ROOT_PATH
 from config.gamestates import GameState
 from animated_sprite import AnimatedSprite
-from stages import Stage
+from animation_clock import menu_clock
+from frame_cache import frame_cache, get_scale_variant
 import helpers
 
 WHITE = (255, 255, 255)
@@ -105,6 +107,7 @@ class PictureFrame:
         self.game_manager = game_manager
         self.x_pos, self.y_pos = pos
         self.width, self.height = size
+        self.scale_variant = get_scale_variant(size)
         self.set_animation_frames()
         self.image = self.animation_frames[0]
         self.rect = pygame.Rect(self.x_pos, self.y_pos, self.width, self.height)
@@ -112,13 +115,14 @@ class PictureFrame:
     def set_animation_frames(self):
         character_name = helpers.get_debug_name_of_object(self.game_manager.selected_character['name'])
         self.animation_frames = helpers.load_animation_frames(os.path.join(HEROES_IMAGE_ROOT, character_name, "in_game"))
-        self.animation = AnimatedSprite(self.animation_frames, self.x_pos, self.y_pos, 300)
+        self.animation = AnimatedSprite(self.animation_frames, self.x_pos, self.y_pos, 300, clock=menu_clock)
 
     def update(self, screen):
         self.animation.update()
-        self.image = self.animation.image
-        scaled_image = pygame.transform.scale(self.image, (self.width, self.height))
-        screen.blit(scaled_image, self.rect)
+        # Scaled frames are cached, so they are only built the first time each one is shown
+        scaled_frames = frame_cache.get_variant(self.animation_frames, self.scale_variant)
+        self.image = scaled_frames[self.animation.current_frame]
+        screen.blit(self.image, self.rect)
 
 class StageSelectScreen(Menu):
     def __init__(self, game_manager, stages):
@@ -155,12 +159,41 @@ class StageSelectScreen(Menu):
             # Find the selected character
             selected_stage = next((stage for stage in self.stages if stage["name"] == button_text), None)
             if selected_stage:
-                self.game_manager.selected_stage = selected_stage
-                self.game_manager.selected_character = [x for x in self.game_manager.character_info if x['name'] == self.game_manager.selected_stage['playable_character']][0]
+                self.game_manager.select_stage(selected_stage)
                 self.picture_frame.set_animation_frames()
             if button_text == "Start":
-                self.game_manager.change_state(GameState.CINEMATIC)
-                self.game_manager.stage = Stage(self.game_manager)
+                # The Stage is built by the preload, behind the loading screen
+                self.game_manager.preload_manager.start(self.game_manager.selected_stage)
+                self.game_manager.change_state(GameState.LOADING)
+
+class LoadingScreen(Menu):
+    def __init__(self, game_manager):
+        self.game_manager = game_manager
+        background_image = helpers.load_image(BACKGROUND_IMAGE_PATH, convert_alpha=True)
+        self.font = pygame.font.SysFont("Arial", 36)
+        self.bar_rect = pygame.Rect(0, 0, 800, 30)
+        self.bar_rect.center = (game_manager.screen.get_width() // 2, game_manager.screen.get_height() - 200)
+        super().__init__(game_manager.screen, background_image, buttons=[])
+
+    def display(self, progress):
+        """Draws the progress bar and a spinner. The spinner runs off the clock so it moves even while progress doesn't."""
+        if self.background_image:
+            self.screen.blit(self.background_image, (0, 0))
+        text = self.font.render(f"Loading {self.game_manager.selected_stage['name']}...", True, WHITE)
+        self.screen.blit(text, text.get_rect(midbottom=(self.bar_rect.centerx, self.bar_rect.top - 20)))
+        pygame.draw.rect(self.screen, BLACK, self.bar_rect)
+        filled_rect = self.bar_rect.inflate(-6, -6)
+        filled_rect.width = int(filled_rect.width * min(max(progress, 0.0), 1.0))
+        pygame.draw.rect(self.screen, WHITE, filled_rect)
+        pygame.draw.rect(self.screen, WHITE, self.bar_rect, 2)
+
+        spinner_angle = pygame.time.get_ticks() / 1000 * 2 * math.pi
+        spinner_center = pygame.math.Vector2(self.bar_rect.right + 50, self.bar_rect.centery)
+        for dot in range(8):
+            angle = spinner_angle + dot * math.pi / 4
+            offset = pygame.math.Vector2(math.cos(angle), math.sin(angle)) * 18
+            pygame.draw.circle(self.screen, WHITE, spinner_center + offset, 2 + dot // 2)
+        pygame.display.update()
 
 class GameOverScreen(Menu):
     def __init__(self, game_manager):
@@ -321,17 +354,29 @@ class LevelUpScreen(Menu):
         pygame.display.update()
 
     def handle_events(self, events):
+        input_source = self.game_manager.player.input_source
+        if input_source:
+            # Bots and replays pick their own upgrade
+            upgrade_options = [option_display.upgrade_option for option_display in self.upgrade_option_displays]
+            return self.select_option(input_source.choose_upgrade(upgrade_options))
         for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
-                for option_display in self.upgrade_option_displays:
+                for idx, option_display in enumerate(self.upgrade_option_displays):
                     if option_display.check_for_input(mouse_pos):
-                        self.game_manager.player.ability_manager.select_upgrade(option_display.upgrade_option)
-                        if self.game_manager.enemy_manager.boss_manager.boss_fight_active:
-                            self.game_manager.change_state(GameState.BOSS_FIGHT)
-                            return True
-                        self.game_manager.change_state(GameState.PLAYING)
-        return None
\ No newline at end of file
+                        return self.select_option(idx)
+        return None
+
+    def select_option(self, index):
+        """Apply the upgrade option at the given index and resume the game."""
+        if self.game_manager.input_recorder:
+            self.game_manager.input_recorder.record_level_up(index)
+        option_display = self.upgrade_option_displays[index]
+        self.game_manager.player.ability_manager.select_upgrade(option_display.upgrade_option)
+        if self.game_manager.enemy_manager.boss_manager.boss_fight_active:
+            self.game_manager.change_state(GameState.BOSS_FIGHT)
+            return True
+        self.game_manager.change_state(GameState.PLAYING)
\ No newline at end of file
@@ -4,13 +4,14 @@ import random
 
 class MovementManager:
     @staticmethod
-    def calculate_direction(source_pos, target_pos=None, direction=None):
+    def calculate_direction(source_pos, target_pos=None, direction=None, rng=random):
         """
         Calculates the normalized direction vector. Either to a target position or uses a provided direction.
 
         :param source_pos: The starting position (x, y) tuple.
         :param target_pos: The target position (x, y) tuple. (Optional if direction is provided)
         :param direction: A specified direction vector (pygame.math.Vector2). (Optional if target_pos is provided)
+        :param rng: Random source used when neither is given. Pass a stream from game_manager.rng to keep runs reproducible.
         :return: A normalized direction vector (pygame.math.Vector2).
         """
         if target_pos is not None:
@@ -18,7 +19,7 @@ class MovementManager:
         elif direction is not None:
             direction_vector = pygame.math.Vector2(direction)
         else:
-            random_angle = random.uniform(0, 2 * math.pi)
+            random_angle = rng.uniform(0, 2 * math.pi)
             direction_vector = pygame.math.Vector2(math.cos(random_angle), math.sin(random_angle))
 
         return direction_vector.normalize() if direction_vector.length() != 0 else direction_vector
@@ -135,15 +136,16 @@ class MovementManager:
         return control_x, control_y
 
     @staticmethod
-    def get_random_position_on_circle(start_pos, radius):
+    def get_random_position_on_circle(start_pos, radius, rng=random):
         """
         Generates a random position on a circle of a given radius around the start_pos.
 
         :param start_pos: The starting position (x, y) tuple.
         :param radius: The radius of the circle.
+        :param rng: Random source. Pass a stream from game_manager.rng to keep runs reproducible.
         :return: A tuple representing the random position (x, y) on the circle.
         """
-        random_angle = random.uniform(0, 2 * math.pi)
+        random_angle = rng.uniform(0, 2 * math.pi)
         x = start_pos[0] + radius * math.cos(random_angle)
         y = start_pos[1] + radius * math.sin(random_angle)
         return x, y
\ No newline at end of file
@@ -1,7 +1,9 @@
-import math
 import os
 import pygame
 from animation_manager import AnimationManager
+from config.settings import FROZEN_TINT_COLOR, PARALYZED_TINT_COLOR, CONTROLLED_TINT_COLOR
+from frame_cache import get_tint_variant
+from lod_manager import LOD_NEAR, LOD_MID
 from loot_manager import ItemTypes
 from movement_manager import MovementManager
 from enum import Enum
@@ -16,18 +18,40 @@ class NPCStates(Enum):
     WALK = "walk"
     ATTACK = "attack"
 
+NPC_ANIMATION_SCALE = 1.5
+
+# Frame variants shown while a status effect holds an NPC, indexed by NPC.get_status_tint_index()
+NO_TINT, FROZEN_TINT, PARALYZED_TINT, CONTROLLED_TINT = range(4)
+STATUS_TINT_VARIANTS = (None, get_tint_variant(FROZEN_TINT_COLOR), get_tint_variant(PARALYZED_TINT_COLOR), get_tint_variant(CONTROLLED_TINT_COLOR))
+
 class NPC(pygame.sprite.Sprite):
+    # Level of detail, see LodManager
+    lod_enabled = True
+    lod_tier = LOD_NEAR
+    lod_phase = None # Offset of the steps it updates on, given by the LodManager the first time it is seen
+    lod_dt = 0.0 # Time it has not been updated for
+    animation_step = 0 # LodManager step it last picked up an animation frame on while off screen
+
     def __init__(self, pos, npc_info, game_manager, *groups):
         super().__init__(*groups)
         self.solid_body = True
         self.__dict__.update(npc_info)
         self.game_manager = game_manager
-        self.state = NPCStates.IDLE
         #Visual
         self.animations_root = os.path.join("assets", "npcs", npc_info["type"], npc_info["debug_name"], "in_game")
-        self.animation_manager = AnimationManager(self, scale=1.5)
+        self.animation_manager = AnimationManager(self, scale=NPC_ANIMATION_SCALE)
+        self.hit_cooldown_sprites = set() # Ability sprites holding a hit cooldown on this NPC, see AbilityCollisionSprite
+        self.reset_state(pos)
+
+    def reset_state(self, pos):
+        """Position, stats and timers of a freshly spawned NPC. Also used when a pooled NPC is reused."""
+        self.state = NPCStates.IDLE
+        self.lod_tier = LOD_NEAR
+        self.lod_dt = 0.0
+        self.animation_manager.restart()
         self.image = self.animation_manager.get_frame()
         self.rect = self.image.get_rect(topleft=pos)
+        self.position = pygame.math.Vector2(self.rect.topleft) # Rect topleft, with the sub-pixel part the rect can't hold
         #Stats
         self.attack_cooldown = 1.0  # Time in seconds between attacks
         self.health = self.base_health
@@ -35,47 +59,44 @@ class NPC(pygame.sprite.Sprite):
         self.target_pos = None # Fixed target position to move towards
         self.time_since_last_attack = 0.0
         #GameLogic Stats
-        self.time_frozen = 0
-        self.freeze_duration = 0
+        for timer in self.__dict__.get("status_timers", {}).values():
+            timer.cancel() # Left over from before the NPC was pooled
+        self.status_timers = {} # Status -> Timer that ends it, see start_status
         self.frozen = False
-        self.time_controlled = 0
-        self.controlled_duration = 0
         self.controlled = False
-        self.time_paralyzed = 0
-        self.paralyzed_duration = 0
         self.paralyzed = False
 
-    def draw(self, screen):
-        screen_pos = self.rect.move(-self.game_manager.camera.topleft[0], -self.game_manager.camera.topleft[1])
-        # Get the camera's visible area
-        camera_rect = self.game_manager.camera
+    @property
+    def time_since_last_attack(self):
+        return self.game_manager.timer_manager.time - self.last_attack_time
+
+    @time_since_last_attack.setter
+    def time_since_last_attack(self, value):
+        self.last_attack_time = self.game_manager.timer_manager.time - value
 
-        # Check if the object is within the camera's view
-        if self.rect.colliderect(camera_rect):
-            screen.blit(self.image, screen_pos)
-        
     def can_attack(self):
         return self.time_since_last_attack > self.attack_cooldown
+
+    def start_status(self, status, duration):
+        """
+        Set the status effect `status` ("frozen", "controlled" or "paralyzed") for `duration` seconds of game time.
+        Starting one that is already on restarts it with the new duration.
+        """
+        timer = self.status_timers.get(status)
+        if timer:
+            timer.cancel()
+        self.status_timers[status] = self.game_manager.timer_manager.schedule(duration, self.end_status, status)
+        setattr(self, status, True)
+
+    def end_status(self, status):
+        del self.status_timers[status]
+        setattr(self, status, False)
     
     def update(self, dt):
-        if self.solid_body:
-            self.avoid_overlap()
-        self.time_since_last_attack += dt
-        self.time_controlled += dt
-        self.animation_manager.update(dt)
-        self.image = self.animation_manager.get_frame()
+        # Too far away for anyone to see it animate, or off screen and not due a frame
+        if self.lod_tier == LOD_NEAR or (self.lod_tier == LOD_MID and self.game_manager.lod_manager.is_offscreen_animation_due(self)):
+            self.image = self.animation_manager.get_frame(STATUS_TINT_VARIANTS[self.get_status_tint_index()])
 
-        if self.time_frozen > self.freeze_duration:
-            self.frozen = False
-        if self.time_controlled > self.controlled_duration:
-            self.controlled = False
-        if self.time_paralyzed > self.paralyzed_duration:
-            self.paralyzed = False
-
-        if self.frozen or self.paralyzed:
-            self.time_frozen += dt
-            self.time_paralyzed += dt
-        
         if self.has_target():
             self.target_pos = self.target.get_pos()
         if self.target_pos:
@@ -86,6 +107,16 @@ class NPC(pygame.sprite.Sprite):
                 else:
                     self.move_towards_target_pos(dt)
     
+    def get_status_tint_index(self):
+        """Which of STATUS_TINT_VARIANTS the NPC is drawn with, so frozen, paralyzed and controlled NPCs can be told apart."""
+        if self.frozen:
+            return FROZEN_TINT
+        if self.paralyzed:
+            return PARALYZED_TINT
+        if self.controlled:
+            return CONTROLLED_TINT
+        return NO_TINT
+
     def take_damage(self, amount):
         """Take damage and reduce health."""
         self.health -= amount
@@ -94,10 +125,16 @@ class NPC(pygame.sprite.Sprite):
             self.on_death()
     
     def move_towards_target_pos(self, dt):
-        self.rect.x, self.rect.y = MovementManager.move((self.rect.x, self.rect.y), self.speed,  dt, target_pos=self.target_pos)
+        self.set_topleft(*MovementManager.move(self.position, self.speed,  dt, target_pos=self.target_pos))
 
     def move_away_from_target_pos(self, dt):
-        self.rect.x, self.rect.y = MovementManager.move_away_from((self.rect.x, self.rect.y), self.speed,  dt, target_pos=self.target_pos)
+        self.set_topleft(*MovementManager.move_away_from(self.position, self.speed,  dt, target_pos=self.target_pos))
+
+    def set_topleft(self, x, y):
+        """Move to the float position (x, y). The rect gets it rounded to whole pixels, the rest is kept for the next move."""
+        self.position.update(x, y)
+        self.rect.topleft = (round(x), round(y))
+        self.game_manager.spatial_index.move(self)
     
     def set_target(self, target):
         """Set the target for the enemy, typically the player."""
@@ -113,45 +150,23 @@ class NPC(pygame.sprite.Sprite):
     def on_death(self):
         pass
 
+    def kill(self):
+        # A pooled NPC comes back as a new one, which mustn't inherit the hit cooldowns of this one
+        for sprite in self.hit_cooldown_sprites:
+            sprite.enemy_cooldowns.pop(self, None)
+        self.hit_cooldown_sprites.clear()
+        super().kill()
+
     def set_pos(self, pos):
         self.rect.center = pos
+        self.position.update(self.rect.topleft)
+        self.game_manager.spatial_index.move(self)
 
     def get_pos(self):
         return self.rect.center
     
     def set_state(self, state):
         self.state = state
-    
-    def avoid_overlap(self):
-        for other_enemy in self.game_manager.all_enemies:
-            if other_enemy != self and other_enemy.solid_body:
-                # Check if the mobs overlap
-                if self.rect.colliderect(other_enemy.rect):
-                    # Calculate the distance and direction between mobs
-                    dx = self.rect.centerx - other_enemy.rect.centerx
-                    dy = self.rect.centery - other_enemy.rect.centery
-                    distance = math.hypot(dx, dy)
-
-                    # Avoid division by zero
-                    if distance == 0:
-                        distance = 1.0
-
-                    # Calculate the minimum distance to resolve the collision
-                    min_distance = self.rect.width / 2 + other_enemy.rect.width / 2
-
-                    # If the mobs are too close, push them apart
-                    if distance < min_distance:
-                        overlap = min_distance - distance
-
-                        # Normalize the direction vector and push mobs apart
-                        push_x = (dx / distance) * overlap / 2
-                        push_y = (dy / distance) * overlap / 2
-
-                        self.rect.x += push_x
-                        self.rect.y += push_y
-
-                        other_enemy.rect.x -= push_x
-                        other_enemy.rect.y -= push_y
 
 class FriendlyNPC(NPC):
     def __init__(self, pos, npc_info, game_manager, *groups):
@@ -161,18 +176,17 @@ class FriendlyNPC(NPC):
 class TemporalRiftNPC(FriendlyNPC):
     def __init__(self, pos, npc_info, game_manager, *groups):
         super().__init__(pos, npc_info, game_manager, *groups)
-        self.time_since_last_mob_spawn = 0
-        self.time_since_spawned = 0
+        # Spawns an elite every spawn_interval seconds until it closes after duration seconds
+        self.mob_spawn_timer = game_manager.timer_manager.schedule(self.spawn_interval, self.spawn_mob, interval=self.spawn_interval)
+        self.close_timer = game_manager.timer_manager.schedule(self.duration, self.kill)
 
-    def update(self, dt):
-        super().update(dt)
-        self.time_since_last_mob_spawn += dt
-        self.time_since_spawned += dt
-        if self.time_since_last_mob_spawn > self.spawn_interval:
-            self.game_manager.enemy_manager.spawn_elite_enemy(self.rect.center)
-            self.time_since_last_mob_spawn = 0
-        if self.time_since_spawned > self.duration:
-            self.kill()
+    def spawn_mob(self):
+        self.game_manager.enemy_manager.spawn_elite_enemy(self.rect.center)
+
+    def kill(self):
+        self.mob_spawn_timer.cancel()
+        self.close_timer.cancel()
+        super().kill()
 
 class NeutralNPC(NPC):
     def __init__(self, pos, npc_info, game_manager, *groups):
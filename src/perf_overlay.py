@@ -0,0 +1,150 @@
+import pygame
+import time
+from collections import deque
+from config.settings import PERF_OVERLAY_HISTORY_FRAMES, TARGET_FRAME_TIME_MS
+from frame_cache import frame_cache
+
+class _NullSection:
+    """Shared do-nothing section handed out while profiling is off, so timing costs one method call."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SECTION = _NullSection()
+
+class ProfilerSection:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+class FrameProfiler:
+    """
+    Collects per-phase timings for each rendered frame.
+
+    Code wraps a phase in `with profiler.section("name"):`. While the profiler is disabled every
+    section is the same no-op object, so instrumented code pays almost nothing.
+    Phases that run several times in a frame (e.g. one update per simulation step) are summed.
+    """
+    def __init__(self, history_frames=PERF_OVERLAY_HISTORY_FRAMES):
+        self.enabled = False
+        self.history_frames = history_frames
+        self.frame_times = deque(maxlen=history_frames)
+        self.section_history = {}
+        self.current_frame = {}
+        self.sections = {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current_frame = {}
+
+    def section(self, name):
+        if not self.enabled:
+            return NULL_SECTION
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = ProfilerSection(self, name)
+        return section
+
+    def add_time(self, name, seconds):
+        self.current_frame[name] = self.current_frame.get(name, 0.0) + seconds
+
+    def end_frame(self, frame_time):
+        """
+        Close the current frame and push its timings into the rolling history.
+        Returns the closed frame's {section name: seconds}.
+        """
+        if not self.enabled:
+            return {}
+        self.frame_times.append(frame_time * 1000)
+        finished_frame = self.current_frame
+        for name, seconds in finished_frame.items():
+            history = self.section_history.get(name)
+            if history is None:
+                history = self.section_history[name] = deque(maxlen=self.history_frames)
+            history.append(seconds * 1000)
+        self.current_frame = {}
+        return finished_frame
+
+    def get_section_averages(self):
+        """Returns {section name: average milliseconds per frame} over the rolling history."""
+        return {name: sum(history) / len(history) for name, history in self.section_history.items() if history}
+
+class PerformanceOverlay:
+    """Draws the profiler's frame-time graph, phase timings and live entity counts in the corner of the screen."""
+    def __init__(self, game_manager, profiler, pos=(10, 120), graph_size=(PERF_OVERLAY_HISTORY_FRAMES, 80)):
+        self.game_manager = game_manager
+        self.profiler = profiler
+        self.pos = pos
+        self.graph_width, self.graph_height = graph_size
+        self.font = pygame.font.Font(None, 20)
+        self.text_color = (255, 255, 255)
+        self.budget_color = (255, 200, 0)
+        self.graph_color = (0, 255, 120)
+        self.visible = True # Lets tools collect timings without paying for drawing the overlay
+
+    def get_entity_counts(self):
+        game_manager = self.game_manager
+        return {
+            "all_enemies": len(game_manager.all_enemies),
+            "engine enemies": len(game_manager.enemy_engine) if game_manager.enemy_engine is not None else 0,
+            "enemies recycled": game_manager.enemy_manager.recycled_enemies,
+            "quality level": game_manager.quality_governor.level,
+            "lod near / mid / far": " / ".join(str(count) for count in game_manager.lod_manager.tier_counts),
+            "timers pending": game_manager.timer_manager.get_pending_count(),
+            "all_ability_sprites": len(game_manager.all_ability_sprites),
+            "items": len(game_manager.items),
+            "damage_texts": len(game_manager.damage_texts),
+            "sprites drawn": game_manager.drawn_sprite_count,
+            "pool hits / misses": " / ".join(str(total) for total in game_manager.pools.get_totals()),
+            "frame cache": f"{len(frame_cache)} entries, {frame_cache.total_bytes / (1024 * 1024):.1f} MB",
+            "sound cache": f"{len(game_manager.sound_manager.resident)} sounds, {game_manager.sound_manager.resident_bytes / (1024 * 1024):.1f} MB",
+        }
+
+    def draw(self, screen):
+        if not (self.visible and self.profiler.enabled):
+            return
+        x, y = self.pos
+        # (label, value) rows, drawn in two columns
+        rows = []
+        frame_times = self.profiler.frame_times
+        if frame_times:
+            average = sum(frame_times) / len(frame_times)
+            rows.append(("frame (last / avg / max)", f"{frame_times[-1]:.1f} / {average:.1f} / {max(frame_times):.1f} ms"))
+        for name, milliseconds in sorted(self.profiler.get_section_averages().items(), key=lambda item: -item[1]):
+            rows.append((name, f"{milliseconds:.2f} ms"))
+        rows.extend((name, str(count)) for name, count in self.get_entity_counts().items())
+
+        line_height = self.font.get_linesize()
+        value_x = 200
+        panel = pygame.Surface((max(self.graph_width, 330) + 10, self.graph_height + len(rows) * line_height + 15), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        self.draw_graph(panel, 5, 5)
+        text_y = self.graph_height + 10
+        for label, value in rows:
+            panel.blit(self.font.render(label, True, self.text_color), (5, text_y))
+            panel.blit(self.font.render(value, True, self.text_color), (value_x, text_y))
+            text_y += line_height
+        screen.blit(panel, (x, y))
+
+    def draw_graph(self, surface, x, y):
+        """Plots the rolling frame times, scaled so twice the frame budget fills the graph."""
+        scale = self.graph_height / (TARGET_FRAME_TIME_MS * 2)
+        budget_y = y + self.graph_height - TARGET_FRAME_TIME_MS * scale
+        pygame.draw.line(surface, self.budget_color, (x, budget_y), (x + self.graph_width, budget_y))
+        points = [
+            (x + index, y + self.graph_height - min(frame_time * scale, self.graph_height))
+            for index, frame_time in enumerate(self.profiler.frame_times)
+        ]
+        if len(points) > 1:
+            pygame.draw.lines(surface, self.graph_color, False, points)
@@ -3,10 +3,17 @@ import pygame
 from ability_manager import AbilityManager
 from animation_manager import AnimationManager
 from config.gamestates import GameState
+from config.settings import CHARACTER_SPEED_REFERENCE_RATE
 from helpers import create_instance_of_ability, get_debug_name_of_object, load_animation_frames
 from hud import HealthBar
 from xp_manager import XPManager
 
+# Direction bits used in recorded input states
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+
 class Player(pygame.sprite.Sprite):
     def __init__(self, pos, game_manager):
         super().__init__(game_manager.player_sprites)
@@ -21,11 +28,12 @@ class Player(pygame.sprite.Sprite):
         self.health_bar = HealthBar(self, width=50, height=10)
         self.image = self.animation_manager.get_frame()
         self.rect = self.image.get_rect(topleft=pos)
+        self.position = pygame.math.Vector2(self.rect.topleft) # Sub-pixel position, the rect is rounded from this
         self.velocity = pygame.math.Vector2(0, 0)
         self.paralyzed = False
-        self.time_paralyzed = 0
-        self.paralyze_duration = 0
+        self.paralysis_timer = None # Ends the paralysis, see get_paralyzed
         self.xp_manager = XPManager(game_manager)
+        self.input_source = None # Optional replacement for keyboard/controller input, e.g. a bot in headless runs
         game_manager.in_game_ui.add(self.health_bar)
 
         pygame.joystick.init()
@@ -40,21 +48,11 @@ class Player(pygame.sprite.Sprite):
         
     def update(self, dt):
         self.input()
-        if self.paralyzed:
-            self.time_paralyzed += dt
-        if self.time_paralyzed > self.paralyze_duration:
-            self.paralyzed = False
-            self.time_paralyzed = 0
         if not self.paralyzed:
-            self.move()
+            self.move(dt)
         self.trigger_abilities()
-        self.animation_manager.update(dt)
         self.image = self.animation_manager.get_frame()
 
-        # Update abilities
-        for ability in self.abilities:
-            ability.update(dt)
-
     def gain_xp(self, value):
         self.xp_manager.gain_xp(value)
 
@@ -66,50 +64,74 @@ class Player(pygame.sprite.Sprite):
         return self.rect.center
 
     def input(self):
+        if self.input_source:
+            self.velocity.x, self.velocity.y = self.input_source.get_movement(self)
+            return
+
+        input_state = self.read_input_state()
+        if self.game_manager.input_recorder:
+            self.game_manager.input_recorder.record_input(input_state)
+        self.velocity.x, self.velocity.y = self.get_movement_from_input_state(input_state)
+
+    def read_input_state(self):
+        """
+        Returns this tick's raw device input as (key_bits, left_x, left_y): a bitmask of the
+        INPUT_* directions held on the keyboard, plus the controller's left stick axes (0 without a controller).
+        """
         keys = pygame.key.get_pressed()
-        controller_input = False
-
+        key_bits = 0
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            key_bits |= INPUT_UP
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            key_bits |= INPUT_DOWN
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            key_bits |= INPUT_LEFT
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            key_bits |= INPUT_RIGHT
+
+        left_x = left_y = 0.0
         if self.controller:
             # Get axis values from the controller
             left_x = self.controller.get_axis(0)
             left_y = self.controller.get_axis(1)
+        return key_bits, left_x, left_y
+
+    @staticmethod
+    def get_movement_from_input_state(input_state):
+        """Turns a raw input state from read_input_state (live or replayed) into a movement direction."""
+        key_bits, left_x, left_y = input_state
+        movement_x = movement_y = 0
+        controller_input = False
 
-            # Set a threshold to avoid unintended movement due to minor axis drift
-            deadzone = 0.2
+        # Set a threshold to avoid unintended movement due to minor axis drift
+        deadzone = 0.2
 
-            if abs(left_x) > deadzone:
-                self.velocity.x = left_x
-                controller_input = True
-            else:
-                self.velocity.x = 0
+        if abs(left_x) > deadzone:
+            movement_x = left_x
+            controller_input = True
 
-            if abs(left_y) > deadzone:
-                self.velocity.y = left_y
-                controller_input = True
-            else:
-                self.velocity.y = 0
+        if abs(left_y) > deadzone:
+            movement_y = left_y
+            controller_input = True
 
         # If no controller input, fall back to keyboard input
         if not controller_input:
-            if keys[pygame.K_UP] or keys[pygame.K_w]:
-                self.velocity.y = -1
-            elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-                self.velocity.y = 1
-            else:
-                self.velocity.y = 0
-
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                self.velocity.x = -1
-            elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                self.velocity.x = 1
-            else:
-                self.velocity.x = 0
-
-    def move(self):
+            if key_bits & INPUT_UP:
+                movement_y = -1
+            elif key_bits & INPUT_DOWN:
+                movement_y = 1
+
+            if key_bits & INPUT_LEFT:
+                movement_x = -1
+            elif key_bits & INPUT_RIGHT:
+                movement_x = 1
+        return movement_x, movement_y
+
+    def move(self, dt):
         if self.velocity.magnitude() != 0:
             self.velocity = self.velocity.normalize()
-        self.rect.x += self.velocity.x * self.speed
-        self.rect.y += self.velocity.y * self.speed
+        self.position += self.velocity * self.speed * CHARACTER_SPEED_REFERENCE_RATE * dt
+        self.rect.topleft = (round(self.position.x), round(self.position.y))
 
     def trigger_abilities(self):
         """Method to trigger abilities. Could be called based on game logic."""
@@ -137,5 +159,11 @@ class Player(pygame.sprite.Sprite):
         self.abilities.append(ability_instance)
 
     def get_paralyzed(self, duration):
-        self.paralyze_duration = duration
-        self.paralyzed = True
\ No newline at end of file
+        if self.paralysis_timer:
+            self.paralysis_timer.cancel()
+        self.paralysis_timer = self.game_manager.timer_manager.schedule(duration, self.end_paralysis)
+        self.paralyzed = True
+
+    def end_paralysis(self):
+        self.paralysis_timer = None
+        self.paralyzed = False
\ No newline at end of file
@@ -0,0 +1,113 @@
+from config.settings import POOL_MAX_FREE_OBJECTS
+
+class Poolable:
+    """
+    Mixin for sprites that can be recycled through the PoolManager instead of being rebuilt.
+
+    The reset protocol: reset() takes the same arguments as the constructor and must leave the
+    object exactly as a newly constructed one would be, group membership included. The default
+    simply runs __init__ again; classes with expensive construction (loading animation frames,
+    rendering text) override it to keep what doesn't depend on the arguments.
+
+    get_pool_key() splits a class into several pools when instances built from different
+    arguments can't be reset into each other, e.g. enemies of different types have different
+    animations. Instances go back to their pool when they are killed.
+    """
+    pool = None # The ObjectPool this object came from, None for objects built directly
+    in_pool = False
+
+    @classmethod
+    def get_pool_key(cls, *args):
+        return None
+
+    def reset(self, *args):
+        self.__init__(*args)
+
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
+
+class ObjectPool:
+    """Free instances of one class (and pool key), with hit/miss counters for sizing."""
+    def __init__(self, manager, cls, key, max_free=POOL_MAX_FREE_OBJECTS):
+        self.manager = manager
+        self.cls = cls
+        self.key = key
+        self.max_free = max_free
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, *args):
+        if self.free:
+            self.hits += 1
+            pooled_object = self.free.pop()
+            pooled_object.in_pool = False
+            pooled_object.reset(*args)
+        else:
+            self.misses += 1
+            pooled_object = self.cls(*args)
+            pooled_object.pool = self
+        return pooled_object
+
+    def release(self, pooled_object):
+        if not pooled_object.in_pool:
+            pooled_object.in_pool = True
+            self.manager.released.append(pooled_object)
+
+    def prewarm(self, count, *args):
+        """Build instances until `count` are free. `args` must not add them to any group."""
+        while len(self.free) < min(count, self.max_free):
+            pooled_object = self.cls(*args)
+            pooled_object.pool = self
+            pooled_object.in_pool = True
+            self.free.append(pooled_object)
+
+class PoolManager:
+    """
+    Owns one ObjectPool per (class, pool key) and lives for the whole session, so later runs
+    reuse what earlier runs built.
+
+    Killed objects only become free again at the end of the simulation step (end_step()), so
+    anything still holding a reference to an object killed this step (a collision pair, a cached
+    target) can't see it come back as something else in the same step.
+    """
+    def __init__(self):
+        self.pools = {} # (class, key) -> ObjectPool
+        self.released = []
+
+    def get_pool(self, cls, key=None):
+        pool = self.pools.get((cls, key))
+        if pool is None:
+            pool = self.pools[(cls, key)] = ObjectPool(self, cls, key)
+        return pool
+
+    def acquire(self, cls, *args):
+        """An instance of `cls` as if built with cls(*args), recycled when one is free."""
+        return self.get_pool(cls, cls.get_pool_key(*args)).acquire(*args)
+
+    def prewarm(self, cls, count, *args):
+        self.get_pool(cls, cls.get_pool_key(*args)).prewarm(count, *args)
+
+    def end_step(self):
+        if self.released:
+            for pooled_object in self.released:
+                pool = pooled_object.pool
+                if len(pool.free) < pool.max_free:
+                    pool.free.append(pooled_object)
+            self.released.clear()
+
+    def get_stats(self):
+        """{"Class" or "Class:key": {"hits", "misses", "free"}}, to size the prewarm counts."""
+        stats = {}
+        for (cls, key), pool in self.pools.items():
+            name = cls.__name__ if key is None else f"{cls.__name__}:{key}"
+            stats[name] = {"hits": pool.hits, "misses": pool.misses, "free": len(pool.free)}
+        return stats
+
+    def get_totals(self):
+        hits = sum(pool.hits for pool in self.pools.values())
+        misses = sum(pool.misses for pool in self.pools.values())
+        return hits, misses
@@ -0,0 +1,146 @@
+import decoded_assets
+import os
+import pygame
+import time
+from atlas_manager import atlas_manager
+from animation_manager import ANIMATION_STATES
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import ABILITIES_IMAGES_ROOT_PATH, ITEM_IMAGES_ROOT_PATH, MAPS_IMAGES_ROOT_PATH, HEROES_IMAGE_ROOT, NPCS_IMAGE_ROOT, HEADER_BAR_IMAGE_PATH, PLAYER_START_POS, \
+    PRELOAD_WORKER_COUNT, PRELOAD_MAIN_THREAD_BUDGET_MS
+from helpers import load_animation_frames, get_all_bosses_info, get_debug_name_of_object
+from npc import NPC_ANIMATION_SCALE
+from stages import Stage
+from tile_manager import get_start_chunk_keys
+
+def decode_image(path):
+    decoded_assets.images[decoded_assets.normalize_path(path)] = pygame.image.load(path)
+
+def decode_sound(path):
+    decoded_assets.sounds[decoded_assets.normalize_path(path)] = pygame.mixer.Sound(path)
+
+class PreloadManager:
+    """
+    Loads everything a stage needs between stage select and the intro, behind the loading screen.
+
+    start() works out the stage's manifest: its tiles, every NPC and boss animation, the hero,
+    ability projectiles, items, the intro cinematic, the stage's VO lines and the ability sounds.
+    The files are decoded on a thread pool into decoded_assets, where the loaders pick them up
+    instead of reading the files. Anything not picked up is dropped when the next preload starts.
+    What has to happen on the main thread (conversion, scaling, filling the frame cache, building
+    the Stage and prewarming the object pools) then runs in slices of
+    PRELOAD_MAIN_THREAD_BUDGET_MS per update(), so the loading screen keeps animating.
+
+    Once is_done(), `stage` holds the built Stage and the first frames of the run load nothing.
+    """
+    def __init__(self, game_manager, worker_count=PRELOAD_WORKER_COUNT, budget_ms=PRELOAD_MAIN_THREAD_BUDGET_MS):
+        """
+        :param worker_count: Threads decoding files.
+        :param budget_ms: Main thread time spent on loading steps per update() call.
+        """
+        self.game_manager = game_manager
+        self.bosses_info = get_all_bosses_info()
+        self.worker_count = worker_count
+        self.budget_ms = budget_ms
+        self.executor = None
+        self.decode_jobs = []
+        self.main_thread_steps = deque()
+        self.total_steps = 0
+        self.stage = None
+
+    def start(self, stage_info):
+        self.stage = None
+        decoded_assets.clear() # Whatever the last preload decoded and nothing picked up
+        image_paths, sound_paths, self.main_thread_steps = self.get_stage_manifest(stage_info)
+        self.executor = ThreadPoolExecutor(max_workers=self.worker_count, thread_name_prefix="preload")
+        self.decode_jobs = [self.executor.submit(decode_image, path) for path in image_paths]
+        if not self.game_manager.sound_manager.muted:
+            self.decode_jobs.extend(self.executor.submit(decode_sound, path) for path in sound_paths)
+        self.total_steps = len(self.decode_jobs) + len(self.main_thread_steps)
+        print(f"LOGGING: Preloading {len(image_paths)} images and {len(sound_paths)} sounds for {stage_info['name']}")
+
+    def get_stage_manifest(self, stage_info):
+        """(image paths to decode, sound paths to decode, main thread steps) for a stage."""
+        game_manager = self.game_manager
+        animations = [] # (directory, load_animation_frames keyword arguments)
+        for npc_info in game_manager.npcs_info.values():
+            npc_root = os.path.join(NPCS_IMAGE_ROOT, npc_info["type"], npc_info["debug_name"], "in_game")
+            animations.extend((npc_root, {"prefix": state, "scale_factor": NPC_ANIMATION_SCALE}) for state in ANIMATION_STATES)
+        boss_info = self.bosses_info.get(stage_info.get("final_boss"), {})
+        if "debug_name" in boss_info:
+            boss_root = os.path.join(NPCS_IMAGE_ROOT, boss_info["type"], boss_info["debug_name"], "in_game")
+            animations.extend((boss_root, {"prefix": state, "scale_factor": NPC_ANIMATION_SCALE}) for state in ANIMATION_STATES)
+        hero_root = os.path.join(HEROES_IMAGE_ROOT, get_debug_name_of_object(stage_info["playable_character"]), "in_game")
+        animations.extend((hero_root, {"prefix": state, "scale_factor": 1}) for state in ANIMATION_STATES)
+        animations.append((hero_root, {})) # The stage select picture frame
+        for ability_name, ability_info in game_manager.ability_info.items():
+            if ability_info.get("has_animation"):
+                animations.append((os.path.join(ABILITIES_IMAGES_ROOT_PATH, ability_name, "projectile"), {}))
+        for item_info in game_manager.items_info.values():
+            animations.append((os.path.join(ITEM_IMAGES_ROOT_PATH, item_info["id"]), {}))
+        animations = [(directory, options) for directory, options in animations if os.path.isdir(directory)]
+
+        stage_name = get_debug_name_of_object(stage_info["name"])
+        image_paths = atlas_manager.get_unloaded_page_paths()
+        for directory in dict.fromkeys(directory for directory, _ in animations):
+            if atlas_manager.list_directory(directory) is None:
+                image_paths.extend(os.path.join(directory, file_name) for file_name in os.listdir(directory))
+        for directory, directory_names, file_names in os.walk(os.path.join(MAPS_IMAGES_ROOT_PATH, stage_name)):
+            image_paths.extend(os.path.join(directory, file_name) for file_name in sorted(file_names)) # Tiles and decorations
+        image_paths.append(HEADER_BAR_IMAGE_PATH) # Loaded by the HUD when the run starts
+        intro_name = f"{stage_name}_intro"
+        intro = game_manager.cinematic_manager.cinematics_data.get(intro_name)
+        if intro:
+            image_paths.append(intro["image_path"])
+        sound_manager = game_manager.sound_manager
+        cast_sound_names = [f"{ability_name}_cast" for ability_name in game_manager.ability_info]
+        cast_sound_names = [name for name in cast_sound_names if sound_manager.get_sound_path(name)]
+        sound_paths = list(sound_manager.get_stage_vo_paths(stage_name).values())
+        sound_paths.extend(sound_manager.get_sound_path(name) for name in cast_sound_names)
+
+        steps = deque((lambda directory=directory, options=options: load_animation_frames(directory, **options)) for directory, options in animations)
+        if intro:
+            steps.append(lambda: game_manager.cinematic_manager.get_background_image(intro_name))
+        steps.append(lambda: sound_manager.load_stage_vo_lines(stage_info["name"].lower()))
+        steps.append(lambda: sound_manager.prefetch_sounds(cast_sound_names))
+        steps.append(self.build_stage)
+        # Bake the background chunks around where the player starts, one step each, so the first frame of the run doesn't.
+        # Counted here with the rest, so the loading bar never has steps added once it is moving
+        steps.extend((lambda chunk_key=chunk_key: self.stage.tile_manager.get_chunk(chunk_key))
+                     for chunk_key in get_start_chunk_keys(game_manager.screen.get_rect(), PLAYER_START_POS))
+        steps.append(game_manager.prewarm_pools)
+        return image_paths, sound_paths, steps
+
+    def build_stage(self):
+        self.stage = Stage(self.game_manager)
+
+    def update(self):
+        """Runs main thread steps for up to the time budget, once every file has been decoded."""
+        if self.executor is None or not self.is_decoded():
+            return
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        while self.main_thread_steps and time.perf_counter() < deadline:
+            self.main_thread_steps.popleft()()
+        if not self.main_thread_steps:
+            self.finish()
+
+    def is_decoded(self):
+        return all(job.done() for job in self.decode_jobs)
+
+    def finish(self):
+        for job in self.decode_jobs:
+            job.result() # Re-raises anything a worker failed with
+        self.executor.shutdown()
+        self.executor = None
+        self.decode_jobs = []
+        print("LOGGING: Preloading finished")
+
+    def is_done(self):
+        return self.executor is None and self.stage is not None
+
+    def get_progress(self):
+        """Fraction of the decode jobs and main thread steps done, 0 to 1."""
+        if not self.total_steps:
+            return 1.0
+        done = sum(job.done() for job in self.decode_jobs) + self.total_steps - len(self.decode_jobs) - len(self.main_thread_steps)
+        return done / self.total_steps
@@ -0,0 +1,86 @@
+from collections import deque
+from config.settings import QUALITY_LEVELS, TARGET_FRAME_TIME_MS, QUALITY_WINDOW_FRAMES, QUALITY_COOLDOWN_FRAMES, \
+    QUALITY_DOWNGRADE_RATIO, QUALITY_UPGRADE_RATIO
+
+class QualityGovernor:
+    """
+    Trades detail for frame rate when the machine can't keep up.
+
+    Each gameplay frame reports how long it worked for (not counting the wait for the FPS cap).
+    Once a full window of frames averages over the budget times downgrade_ratio, the governor
+    steps down one of QUALITY_LEVELS, and once a window averages under the budget times
+    upgrade_ratio it steps back up. The gap between the two ratios, and a cooldown after every
+    change, keep it from flipping back and forth between two levels.
+
+    A level sets the enemy cap, a scale on spawn batch sizes, the most damage texts alive at
+    once, the share of hits that get one, and how often off-screen enemies, NPCs and ability
+    sprites get a new animation frame (items don't animate). Level 0 is the game as designed.
+
+    Only the windowed game loop reports frames, and not while recording or replaying, since the
+    enemy cap and spawn sizes change how a run plays out. Headless and benchmark runs stay on
+    level 0 and remain reproducible.
+    """
+    def __init__(self, game_manager, levels=QUALITY_LEVELS, budget_ms=TARGET_FRAME_TIME_MS, window_frames=QUALITY_WINDOW_FRAMES,
+                 cooldown_frames=QUALITY_COOLDOWN_FRAMES, downgrade_ratio=QUALITY_DOWNGRADE_RATIO, upgrade_ratio=QUALITY_UPGRADE_RATIO):
+        """
+        :param levels: Settings of each quality level, best first.
+        :param budget_ms: Frame time to hold.
+        :param window_frames: Frames averaged before deciding on a change.
+        :param cooldown_frames: Frames after a change before the next one can happen.
+        :param downgrade_ratio: Average over budget_ms times this steps quality down.
+        :param upgrade_ratio: Average under budget_ms times this steps quality up.
+        """
+        self.game_manager = game_manager
+        self.levels = levels
+        self.budget_ms = budget_ms
+        self.cooldown_frames = cooldown_frames
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.frame_times = deque(maxlen=window_frames)
+        self.frames_since_change = 0
+        self.effect_credit = 0.0 # Builds up by effect_density per hit, a damage text is shown for every whole one
+        self.set_level(0)
+
+    def update(self, work_ms):
+        """Record one gameplay frame's work time in milliseconds, changing level if it's called for."""
+        if self.game_manager.replay or self.game_manager.input_recorder:
+            return
+        self.frame_times.append(work_ms)
+        self.frames_since_change += 1
+        if len(self.frame_times) < self.frame_times.maxlen or self.frames_since_change < self.cooldown_frames:
+            return
+        average_ms = sum(self.frame_times) / len(self.frame_times)
+        if average_ms > self.budget_ms * self.downgrade_ratio and self.level < len(self.levels) - 1:
+            self.set_level(self.level + 1, average_ms)
+        elif average_ms < self.budget_ms * self.upgrade_ratio and self.level > 0:
+            self.set_level(self.level - 1, average_ms)
+
+    def set_level(self, level, average_ms=None):
+        if average_ms is not None:
+            print(f"LOGGING: Quality level {self.level} -> {level}, frames averaged {average_ms:.1f} ms against a {self.budget_ms:.1f} ms budget")
+        self.level = level
+        settings = self.levels[level]
+        self.enemy_cap = settings["enemy_cap"]
+        self.spawn_batch_scale = settings["spawn_batch_scale"]
+        self.max_damage_texts = settings["max_damage_texts"]
+        self.effect_density = settings["effect_density"]
+        self.offscreen_animation_interval = settings["offscreen_animation_interval"]
+        self.game_manager.lod_manager.offscreen_animation_interval = self.offscreen_animation_interval
+        if self.game_manager.enemy_engine is not None:
+            self.game_manager.enemy_engine.offscreen_animation_interval = self.offscreen_animation_interval
+        self.frame_times.clear()
+        self.frames_since_change = 0
+
+    def get_spawn_count(self, count):
+        """A spawn batch of `count` scaled for the current level, at least one."""
+        return max(1, round(count * self.spawn_batch_scale))
+
+    def allow_damage_text(self):
+        """Whether a hit gets a damage text: within the cap, and for effect_density of the hits."""
+        if self.max_damage_texts is not None and len(self.game_manager.damage_texts) >= self.max_damage_texts:
+            return False
+        self.effect_credit += self.effect_density
+        if self.effect_credit < 1:
+            return False
+        self.effect_credit -= 1
+        return True
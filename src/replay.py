@@ -0,0 +1,128 @@
+import json
+
+REPLAY_FORMAT_VERSION = 1
+
+class InputRecorder:
+    """
+    Records everything the player feeds into a run so it can be replayed exactly.
+
+    Together with the run seed (see RngManager) the simulation is deterministic, so all a replay
+    needs is the per-tick input state and the level up choices. Input is stored run-length
+    encoded as [repeat_count, key_bits, left_x, left_y] entries, which keeps a long run that is
+    mostly "holding a direction" down to a few kilobytes.
+
+    Only the most recent run is kept; it is written out by save().
+    """
+    def __init__(self, game_manager, path):
+        self.game_manager = game_manager
+        self.path = path
+        self.recording = None
+        self.start_tick = 0
+
+    def start_run(self):
+        game_manager = self.game_manager
+        self.start_tick = game_manager.simulation_clock.tick
+        self.recording = {
+            "version": REPLAY_FORMAT_VERSION,
+            "stage": game_manager.selected_stage['name'],
+            "run_seed": game_manager.rng.run_seed,
+            "tick_rate": game_manager.simulation_clock.tick_rate,
+            "input": [],
+            "level_ups": [],
+        }
+
+    def get_run_tick(self):
+        return self.game_manager.simulation_clock.tick - self.start_tick
+
+    def record_input(self, input_state):
+        key_bits, left_x, left_y = input_state
+        recorded_input = self.recording["input"]
+        if recorded_input:
+            last = recorded_input[-1]
+            if last[1] == key_bits and last[2] == left_x and last[3] == left_y:
+                last[0] += 1
+                return
+        recorded_input.append([1, key_bits, left_x, left_y])
+
+    def record_level_up(self, option_index):
+        self.recording["level_ups"].append([self.get_run_tick(), option_index])
+
+    def save(self):
+        if not self.recording:
+            return
+        game_manager = self.game_manager
+        self.recording["ticks"] = self.get_run_tick()
+        self.recording["result"] = get_run_summary(game_manager)
+        with open(self.path, "w") as replay_file:
+            json.dump(self.recording, replay_file, separators=(",", ":"))
+        print(f"LOGGING: Saved replay of {self.recording['ticks']} ticks to {self.path}")
+
+class ReplayInput:
+    """
+    Feeds a recording made by InputRecorder back into the game.
+
+    Used as the player's input_source, so recorded input goes through Player.input exactly like
+    live input does, and as the upgrade chooser on the level up screen. Works with a window or
+    with HeadlessRunner (it has the same interface as the headless bots).
+    """
+    def __init__(self, game_manager, path):
+        self.game_manager = game_manager
+        with open(path) as replay_file:
+            self.recording = json.load(replay_file)
+        assert self.recording.get("version") == REPLAY_FORMAT_VERSION, f"Unsupported replay version in {path}"
+        assert self.recording["tick_rate"] == game_manager.simulation_clock.tick_rate, "Replay was recorded at a different simulation tick rate"
+        self.stage_name = self.recording["stage"]
+        self.run_seed = self.recording["run_seed"]
+        self.ticks = self.recording["ticks"]
+        self.start_run()
+
+    def start_run(self):
+        self.start_tick = self.game_manager.simulation_clock.tick
+        self.input_index = 0
+        self.repeats_left = self.recording["input"][0][0] if self.recording["input"] else 0
+        self.level_up_index = 0
+
+    @property
+    def finished(self):
+        return self.input_index >= len(self.recording["input"])
+
+    def get_movement(self, player):
+        if self.finished:
+            return 0, 0
+        entry = self.recording["input"][self.input_index]
+        self.repeats_left -= 1
+        if self.repeats_left <= 0:
+            self.input_index += 1
+            if not self.finished:
+                self.repeats_left = self.recording["input"][self.input_index][0]
+        return player.get_movement_from_input_state(entry[1:])
+
+    def choose_upgrade(self, upgrade_options):
+        level_ups = self.recording["level_ups"]
+        if self.level_up_index >= len(level_ups):
+            print("LOGGING: Replay has no more recorded level up choices, picking the first option")
+            return 0
+        recorded_tick, option_index = level_ups[self.level_up_index]
+        self.level_up_index += 1
+        run_tick = self.game_manager.simulation_clock.tick - self.start_tick
+        if run_tick != recorded_tick:
+            print(f"LOGGING: Replay desync, level up at tick {run_tick} was recorded at tick {recorded_tick}")
+        return option_index
+
+    def get_mismatches(self):
+        """Compare the end of the replayed run with the recorded result. An empty dict means it played out identically."""
+        expected = self.recording.get("result", {})
+        actual = get_run_summary(self.game_manager)
+        return {key: {"recorded": value, "replayed": actual.get(key)} for key, value in expected.items() if actual.get(key) != value}
+
+def get_run_summary(game_manager):
+    """The handful of values a replay has to reproduce exactly."""
+    player = game_manager.player
+    return {
+        "elapsed_time": round(game_manager.elapsed_time, 6),
+        "player_pos": list(player.rect.topleft),
+        "player_health": player.health,
+        "player_level": player.xp_manager.level,
+        "enemies_defeated": game_manager.enemies_defeated,
+        "enemy_count": len(game_manager.all_enemies),
+    }
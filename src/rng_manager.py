@@ -0,0 +1,52 @@
+import random
+
+class RngManager:
+    """
+    Hands out one seeded random.Random stream per subsystem.
+
+    Each game run gets its own run seed, and every stream is derived from that seed and the
+    stream's name. Subsystems never share a stream, so e.g. one extra ability roll can't shift
+    the loot rolls, and a run seed always plays out the same way.
+
+    Streams in use:
+        waves       - wave types, wave enemy choice and placement
+        herds       - herd and line formation offsets
+        loot        - enemy drops
+        encounters  - encounter rolls and placement
+        upgrades    - level up options
+        abilities   - random directions, targets and timings used by abilities
+        boss        - boss minion choice
+        recycle     - where enemies left far behind are brought back
+
+    Background tiles don't use a stream, they are hashed from the cell (see TileManager).
+    """
+    def __init__(self, seed=None):
+        """
+        :param seed: Master seed. Run seeds are drawn from it in order, so a fixed master seed gives
+                     the same sequence of runs. None picks a random one.
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        self.seed = seed
+        self.run_seeds = random.Random(seed)
+        self.run_seed = None
+        self.streams = {}
+
+    def start_run(self, run_seed=None):
+        """
+        Reset every stream for a new game run.
+
+        :param run_seed: Seed to use for this run, e.g. the one stored in a replay. None draws the
+                         next seed from the master seed.
+        """
+        if run_seed is None:
+            run_seed = self.run_seeds.getrandbits(32)
+        self.run_seed = run_seed
+        self.streams = {}
+
+    def get(self, name):
+        stream = self.streams.get(name)
+        if stream is None:
+            # String seeds are hashed with SHA-512, so this is stable across processes (unlike hash())
+            stream = self.streams[name] = random.Random(f"{self.run_seed}:{name}")
+        return stream
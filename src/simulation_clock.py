@@ -0,0 +1,74 @@
+from config.settings import SIMULATION_TICK_RATE, MAX_SIMULATION_STEPS_PER_FRAME, INTERPOLATION_SNAP_DISTANCE
+
+class SimulationClock:
+    """
+    Fixed-timestep accumulator that decouples the simulation rate from the render rate.
+
+    Every rendered frame adds its real duration to the accumulator, and the game then runs
+    as many fixed-size simulation steps as fit into it. Whatever is left over (less than one
+    step) is exposed as `alpha` so the renderer can interpolate between the last two states.
+    """
+    def __init__(self, tick_rate=SIMULATION_TICK_RATE, max_steps_per_frame=MAX_SIMULATION_STEPS_PER_FRAME):
+        """
+        :param tick_rate: Number of simulation steps per second.
+        :param max_steps_per_frame: Cap on catch-up steps run for a single rendered frame.
+        """
+        self.tick_rate = tick_rate
+        self.step = 1 / tick_rate
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator = 0.0
+        self.tick = 0
+        self.dropped_time = 0.0
+
+    def advance(self, frame_time):
+        """
+        Add a rendered frame's duration and return how many simulation steps should run.
+
+        If the frame took so long that more than `max_steps_per_frame` steps are owed, the
+        backlog is dropped instead of being simulated, so a stall slows the game down for a
+        moment rather than sending it into a catch-up spiral.
+        """
+        self.accumulator += frame_time
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps_per_frame:
+            self.dropped_time += (steps - self.max_steps_per_frame) * self.step
+            steps = self.max_steps_per_frame
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    def on_step(self):
+        """Record that one simulation step has been run."""
+        self.tick += 1
+
+    @property
+    def alpha(self):
+        """How far (0.0 to 1.0) the render time is between the previous and current simulation state."""
+        return min(self.accumulator / self.step, 1.0)
+
+    def reset(self):
+        """Clear any owed time, e.g. when gameplay is resumed after a menu."""
+        self.accumulator = 0.0
+
+def snapshot_positions(*groups):
+    """Remember where each sprite was before a simulation step so it can be interpolated when drawn."""
+    for group in groups:
+        for sprite in group:
+            sprite.previous_pos = sprite.rect.topleft
+
+def get_interpolated_pos(sprite, alpha):
+    """
+    Returns the sprite's top-left world position blended between its previous and current
+    simulation state. Sprites that jumped further than INTERPOLATION_SNAP_DISTANCE (teleports,
+    respawns) are drawn at their current position instead of being smeared across the screen.
+    """
+    x, y = sprite.rect.topleft
+    previous_pos = getattr(sprite, "previous_pos", None)
+    if previous_pos is None:
+        return x, y
+    dx = x - previous_pos[0]
+    dy = y - previous_pos[1]
+    if abs(dx) > INTERPOLATION_SNAP_DISTANCE or abs(dy) > INTERPOLATION_SNAP_DISTANCE:
+        return x, y
+    return round(previous_pos[0] + dx * alpha), round(previous_pos[1] + dy * alpha)
@@ -1,70 +1,222 @@
+import decoded_assets
 import os
 import pygame
-from config.settings import SOUNDS_ROOT_PATH, VO_ROOT_PATH
+from collections import OrderedDict
+from config.settings import SOUNDS_ROOT_PATH, VO_ROOT_PATH, SOUND_CACHE_MAX_BYTES, CAST_SOUND_VOLUME, \
+    SOUND_VOICE_COUNT, SOUND_MAX_VOICES_PER_SOUND, SOUND_MIN_RETRIGGER_MS, SOUND_LIMITS
+from enum import IntEnum
 from typing import Dict
 
+class SoundPriority(IntEnum):
+    """When every voice is busy, a sound may take over a voice playing something of lower priority."""
+    AMBIENT = 0
+    PLAYER_CAST = 1
+    BOSS = 2
+    VO = 3
+
 class SoundManager:
-    def __init__(self):
+    def __init__(self, muted: bool = False, max_bytes: int = SOUND_CACHE_MAX_BYTES, voice_count: int = SOUND_VOICE_COUNT):
         """
-        Initialize the SoundManager, setting up the mixer and sound storage.
+        Initialize the SoundManager, setting up the mixer and indexing the sound files.
+
+        Nothing is decoded here. Sounds are decoded the first time they are played or prefetched
+        and kept in a least recently used cache of up to max_bytes of sample data.
+
+        Sound effects are played through a fixed set of voices (mixer channels) rather than
+        wherever the mixer finds room. A sound is skipped if it was started less than its minimum
+        retrigger interval ago or already plays on its maximum number of voices, and when every
+        voice is busy it takes the oldest one playing something of lower priority or is skipped.
+        The first voice is kept for VO lines.
+
+        :param muted: If True, the mixer is never initialised and no sounds are loaded or played (used by headless runs).
+        :param max_bytes: Decoded sample data kept resident before the least recently used sounds are dropped.
+        :param voice_count: Sounds that can play at once, VO included.
         """
-        pygame.mixer.init()
-        self.sounds: Dict[str, pygame.mixer.Sound] = {}
-        self.vo_lines: Dict[str, pygame.mixer.Sound] = {}
+        self.muted = muted
+        self.max_bytes = max_bytes
+        self.voice_count = voice_count
+        self.voices = [] # Mixer channels, the first one kept for VO
+        self.voice_sounds = {} # Voice -> (sound name, priority, ticks it started at)
+        self.sound_limits: Dict[str, tuple] = {} # Sound name -> (max voices, min retrigger ms), where they differ from the defaults
+        self.last_played: Dict[str, int] = {} # Sound name -> ticks it last started at
+        self.skipped_plays = 0
+        self.sound_paths: Dict[str, str] = {} # Sound effect name -> file
+        self.vo_paths: Dict[str, str] = {} # VO line name -> file, for every stage
+        self.sound_volumes: Dict[str, float] = {} # Volumes set on sounds, applied again whenever they are decoded
+        self.resident = OrderedDict() # File -> (Sound, byte count), least recently used first
+        self.resident_bytes = 0
+        self.vo_lines: Dict[str, str] = {} # The current stage's VO line name -> file
         self.running_vo_line = None
-        self.load_all_sfx()
+        self.vo_stage_name = None # Stage whose VO lines are loaded
+        self.index_sounds()
+        for name, (max_voices, min_retrigger_ms) in SOUND_LIMITS.items():
+            self.set_sound_limits(name, max_voices, min_retrigger_ms)
+        if self.muted:
+            return
+        pygame.mixer.init()
+        pygame.mixer.set_num_channels(self.voice_count)
+        pygame.mixer.set_reserved(1) # Keeps Sound.play, which picks its own channel, off the VO voice
+        self.voices = [pygame.mixer.Channel(index) for index in range(self.voice_count)]
         self.set_music_volume(0.1)
 
-    def load_all_sfx(self):
+    def index_sounds(self):
+        """Maps sound names to their files. Only directories are listed, no sound file is read."""
         for path, directories, files in os.walk(SOUNDS_ROOT_PATH):
             for file in files:
-                file_to_load = os.path.normpath(os.path.join(path, file))
-                sound_name_elements = file_to_load.removesuffix(".wav").split("\\")
-                sound_name = sound_name_elements[-2] + "_" + sound_name_elements [-1]
-                self.load_sound(sound_name, file_to_load, self.sounds)
-                if "cast" in sound_name_elements:
-                    self.set_sound_volume(sound_name, 0.2)
-
-    def load_stage_vo_lines(self, stage_name):
-        self.vo_lines = {}
+                file_path = os.path.normpath(os.path.join(path, file))
+                file_stem = os.path.splitext(file)[0]
+                sound_name = os.path.basename(os.path.normpath(path)) + "_" + file_stem
+                self.sound_paths[sound_name] = file_path
+                if file_stem == "cast":
+                    self.sound_volumes[sound_name] = CAST_SOUND_VOLUME
         for path, directories, files in os.walk(VO_ROOT_PATH):
             for file in files:
-                file_to_load = os.path.normpath(os.path.join(path, file))
-                vo_line_file_elements = file_to_load.removesuffix(".wav").split("\\")
-                vo_line_name = vo_line_file_elements[-1]
-                vo_line_name_elements = vo_line_name.split("_")
-                if vo_line_name_elements[0] == stage_name:
-                    self.load_sound(vo_line_name, file_to_load, self.vo_lines)
+                self.vo_paths[os.path.splitext(file)[0]] = os.path.normpath(os.path.join(path, file))
+
+    def get_sound_path(self, name: str):
+        return self.sound_paths.get(name)
+
+    def get_stage_vo_paths(self, stage_name: str) -> Dict[str, str]:
+        """VO line name -> file for every line of a stage, `stage_name` being its lowercase debug name."""
+        return {vo_line_name: file_path for vo_line_name, file_path in self.vo_paths.items()
+                if vo_line_name.split("_")[0] == stage_name}
+
+    def load_stage_vo_lines(self, stage_name):
+        """Switches to a stage's VO lines, decoding them now so the cinematic doesn't, and drops the last stage's."""
+        for file_path in self.vo_lines.values():
+            self.unload_sound(file_path)
+        self.vo_lines = self.get_stage_vo_paths(stage_name)
+        self.vo_stage_name = stage_name
+        if self.muted:
+            return
+        for file_path in self.vo_lines.values():
+            self.load_sound(file_path)
+
+    def prefetch_sounds(self, names) -> None:
+        """Decodes the named sound effects ahead of their first play. Unknown names are ignored."""
+        if self.muted:
+            return
+        for name in names:
+            if name in self.sound_paths:
+                self.get_sound(name)
 
-    def load_sound(self, name: str, file_path: str, sounds_list: dict) -> None:
+    def get_sound(self, name: str):
+        """The decoded sound effect called `name`, or None if there is no such sound."""
+        file_path = self.sound_paths.get(name)
+        if file_path is None:
+            return None
+        return self.load_sound(file_path, self.sound_volumes.get(name))
+
+    def load_sound(self, file_path: str, volume: float = None) -> pygame.mixer.Sound:
         """
-        Load a sound effect from a file and store it with a name.
+        The decoded sound at a path, from the cache or decoded now and cached.
 
-        :param name: The name to reference the sound.
         :param file_path: The path to the sound file (wav or mp3).
+        :param volume: Volume set on the sound when it has to be decoded.
+        """
+        entry = self.resident.get(file_path)
+        if entry is not None:
+            self.resident.move_to_end(file_path)
+            return entry[0]
+        sound = decoded_assets.load_sound_file(file_path)
+        if volume is not None:
+            sound.set_volume(volume)
+        byte_count = self.get_sound_bytes(sound)
+        self.resident[file_path] = (sound, byte_count)
+        self.resident_bytes += byte_count
+        self.evict()
+        return sound
+
+    def unload_sound(self, file_path: str) -> None:
+        entry = self.resident.pop(file_path, None)
+        if entry is not None:
+            self.resident_bytes -= entry[1]
+
+    def get_sound_bytes(self, sound: pygame.mixer.Sound) -> int:
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+
+    def evict(self):
+        # Sounds still playing stay, and so does the newest even when it alone is over the limit
+        for file_path in list(self.resident):
+            if self.resident_bytes <= self.max_bytes or len(self.resident) == 1:
+                break
+            sound, byte_count = self.resident[file_path]
+            if sound.get_num_channels() == 0:
+                self.unload_sound(file_path)
+
+    def get_stats(self):
+        return {
+            "indexed": len(self.sound_paths) + len(self.vo_paths),
+            "resident": len(self.resident),
+            "bytes": self.resident_bytes,
+            "voices busy": sum(voice.get_busy() for voice in self.voices),
+            "skipped plays": self.skipped_plays,
+        }
+
+    def set_sound_limits(self, name: str, max_voices: int = SOUND_MAX_VOICES_PER_SOUND, min_retrigger_ms: int = SOUND_MIN_RETRIGGER_MS) -> None:
+        """
+        Limit how a sound effect can pile up.
+
+        :param name: The name of the sound.
+        :param max_voices: Copies of the sound that may play at once.
+        :param min_retrigger_ms: Plays of the sound closer together than this are skipped.
         """
-        sound = pygame.mixer.Sound(file_path)
-        sounds_list[name] = sound
+        self.sound_limits[name] = (max_voices, min_retrigger_ms)
+
+    def get_voice(self, name: str, priority: SoundPriority):
+        """A voice to play `name` on, or None when its limits or the voices in use say it mustn't play."""
+        max_voices, min_retrigger_ms = self.sound_limits.get(name, (SOUND_MAX_VOICES_PER_SOUND, SOUND_MIN_RETRIGGER_MS))
+        now = pygame.time.get_ticks()
+        if name in self.last_played and now - self.last_played[name] < min_retrigger_ms:
+            return None
+        busy_voices = []
+        voice = None
+        for candidate in self.voices[1:]:
+            if candidate.get_busy() and candidate in self.voice_sounds:
+                busy_voices.append((candidate, self.voice_sounds[candidate]))
+            elif voice is None:
+                voice = candidate
+        if sum(playing_name == name for _, (playing_name, _, _) in busy_voices) >= max_voices:
+            return None
+        if voice is None:
+            lower_priority = [(started, voice) for voice, (_, playing_priority, started) in busy_voices if playing_priority < priority]
+            if not lower_priority:
+                return None
+            voice = min(lower_priority, key=lambda entry: entry[0])[1]
+            voice.stop()
+        self.last_played[name] = now
+        self.voice_sounds[voice] = (name, priority, now)
+        return voice
 
     def play_vo_line(self, name: str, loops: int = 0) -> None:
+        if self.muted:
+            return
         self.stop_vo()
         if name in self.vo_lines:
-            self.vo_lines[name].play(loops=loops)
-            self.running_vo_line = self.vo_lines[name]
+            self.running_vo_line = self.load_sound(self.vo_lines[name])
+            self.voices[0].play(self.running_vo_line, loops=loops)
         else:
             print(f"VO Line '{name}' not found!")
 
-    def play_sound(self, name: str, loops: int = 0) -> None:
+    def play_sound(self, name: str, loops: int = 0, priority: SoundPriority = SoundPriority.AMBIENT) -> None:
         """
-        Play a loaded sound effect.
+        Play a sound effect, unless its limits or the voices in use skip it (see __init__).
 
         :param name: The name of the sound to play.
         :param loops: The number of times to loop the sound. Default is 0 (no loop).
+        :param priority: Decides which sounds give up their voice when every voice is busy.
         """
-        if name in self.sounds:
-            self.sounds[name].play(loops=loops)
-        else:
+        if self.muted:
+            return
+        if name not in self.sound_paths:
             print(f"Sound '{name}' not found!")
+            return
+        voice = self.get_voice(name, priority)
+        if voice is None:
+            self.skipped_plays += 1
+            return
+        voice.play(self.get_sound(name), loops=loops)
 
     def stop_sound(self, name: str) -> None:
         """
@@ -72,8 +224,12 @@ class SoundManager:
 
         :param name: The name of the sound to stop.
         """
-        if name in self.sounds:
-            self.sounds[name].stop()
+        if self.muted:
+            return
+        if name in self.sound_paths:
+            entry = self.resident.get(self.sound_paths[name])
+            if entry is not None: # A sound that isn't decoded isn't playing either
+                entry[0].stop()
         else:
             print(f"Sound '{name}' not found!")
 
@@ -85,6 +241,8 @@ class SoundManager:
         :param loops: The number of times to loop the music. Default is -1 (infinite loop).
         :param start: The position to start the music from in seconds.
         """
+        if self.muted:
+            return
         pygame.mixer.music.load(file_path)
         pygame.mixer.music.play(loops=loops, start=start)
 
@@ -92,6 +250,8 @@ class SoundManager:
         """
         Stop the currently playing background music.
         """
+        if self.muted:
+            return
         pygame.mixer.music.stop()
 
     def switch_music(self, new_track_path) -> None:
@@ -104,6 +264,8 @@ class SoundManager:
 
         :param volume: Volume level (0.0 to 1.0).
         """
+        if self.muted:
+            return
         pygame.mixer.music.set_volume(volume)
 
     def stop_vo(self):
@@ -117,11 +279,17 @@ class SoundManager:
         :param name: The name of the sound.
         :param volume: Volume level (0.0 to 1.0).
         """
-        if name in self.sounds:
-            self.sounds[name].set_volume(volume)
+        if self.muted:
+            return
+        if name in self.sound_paths:
+            self.sound_volumes[name] = volume
+            entry = self.resident.get(self.sound_paths[name])
+            if entry is not None:
+                entry[0].set_volume(volume)
         else:
             print(f"Sound '{name}' not found!")
         
     def load_stage(self, stage):
         self.switch_music(stage.music_track_path)
-        self.load_stage_vo_lines(stage.name.lower())
\ No newline at end of file
+        if self.vo_stage_name != stage.name.lower(): # Already loaded when the stage was preloaded
+            self.load_stage_vo_lines(stage.name.lower())
\ No newline at end of file
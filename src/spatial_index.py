@@ -0,0 +1,177 @@
+import pygame
+from enum import IntFlag
+from config.settings import SPATIAL_INDEX_CELL_SIZE
+
+class IndexLayer(IntFlag):
+    """Which group an indexed sprite belongs to. Queries take a mask of these so one index serves every system."""
+    ENEMIES = 1
+    NEUTRAL_NPCS = 2
+    ITEMS = 4
+    ABILITY_SPRITES = 8
+
+class SpatialIndex:
+    """
+    World-space uniform grid shared by every indexed sprite group, kept alive for the whole run.
+
+    A sprite is stored in every cell its rect overlaps. Sprites join and leave through
+    IndexedGroup. Whatever moves an indexed sprite's rect reports it through move(), which
+    re-buckets the sprite only if it crossed into different cells, so the index never has to
+    look at sprites that stood still. Cells are dicts rather than sets so query results come back
+    in a deterministic order.
+
+    Sprites whose owner already works out their cells (the EnemyEngine does it for every enemy in
+    one array operation) can be handed over with track() and pass their new cell range to move().
+    """
+    def __init__(self, cell_size=SPATIAL_INDEX_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> {sprite: layer}
+        self.sprite_cells = {}  # sprite -> (layer, (min_cell_x, min_cell_y, max_cell_x, max_cell_y))
+        self.pending = {}  # sprite -> layer, for sprites added to a group before they had a rect
+        self.tracked_cells = {}  # Like sprite_cells, for sprites whose owner works out their cell range
+
+    def __len__(self):
+        return len(self.sprite_cells) + len(self.tracked_cells) + len(self.pending)
+
+    def get_cell_range(self, rect):
+        cell_size = self.cell_size
+        return (rect.left // cell_size, rect.top // cell_size,
+                (rect.right - 1) // cell_size, (rect.bottom - 1) // cell_size)
+
+    def insert(self, sprite, layer):
+        if getattr(sprite, "rect", None) is None:
+            # NPCs and ability sprites join their groups before creating their rect
+            self.pending[sprite] = layer
+            return
+        cell_range = self.get_cell_range(sprite.rect)
+        self.sprite_cells[sprite] = (layer, cell_range)
+        self.add_to_cells(sprite, layer, cell_range)
+
+    def remove(self, sprite):
+        if self.pending.pop(sprite, None) is not None:
+            return
+        entry = self.sprite_cells.pop(sprite, None) or self.tracked_cells.pop(sprite, None)
+        if entry:
+            self.remove_from_cells(sprite, entry[1])
+
+    def get_layer(self, sprite):
+        """The IndexLayer `sprite` is stored under, or None if it isn't indexed."""
+        entry = self.sprite_cells.get(sprite) or self.tracked_cells.get(sprite)
+        return entry[0] if entry else self.pending.get(sprite)
+
+    def track(self, sprite):
+        """Hand `sprite` over to an owner that works out its cells. Returns its current cell range; pass later ones to move()."""
+        self.flush_pending()
+        self.tracked_cells[sprite] = self.sprite_cells.pop(sprite)
+        self.move(sprite)
+        return self.tracked_cells[sprite][1]
+
+    def move(self, sprite, cell_range=None):
+        """
+        Re-bucket `sprite` after its rect moved or changed size. Sprites that aren't indexed are ignored.
+
+        :param cell_range: Its new cells as (min_cell_x, min_cell_y, max_cell_x, max_cell_y), if the
+                           caller already knows them. Worked out from its rect otherwise.
+        """
+        entries = self.sprite_cells
+        entry = entries.get(sprite)
+        if entry is None:
+            entries = self.tracked_cells
+            entry = entries.get(sprite)
+            if entry is None:
+                return # Not in an indexed group, or still pending and bucketed from its rect when flushed
+        layer, old_range = entry
+        if cell_range is None:
+            cell_range = self.get_cell_range(sprite.rect)
+        if cell_range == old_range:
+            return
+        self.remove_from_cells(sprite, old_range)
+        self.add_to_cells(sprite, layer, cell_range)
+        entries[sprite] = (layer, cell_range)
+
+    def add_to_cells(self, sprite, layer, cell_range):
+        cells = self.cells
+        min_x, min_y, max_x, max_y = cell_range
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = cells.get((cell_x, cell_y))
+                if cell is None:
+                    cell = cells[(cell_x, cell_y)] = {}
+                cell[sprite] = layer
+
+    def remove_from_cells(self, sprite, cell_range):
+        cells = self.cells
+        min_x, min_y, max_x, max_y = cell_range
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = cells[(cell_x, cell_y)]
+                del cell[sprite]
+                if not cell:
+                    del cells[(cell_x, cell_y)]
+
+    def flush_pending(self):
+        if self.pending:
+            pending, self.pending = self.pending, {}
+            for sprite, layer in pending.items():
+                self.insert(sprite, layer)
+
+    def refresh(self):
+        """Bucket the sprites that were waiting for a rect. Moved sprites are re-bucketed by move() as they go."""
+        self.flush_pending()
+
+    def query_rect(self, rect, layers):
+        """
+        Returns the sprites in `layers` (an IndexLayer mask) whose rect overlaps `rect`.
+
+        :param rect: World-space pygame.Rect to search.
+        :param layers: IndexLayer flags to include, e.g. IndexLayer.ENEMIES | IndexLayer.NEUTRAL_NPCS.
+        """
+        self.flush_pending()
+        cells = self.cells
+        found = {}
+        min_x, min_y, max_x, max_y = self.get_cell_range(rect)
+        colliderect = rect.colliderect
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = cells.get((cell_x, cell_y))
+                if cell is None:
+                    continue
+                for sprite, layer in cell.items():
+                    if layer & layers and sprite not in found and colliderect(sprite.rect):
+                        found[sprite] = None
+        return list(found)
+
+    def query_radius(self, center, radius, layers):
+        """Returns the sprites in `layers` whose rect centre is within `radius` of `center`."""
+        center_x, center_y = center
+        # A rect always contains its own centre, so any sprite in range overlaps the circle's bounding square
+        search_rect = pygame.Rect(center_x - radius, center_y - radius, radius * 2, radius * 2)
+        radius_squared = radius * radius
+        in_radius = []
+        for sprite in self.query_rect(search_rect, layers):
+            sprite_x, sprite_y = sprite.rect.center
+            if (sprite_x - center_x) ** 2 + (sprite_y - center_y) ** 2 <= radius_squared:
+                in_radius.append(sprite)
+        return in_radius
+
+class IndexedGroup(pygame.sprite.Group):
+    """A sprite group that keeps its members registered in a SpatialIndex under one IndexLayer."""
+    def __init__(self, spatial_index, layer, *sprites):
+        self.spatial_index = spatial_index
+        self.index_layer = layer
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.spatial_index.insert(sprite, self.index_layer)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.spatial_index.remove(sprite)
+
+    def query_rect(self, rect):
+        """Members of this group overlapping `rect`."""
+        return self.spatial_index.query_rect(rect, self.index_layer)
+
+    def query_radius(self, center, radius):
+        """Members of this group whose centre is within `radius` of `center`."""
+        return self.spatial_index.query_radius(center, radius, self.index_layer)
@@ -0,0 +1,86 @@
+from config.settings import TARGETING_MAX_SEARCH_RADIUS
+
+class TargetingManager:
+    """
+    Answers "which enemy should I aim at" for abilities, backed by the spatial index.
+
+    Nearest and k-nearest searches look in a circle that starts one index cell wide and doubles
+    until it holds enough enemies, so they only touch the enemies around the point. Past
+    TARGETING_MAX_SEARCH_RADIUS they fall back to checking every enemy. Distances are between
+    rect centres.
+
+    Results are cached for the current simulation step: every projectile spawned in a step asks
+    for the enemy nearest the player, and only the first one pays for the search. A cached
+    result that contains an enemy killed since is searched again.
+    """
+    def __init__(self, game_manager, max_search_radius=TARGETING_MAX_SEARCH_RADIUS):
+        self.game_manager = game_manager
+        self.enemies = game_manager.all_enemies
+        self.max_search_radius = max_search_radius
+        self.cache = {}
+        self.cache_tick = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def get_cached(self, key):
+        tick = self.game_manager.simulation_clock.tick
+        if tick != self.cache_tick:
+            self.cache.clear()
+            self.cache_tick = tick
+            return None
+        result = self.cache.get(key)
+        if result is None or not all(enemy.alive() for enemy in result):
+            return None
+        self.cache_hits += 1
+        return result
+
+    def get_nearest(self, point):
+        """The enemy whose centre is closest to `point`, or None when there are no enemies."""
+        nearest = self.get_k_nearest(point, 1)
+        return nearest[0] if nearest else None
+
+    def get_k_nearest(self, point, k):
+        """Up to `k` enemies closest to `point`, nearest first."""
+        key = ("nearest", point, k)
+        result = self.get_cached(key)
+        if result is None:
+            self.cache_misses += 1
+            result = self.cache[key] = self.find_k_nearest(point, k)
+        return result
+
+    def get_within_radius(self, point, radius):
+        """Every enemy whose centre is within `radius` of `point`."""
+        key = ("radius", point, radius)
+        result = self.get_cached(key)
+        if result is None:
+            self.cache_misses += 1
+            result = self.cache[key] = self.enemies.query_radius(point, radius)
+        return result
+
+    def get_random(self, rng):
+        """A uniformly random enemy, or None. Not cached, so every caller gets its own pick."""
+        return self.enemies.get_random(rng)
+
+    def find_k_nearest(self, point, k):
+        enemy_count = len(self.enemies)
+        if not enemy_count:
+            return []
+        k = min(k, enemy_count)
+        point_x, point_y = point
+
+        def get_distance_squared(enemy):
+            enemy_x, enemy_y = enemy.rect.center
+            return (enemy_x - point_x) ** 2 + (enemy_y - point_y) ** 2
+
+        # Any enemy closer than the k-th one found within the radius is itself within the radius,
+        # so once a circle holds k enemies they are the k nearest
+        radius = self.game_manager.spatial_index.cell_size
+        while radius <= self.max_search_radius:
+            candidates = self.enemies.query_radius(point, radius)
+            if len(candidates) >= k:
+                break
+            radius *= 2
+        else:
+            candidates = self.enemies.sprites()
+        candidates.sort(key=get_distance_squared)
+        return candidates[:k]
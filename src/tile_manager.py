@@ -1,60 +1,198 @@
+import bisect
+import itertools
 import os
 import pygame
-import random
 import helpers
-from config.settings import MAPS_IMAGES_ROOT_PATH
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import MAPS_IMAGES_ROOT_PATH, BACKGROUND_COLOR, TILE_CHUNK_SIZE, TILE_CHUNK_CACHE_SIZE, TILE_CHUNK_PREFETCH_MARGIN, \
+    TILE_DECORATION_DENSITY
 
 TILE_WIDTH = 240
 TILE_HEIGHT = 240
 
+HASH_MASK = (1 << 64) - 1
+
+chunk_baker = None # One worker thread baking chunks for every TileManager, started by the first one that draws
+
+def get_cell_hash(seed, grid_x, grid_y, layer=0):
+    """
+    A well mixed 64 bit number that only depends on its arguments (the splitmix64 finaliser over
+    the combined coordinates), so any cell can be worked out on its own, in any order.
+    """
+    value = (seed ^ grid_x * 0x9E3779B97F4A7C15 ^ grid_y * 0xC2B2AE3D27D4EB4F ^ layer * 0x165667B19E3779F9) & HASH_MASK
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & HASH_MASK
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & HASH_MASK
+    return value ^ (value >> 31)
+
+def get_chunk_keys(rect, chunk_width, chunk_height):
+    """Keys (chunk x, chunk y) of the chunks of the given size overlapping `rect`."""
+    start_x, start_y = rect.left // chunk_width, rect.top // chunk_height
+    end_x, end_y = (rect.right - 1) // chunk_width, (rect.bottom - 1) // chunk_height
+    return [(chunk_x, chunk_y) for chunk_x in range(start_x, end_x + 1) for chunk_y in range(start_y, end_y + 1)]
+
+def get_start_chunk_keys(screen_rect, start_pos):
+    """The chunks a default TileManager has to have baked for a camera centred on `start_pos`, margin included."""
+    view = screen_rect.copy()
+    view.center = start_pos
+    view.inflate_ip(TILE_CHUNK_PREFETCH_MARGIN * 2, TILE_CHUNK_PREFETCH_MARGIN * 2)
+    return get_chunk_keys(view, TILE_WIDTH * TILE_CHUNK_SIZE, TILE_HEIGHT * TILE_CHUNK_SIZE)
+
+def get_stage_tile_seed(stage_info):
+    """The stage's "tile_seed", or one derived from its name, so a stage always has the same map."""
+    return stage_info.get("tile_seed", zlib.crc32(stage_info["name"].encode()))
+
 class TileManager:
-    def __init__(self, game_manager, tile_width=TILE_WIDTH, tile_height=TILE_HEIGHT):
+    """
+    Draws the stage's endless tiled background.
+
+    Every cell's tile is worked out from the stage's tile seed and the cell's coordinates, so the
+    map is the same on every run of a stage and nothing is stored per cell. A stage's tiles are
+    picked with the weights in its "tile_weights" (file name -> weight, 1 when missing). Each
+    directory under the stage's "decorations" folder is a decoration layer: a cell gets one of
+    its images, at a hashed spot inside the cell, with the layer's "decoration_density" chance
+    (TILE_DECORATION_DENSITY when missing).
+
+    The background is baked into chunks of chunk_size x chunk_size tiles, so a frame blits the
+    few chunks overlapping the camera instead of every tile. Chunks near the view are baked
+    ahead of time on a worker thread; one that is needed before it is ready is baked on the
+    spot. The chunk_cache_size most recently drawn or prefetched chunks are kept, so the ones
+    left behind as the player moves on are dropped first.
+    """
+    def __init__(self, game_manager, tile_width=TILE_WIDTH, tile_height=TILE_HEIGHT, chunk_size=TILE_CHUNK_SIZE,
+                 chunk_cache_size=TILE_CHUNK_CACHE_SIZE, prefetch_margin=TILE_CHUNK_PREFETCH_MARGIN):
         """
         Initialize the TileManager.
 
         :param game_manager: The game manager object controlling the game state and screen.
         :param tile_width: The width of each tile in pixels.
         :param tile_height: The height of each tile in pixels.
+        :param chunk_size: Tiles along each side of a baked chunk.
+        :param chunk_cache_size: Baked chunks kept before the least recently used are dropped.
+        :param prefetch_margin: Pixels around the camera whose chunks are baked before they come into view.
         """
         self.game_manager = game_manager
         self.tile_width = tile_width
         self.tile_height = tile_height
-        self.tiles = {}
+        self.chunk_size = chunk_size
+        self.chunk_width = tile_width * chunk_size
+        self.chunk_height = tile_height * chunk_size
+        self.chunk_cache_size = chunk_cache_size
+        self.prefetch_margin = prefetch_margin
+        stage_info = game_manager.selected_stage
+        self.stage_path = os.path.join(MAPS_IMAGES_ROOT_PATH, helpers.get_debug_name_of_object(stage_info['name']))
+        self.tile_seed = get_stage_tile_seed(stage_info)
+        self.tile_weights = stage_info.get("tile_weights", {})
+        self.decoration_density = stage_info.get("decoration_density", {})
+        self.chunks = OrderedDict() # (chunk x, chunk y) -> baked Surface, least recently used first
+        self.pending_chunks = {} # (chunk x, chunk y) -> Future of a chunk being baked on the worker
         self.load_tile_images()
+        self.load_decoration_layers()
 
     def load_tile_images(self):
-        """Load tile images and store them in a dictionary."""
+        """Load the tile images and the running total of their weights, for picking one by weight."""
         self.tile_images = []
-        tile_path = os.path.join(MAPS_IMAGES_ROOT_PATH, helpers.get_debug_name_of_object(self.game_manager.selected_stage['name']), "tiles")
+        weights = []
+        tile_path = os.path.join(self.stage_path, "tiles")
 
-        for filename in os.listdir(tile_path):
+        for filename in sorted(os.listdir(tile_path)):
             image_path = os.path.join(tile_path, filename)
             image = helpers.load_image(image_path, convert_alpha=True, use_transparency=False, desired_width=self.tile_width, desired_height=self.tile_height)
             self.tile_images.append(image)
+            weights.append(self.tile_weights.get(filename, 1))
+        self.cumulative_tile_weights = list(itertools.accumulate(weights))
+
+    def load_decoration_layers(self):
+        """[(images, density)] for each directory under the stage's decorations folder, drawn in name order."""
+        self.decoration_layers = []
+        decorations_path = os.path.join(self.stage_path, "decorations")
+        if not os.path.isdir(decorations_path):
+            return
+        for layer_name in sorted(os.listdir(decorations_path)):
+            layer_path = os.path.join(decorations_path, layer_name)
+            if not os.path.isdir(layer_path):
+                continue
+            images = [helpers.load_image(os.path.join(layer_path, filename), convert_alpha=True, use_transparency=False)
+                      for filename in sorted(os.listdir(layer_path))]
+            if images:
+                self.decoration_layers.append((images, self.decoration_density.get(layer_name, TILE_DECORATION_DENSITY)))
 
     def get_tile(self, grid_x, grid_y):
-        """Retrieve a tile at the given grid position, generating it if necessary."""
-        if (grid_x, grid_y) not in self.tiles:
-            # Generate a random tile type
-            tile_image = random.choice(self.tile_images)
-            self.tiles[(grid_x, grid_y)] = tile_image
+        """The tile at a grid position, picked by weight with the cell's hash."""
+        roll = get_cell_hash(self.tile_seed, grid_x, grid_y) / (HASH_MASK + 1) * self.cumulative_tile_weights[-1]
+        return self.tile_images[bisect.bisect_right(self.cumulative_tile_weights, roll)]
+
+    def get_cell_blits(self, grid_x, grid_y):
+        """[(image, position within the cell)] for the cell's tile and any decorations on it, bottom first."""
+        cell_blits = [(self.get_tile(grid_x, grid_y), (0, 0))]
+        for layer, (images, density) in enumerate(self.decoration_layers, start=1):
+            cell_hash = get_cell_hash(self.tile_seed, grid_x, grid_y, layer)
+            if (cell_hash & 0xFFFF) / 0x10000 >= density:
+                continue
+            # The remaining bits pick the image and where it sits, kept inside the cell so chunk edges never cut it
+            image = images[(cell_hash >> 16) % len(images)]
+            x = (cell_hash >> 32 & 0xFFFF) % (max(self.tile_width - image.get_width(), 0) + 1)
+            y = (cell_hash >> 48) % (max(self.tile_height - image.get_height(), 0) + 1)
+            cell_blits.append((image, (x, y)))
+        return cell_blits
+
+    def bake_chunk(self, chunk_key):
+        """A new surface with the chunk's tiles and decorations drawn on it. Safe to run on the worker."""
+        chunk_surface = pygame.Surface((self.chunk_width, self.chunk_height), 0, self.game_manager.screen)
+        chunk_surface.fill(BACKGROUND_COLOR)
+        first_x, first_y = chunk_key[0] * self.chunk_size, chunk_key[1] * self.chunk_size
+        tile_blits = []
+        for x in range(self.chunk_size):
+            for y in range(self.chunk_size):
+                cell_x, cell_y = x * self.tile_width, y * self.tile_height
+                tile_blits.extend((image, (cell_x + offset_x, cell_y + offset_y))
+                                  for image, (offset_x, offset_y) in self.get_cell_blits(first_x + x, first_y + y))
+        chunk_surface.blits(tile_blits, doreturn=False)
+        return chunk_surface
+
+    def get_chunk(self, chunk_key):
+        """The baked chunk, baking it now if the worker hasn't. Also used to bake the first view while the stage loads."""
+        chunk = self.chunks.get(chunk_key)
+        if chunk is None:
+            pending_chunk = self.pending_chunks.pop(chunk_key, None)
+            chunk = pending_chunk.result() if pending_chunk is not None else self.bake_chunk(chunk_key)
+            self.chunks[chunk_key] = chunk
+        self.chunks.move_to_end(chunk_key)
+        return chunk
+
+    def get_chunk_keys(self, rect):
+        return get_chunk_keys(rect, self.chunk_width, self.chunk_height)
+
+    def prefetch_chunks(self, rect):
+        """Queues every chunk overlapping `rect` that isn't baked or being baked, and keeps the baked ones from being dropped."""
+        global chunk_baker
+        if chunk_baker is None:
+            chunk_baker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tile_chunks")
+        for chunk_key in self.get_chunk_keys(rect):
+            if chunk_key in self.chunks:
+                self.chunks.move_to_end(chunk_key)
+            elif chunk_key not in self.pending_chunks:
+                self.pending_chunks[chunk_key] = chunk_baker.submit(self.bake_chunk, chunk_key)
+
+    def collect_baked_chunks(self):
+        """Moves the chunks the worker has finished into the cache."""
+        for chunk_key, pending_chunk in list(self.pending_chunks.items()):
+            if pending_chunk.done():
+                del self.pending_chunks[chunk_key]
+                self.chunks[chunk_key] = pending_chunk.result()
 
-        return self.tiles[(grid_x, grid_y)]
+    def evict_chunks(self):
+        while len(self.chunks) > self.chunk_cache_size:
+            self.chunks.popitem(last=False)
 
     def draw(self):
-        """Draw visible tiles based on the camera's position."""
-        camera_offset = self.game_manager.camera.topleft
-        screen_width, screen_height = self.game_manager.screen.get_size()
-
-        # Calculate the range of grid cells that are visible on screen
-        start_x = (camera_offset[0] // self.tile_width) - 1
-        start_y = (camera_offset[1] // self.tile_height) - 1
-        end_x = (camera_offset[0] + screen_width) // self.tile_width + 1
-        end_y = (camera_offset[1] + screen_height) // self.tile_height + 1
-
-        for grid_x in range(start_x, end_x + 1):
-            for grid_y in range(start_y, end_y + 1):
-                tile_image = self.get_tile(grid_x, grid_y)
-                screen_x = grid_x * self.tile_width - camera_offset[0]
-                screen_y = grid_y * self.tile_height - camera_offset[1]
-                self.game_manager.screen.blit(tile_image, (screen_x, screen_y))
\ No newline at end of file
+        """Draw the chunks overlapping the camera. They cover the whole screen, so nothing needs clearing first."""
+        camera_rect = self.game_manager.camera.rect
+        camera_x, camera_y = camera_rect.topleft
+        chunk_blits = [(self.get_chunk((chunk_x, chunk_y)), (chunk_x * self.chunk_width - camera_x, chunk_y * self.chunk_height - camera_y))
+                       for chunk_x, chunk_y in self.get_chunk_keys(camera_rect)]
+        self.game_manager.screen.blits(chunk_blits, doreturn=False)
+        self.collect_baked_chunks()
+        self.prefetch_chunks(camera_rect.inflate(self.prefetch_margin * 2, self.prefetch_margin * 2))
+        self.evict_chunks()
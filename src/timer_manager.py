@@ -0,0 +1,76 @@
+import heapq
+import itertools
+
+class Timer:
+    """A callback waiting in a TimerManager. Returned by schedule() so it can be cancelled."""
+    __slots__ = ("due_time", "callback", "args", "interval", "cancelled")
+
+    def __init__(self, due_time, callback, args, interval):
+        self.due_time = due_time
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimerManager:
+    """
+    Game clock that runs callbacks when their time comes, instead of every object counting down its own timers.
+
+    Systems schedule() a callback some seconds of game time from now, and get back a Timer they
+    can cancel. The timers wait in a heap ordered by due time, so a step only looks at the ones
+    that are due; the rest cost nothing until then. Timers due on the same step run in the order
+    they were scheduled, which keeps seeded runs reproducible. Cancelled timers stay in the heap
+    and are dropped when they come up.
+
+    Things that only need to know how long ago something happened (e.g. an ability's cooldown)
+    can keep the `time` it happened and compare it with `time` later, with no timer at all.
+
+    Game time stops while `paused` and runs `time_scale` times as fast as real time otherwise.
+    The GameManager pauses it outside the gameplay states, so level up menus and cutscenes freeze
+    every gameplay timer the same way, and passes the dt update() returns on to the gameplay
+    update, so the scale applies to movement and to the timers alike.
+    """
+    def __init__(self):
+        self.time = 0.0
+        self.time_scale = 1.0
+        self.paused = False
+        self.timers = [] # Heap of (due time, sequence number, Timer)
+        self.sequence = itertools.count()
+
+    def reset(self):
+        """Drop every timer and go back to time 0, e.g. when a new run starts."""
+        self.time = 0.0
+        self.timers = []
+
+    def schedule(self, delay, callback, *args, interval=None):
+        """
+        Call callback(*args) once `delay` seconds of game time have passed.
+
+        :param interval: Seconds between repeats, to keep calling it until the timer is cancelled.
+        """
+        timer = Timer(self.time + delay, callback, args, interval)
+        heapq.heappush(self.timers, (timer.due_time, next(self.sequence), timer))
+        return timer
+
+    def update(self, dt):
+        """Advance game time by one step of `dt` real seconds and run the timers due. Returns the step's game time."""
+        if self.paused:
+            return 0.0
+        game_dt = dt * self.time_scale
+        self.time += game_dt
+        timers = self.timers
+        while timers and timers[0][0] <= self.time:
+            timer = heapq.heappop(timers)[2]
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                timer.due_time += timer.interval
+                heapq.heappush(timers, (timer.due_time, next(self.sequence), timer))
+            timer.callback(*timer.args)
+        return game_dt
+
+    def get_pending_count(self):
+        return len(self.timers)